@@ -4,73 +4,32 @@
 # ================================
 
 import streamlit as st
-import tempfile
+import math
 import os
-import pandas as pd
+import time
 import re
+from importlib.util import find_spec
 
-# Setup local FFmpeg path BEFORE importing pydub
+# Setup local FFmpeg path
 from pathlib import Path
 local_ffmpeg_bin = Path(__file__).parent / "ffmpeg" / "bin"
-if local_ffmpeg_bin.exists():
-    # Add local ffmpeg to PATH for this session
+if local_ffmpeg_bin.exists() and str(local_ffmpeg_bin) not in os.environ.get('PATH', '').split(os.pathsep):
+    # Add local ffmpeg to PATH for this session (once - the script reruns on every interaction)
     os.environ['PATH'] = str(local_ffmpeg_bin) + os.pathsep + os.environ.get('PATH', '')
 
-# Simple transcription - no audio conversion needed
-import speech_recognition as sr
-
-# Free translation using deep-translator (more reliable)
-from deep_translator import GoogleTranslator
-
-# Try to import soundfile and librosa for automatic conversion
-try:
-    import soundfile as sf
-    import librosa
-    AUDIO_CONVERSION_AVAILABLE = True
-except ImportError:
-    AUDIO_CONVERSION_AVAILABLE = False
-
-# Try to import pydub for better format support (after PATH setup)
-try:
-    import warnings
-    # Suppress pydub warnings about regex escape sequences (Python 3.13+)
-    warnings.filterwarnings('ignore', category=SyntaxWarning, module='pydub')
-    # Suppress pydub runtime warnings about missing ffmpeg
-    warnings.filterwarnings('ignore', category=RuntimeWarning, module='pydub')
-    
-    from pydub import AudioSegment
-    
-    # Check if FFmpeg is actually available
-    import subprocess
-    ffmpeg_found = False
-    
-    # First, try to set local FFmpeg paths if they exist
-    if local_ffmpeg_bin.exists():
-        ffmpeg_exe = local_ffmpeg_bin / "ffmpeg.exe"
-        ffprobe_exe = local_ffmpeg_bin / "ffprobe.exe"
-        if ffmpeg_exe.exists() and ffprobe_exe.exists():
-            AudioSegment.converter = str(ffmpeg_exe)
-            AudioSegment.ffprobe = str(ffprobe_exe)
-            ffmpeg_found = True
-            print(f"✅ Using local FFmpeg: {ffmpeg_exe}")
-    
-    # If local not found, check if ffmpeg is in PATH
-    if not ffmpeg_found:
-        try:
-            subprocess.run(['ffmpeg', '-version'], capture_output=True, timeout=2, check=True)
-            ffmpeg_found = True
-            print("✅ Using system FFmpeg from PATH")
-        except (subprocess.SubprocessError, FileNotFoundError, subprocess.CalledProcessError):
-            pass
-    
-    PYDUB_AVAILABLE = ffmpeg_found
-    
-    if not ffmpeg_found:
-        print("⚠️ FFmpeg not found - pydub will not work for AMR/MP3/M4A conversion")
-        
-except ImportError:
-    PYDUB_AVAILABLE = False
-    print("⚠️ pydub not installed")
+# Transcription pipeline: streaming decoding, voice activity detection,
+# parallel recognition and cached translation (deep-translator, FREE)
+from hausa_transcriber import backends, decode, metrics
+from hausa_transcriber.cache import ResultCache
+from hausa_transcriber.checkpoint import CheckpointStore
+from hausa_transcriber.jobs import JobManager
+from hausa_transcriber.workqueue import DEFAULT_BROKER, QueuedJobManager, create_broker
+from hausa_transcriber.export import FORMATS, available_formats, export_file
+from hausa_transcriber.records import (
+    COMBINED_COLUMNS, combined_records, format_time_range, record_tables, segment_tables
+)
+from hausa_transcriber.store import ResultStore
+from hausa_transcriber.transcribe import CHUNK_DURATION, CHUNK_OVERLAP
 
 st.set_page_config(
     page_title="Hausa Audio Transcriber - Simple",
@@ -78,6 +37,34 @@ st.set_page_config(
     layout="wide"
 )
 
+
+@st.cache_resource(show_spinner=False)
+def detect_audio_support():
+    """
+    Check once per server process (not on every rerun) which decoders exist:
+    returns (FFmpeg available, soundfile available for WAV/FLAC/OGG).
+    """
+    soundfile_found = find_spec('soundfile') is not None
+
+    # First, try to use the local FFmpeg if it exists
+    ffmpeg_exe = local_ffmpeg_bin / "ffmpeg.exe"
+    if ffmpeg_exe.exists():
+        decode.FFMPEG_BINARY = str(ffmpeg_exe)
+        print(f"✅ Using local FFmpeg: {ffmpeg_exe}")
+        return True, soundfile_found
+
+    # If local not found, check if ffmpeg is in PATH
+    if decode.ffmpeg_available():
+        print("✅ Using system FFmpeg from PATH")
+        return True, soundfile_found
+
+    print("⚠️ FFmpeg not found - AMR/MP3/M4A files cannot be decoded")
+    return False, soundfile_found
+
+
+# Check if FFmpeg is available for streaming MP3/M4A/AMR/AAC decoding
+FFMPEG_AVAILABLE, AUDIO_CONVERSION_AVAILABLE = detect_audio_support()
+
 # Increase file upload limit to 500MB
 # Note: For very large files, you may need to configure this in .streamlit/config.toml
 st.markdown("""
@@ -142,7 +129,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Important Notice - Show conversion capability
-if PYDUB_AVAILABLE:
+if FFMPEG_AVAILABLE:
     st.markdown("""
     <div class="highlight-box">
         <h3>✨ Audio Format Support</h3>
@@ -177,6 +164,16 @@ else:
     </div>
     """, unsafe_allow_html=True)
 
+# (name, code) pairs offered as translation targets; results keep the code they were translated to
+TARGET_LANGUAGES = [
+    ("English", "en"),
+    ("Arabic", "ar"),
+    ("French", "fr"),
+    ("Spanish", "es"),
+    ("Portuguese", "pt")
+]
+TARGET_LANGUAGE_NAMES = {code: name for name, code in TARGET_LANGUAGES}
+
 # Sidebar
 with st.sidebar:
     st.header("⚙️ Settings")
@@ -184,20 +181,49 @@ with st.sidebar:
     st.markdown("### 🌐 Translation")
     target_lang = st.selectbox(
         "Translate to:",
-        options=[
-            ("English", "en"),
-            ("Arabic", "ar"),
-            ("French", "fr"),
-            ("Spanish", "es"),
-            ("Portuguese", "pt")
-        ],
+        options=TARGET_LANGUAGES,
         format_func=lambda x: x[0]
     )
     
     st.markdown("---")
     
+    st.markdown("### ⚡ Performance")
+    recognition_workers = st.slider(
+        "Parallel recognition requests",
+        min_value=1,
+        max_value=16,
+        value=4,
+        help="How many audio chunks are recognized at the same time"
+    )
+    chunk_seconds = st.slider(
+        "✂️ Seconds of speech per request",
+        min_value=10,
+        max_value=CHUNK_DURATION,
+        value=CHUNK_DURATION,
+        step=5,
+        help="Shorter chunks come back faster and run more in parallel. Where speech is cut mid-sentence, "
+             f"neighbouring chunks overlap by {CHUNK_OVERLAP:g}s and words heard twice are kept once"
+    )
+    use_cache = st.checkbox(
+        "♻️ Reuse cached results",
+        value=True,
+        help="Files, chunks and phrases that were already transcribed or translated are not sent again"
+    )
+    
+    # The fake backends are for tests and benchmarks only
+    recognizer_names = [name for name in sorted(backends.RECOGNIZERS) if name != 'fake']
+    recognizer_name = st.selectbox(
+        "🎙️ Recognition engine",
+        recognizer_names,
+        index=recognizer_names.index(backends.DEFAULT_RECOGNIZER) if backends.DEFAULT_RECOGNIZER in recognizer_names else 0,
+        help="google: free online API (rate limited). vosk: offline model on this machine "
+             "(needs `pip install vosk` and HAUSA_TRANSCRIBER_VOSK_MODEL)"
+    )
+    
+    st.markdown("---")
+    
     st.markdown("### ℹ️ About")
-    if PYDUB_AVAILABLE:
+    if FFMPEG_AVAILABLE:
         st.success("""
         **Full Version - FFmpeg Enabled:**
         
@@ -254,7 +280,7 @@ with col1:
     st.info("💡 **Batch Processing:** Upload up to 10 audio files at once for faster processing!")
     
     # Determine accepted file types
-    if PYDUB_AVAILABLE:
+    if FFMPEG_AVAILABLE:
         # FFmpeg enabled - support ALL formats
         accepted_types = ['wav', 'mp3', 'm4a', 'amr', 'aac', '3gp', 'ogg', 'flac', 'wma', 'webm', 'opus', 'aiff', 'au', 'mp2', 'mp4', 'mkv', 'avi']
         file_help = "Upload ANY audio format - FFmpeg will auto-convert! MP3, M4A, AMR, WAV, AAC, 3GP, etc."
@@ -286,7 +312,7 @@ with col1:
         # Show file info
         total_size = 0
         for idx, file in enumerate(uploaded_files, 1):
-            file_size = len(file.getvalue()) / 1024 / 1024
+            file_size = file.size / 1024 / 1024
             total_size += file_size
             
             if file_size > 200:
@@ -332,374 +358,40 @@ with col2:
         transcribe_btn = False
 
 
-def convert_to_wav(audio_file, original_filename):
-    """Convert any audio format to WAV using multiple methods"""
-    tmp_input = None
-    tmp_output = None
-    
-    try:
-        # Get file extension
-        file_ext = original_filename.split('.')[-1].lower()
-        
-        with st.spinner(f"🔄 Converting {file_ext.upper()} to WAV..."):
-            # Save uploaded file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_ext}') as tmp_in:
-                tmp_in.write(audio_file.read())
-                tmp_input = tmp_in.name
-            
-            tmp_output = tempfile.NamedTemporaryFile(delete=False, suffix='.wav').name
-            
-            # Try Method 1: pydub with FFmpeg (best for MP3, M4A, AMR, AAC, etc.)
-            if PYDUB_AVAILABLE:
-                try:
-                    st.info("🔄 Using FFmpeg converter...")
-                    audio = AudioSegment.from_file(tmp_input, format=file_ext)
-                    audio.export(tmp_output, format='wav')
-                    st.success(f"✅ Converted {file_ext.upper()} to WAV using FFmpeg!")
-                    return tmp_output
-                except Exception as pydub_error:
-                    st.warning(f"FFmpeg method failed: {str(pydub_error)}")
-                    st.info("Trying alternative method...")
-            
-            # Try Method 2: Direct soundfile read (works for WAV, FLAC, OGG)
-            if AUDIO_CONVERSION_AVAILABLE:
-                try:
-                    audio_data, sample_rate = sf.read(tmp_input)
-                    sf.write(tmp_output, audio_data, sample_rate)
-                    st.success(f"✅ Converted {file_ext.upper()} to WAV using soundfile!")
-                    return tmp_output
-                except Exception:
-                    st.info("Soundfile method also failed, trying librosa...")
-            
-            # Try Method 3: librosa (more format support but slower)
-            if AUDIO_CONVERSION_AVAILABLE:
-                try:
-                    import warnings
-                    warnings.filterwarnings('ignore')
-                    audio_data, sample_rate = librosa.load(tmp_input, sr=None, mono=True)
-                    sf.write(tmp_output, audio_data, sample_rate)
-                    st.success(f"✅ Converted {file_ext.upper()} to WAV!")
-                    return tmp_output
-                except Exception:
-                    pass
-            
-            # If all methods fail, show helpful message
-            raise Exception(f"Unable to convert {file_ext.upper()} format")
-            
-    except Exception as e:
-        st.error(f"❌ Conversion failed for {file_ext.upper()} format")
-        st.warning(f"""
-        **{file_ext.upper()} files need conversion to WAV format**
-        
-        📱 **Quick & Easy Online Conversion (Recommended):**
-        
-        1. Go to: **[CloudConvert WAV Converter](https://cloudconvert.com/to/wav)**
-        2. Upload your {file_ext.upper()} file
-        3. Click "Convert" and wait 10-30 seconds
-        4. Download the WAV file
-        5. Upload the WAV file here
-        
-        **OR use these free converters:**
-        - **[Online Audio Converter](https://online-audio-converter.com/)** - Fast & easy
-        - **[FreeConvert](https://www.freeconvert.com/audio-converter)** - No registration
-        - **[Zamzar](https://www.zamzar.com/)** - Email delivery option
-        
-        💡 **Tip:** Save converted WAV files for future use!
-        
-        ⚠️ **Note:** This online app doesn't include FFmpeg for {file_ext.upper()} conversion.
-        For offline conversion, use desktop audio software like Audacity (free).
-        """)
-        return None
-        
-    finally:
-        # Cleanup input file
-        if tmp_input and os.path.exists(tmp_input):
-            try:
-                import time
-                time.sleep(0.2)
-                os.unlink(tmp_input)
-            except Exception:
-                pass
-
-
-def parse_qa_from_text(text):
-    """
-    Parse transcribed text into Question-Answer pairs
-    Identifies survey questions (Q1, Q2, etc.) and separates from answers
-    Specifically designed for mortality/reproductive health survey
-    """
-    # Common Hausa question patterns from your survey
-    hausa_question_words = [
-        'menene',      # what is
-        'wanne',       # which
-        'nawa',        # how many
-        'shin',        # whether/if
-        'kin taba',    # have you ever
-        'kina da',     # do you have
-        'ka',          # questions
-        'kika',        # you (feminine)
-        'zaka',        # will you
-        'kuna',        # do you (plural)
-        'akwai',       # is there
-    ]
+def show_conversion_help(file_ext):
+    """Explain how to get a WAV file when an upload cannot be decoded"""
+    st.error(f"❌ Conversion failed for {file_ext.upper()} format")
+    st.warning(f"""
+    **{file_ext.upper()} files need conversion to WAV format**
     
-    # Common English question patterns from survey
-    english_question_words = [
-        'how many', 'what is', 'do you', 'have you', 'are you', 
-        'can you', 'did you', 'does', 'was', 'were', 'will you',
-        'have you ever', 'kindly', 'select', 'gender', 'name',
-        'age', 'phone number', 'household', 'education', 'born'
-    ]
+    📱 **Quick & Easy Online Conversion (Recommended):**
     
-    # Split by sentences
-    sentences = re.split(r'[.?!]', text)
-    qa_pairs = []
-    current_question = None
-    current_answer = []
+    1. Go to: **[CloudConvert WAV Converter](https://cloudconvert.com/to/wav)**
+    2. Upload your {file_ext.upper()} file
+    3. Click "Convert" and wait 10-30 seconds
+    4. Download the WAV file
+    5. Upload the WAV file here
     
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence or len(sentence) < 5:
-            continue
-        
-        is_question = False
-        
-        # Check for explicit Q patterns (Q1, Q36, Q101, etc.)
-        if re.search(r'\bQ\d+', sentence, re.IGNORECASE):
-            is_question = True
-        
-        # Check for Hausa question words
-        for word in hausa_question_words:
-            if word in sentence.lower():
-                is_question = True
-                break
-        
-        # Check for English question words
-        if not is_question:
-            for phrase in english_question_words:
-                if phrase in sentence.lower():
-                    is_question = True
-                    break
-        
-        # Check for question mark
-        if '?' in sentence:
-            is_question = True
-        
-        # Check if starts with question word patterns
-        sentence_lower = sentence.lower()
-        if sentence_lower.startswith(('what', 'how', 'when', 'where', 'which', 'who', 'why', 'do ', 'does ', 'did ', 'have ', 'has ', 'had ', 'can ', 'could ', 'would ', 'should ', 'is ', 'are ', 'was ', 'were ')):
-            is_question = True
-        
-        if is_question:
-            # Save previous Q&A pair if exists
-            if current_question and current_answer:
-                qa_pairs.append({
-                    'type': 'Question',
-                    'text': current_question
-                })
-                qa_pairs.append({
-                    'type': 'Answer',
-                    'text': ' '.join(current_answer)
-                })
-            
-            # Start new question
-            current_question = sentence
-            current_answer = []
-        else:
-            # This is part of the answer (or continuation)
-            if current_question:
-                current_answer.append(sentence)
-            else:
-                # No question yet, might be background noise - skip
-                pass
+    **OR use these free converters:**
+    - **[Online Audio Converter](https://online-audio-converter.com/)** - Fast & easy
+    - **[FreeConvert](https://www.freeconvert.com/audio-converter)** - No registration
+    - **[Zamzar](https://www.zamzar.com/)** - Email delivery option
     
-    # Add the last Q&A pair
-    if current_question:
-        qa_pairs.append({
-            'type': 'Question',
-            'text': current_question
-        })
-        if current_answer:
-            qa_pairs.append({
-                'type': 'Answer',
-                'text': ' '.join(current_answer)
-            })
+    💡 **Tip:** Save converted WAV files for future use!
     
-    return qa_pairs
+    ⚠️ **Note:** This online app doesn't include FFmpeg for {file_ext.upper()} conversion.
+    For offline conversion, use desktop audio software like Audacity (free).
+    """)
 
 
-def transcribe_wav(audio_file, original_filename="audio.wav"):
-    """Transcribe audio file using Google Speech Recognition with timestamps"""
-    recognizer = sr.Recognizer()
-    tmp_path = None
-    converted_path = None
+def show_record_error(result):
+    """Explain why a record failed, with the help text for that kind of failure"""
+    kind = result.get('error_kind')
     
-    try:
-        # Check if conversion is needed
-        file_ext = original_filename.split('.')[-1].lower()
-        
-        if file_ext != 'wav' and AUDIO_CONVERSION_AVAILABLE:
-            # Convert to WAV first
-            audio_file.seek(0)
-            converted_path = convert_to_wav(audio_file, original_filename)
-            if not converted_path:
-                return None
-            tmp_path = converted_path
-        else:
-            # Save WAV file directly
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp:
-                audio_file.seek(0)
-                tmp.write(audio_file.read())
-                tmp_path = tmp.name
-        
-        # Transcribe in chunks for longer audio with timestamps
-        with st.spinner("🔄 Transcribing your Hausa audio..."):
-            with sr.AudioFile(tmp_path) as source:
-                # Get total duration
-                total_duration = int(source.DURATION) if hasattr(source, 'DURATION') else 0
-                
-                # Adjust recognizer settings to capture ALL voices (interviewer + respondent)
-                recognizer.energy_threshold = 300  # Lower = more sensitive (default is 300)
-                recognizer.dynamic_energy_threshold = True  # Adapt to audio levels
-                recognizer.pause_threshold = 0.8  # Shorter pause = captures more speech
-                
-                # Minimal ambient noise adjustment to preserve quiet voices
-                recognizer.adjust_for_ambient_noise(source, duration=0.2)
-                
-                # For very long audio, process in segments
-                if total_duration > 180:  # More than 3 minutes
-                    st.warning(f"⚠️ Audio is {int(total_duration/60)} minutes long")
-                    st.info("""
-                    **Google's free API works best with shorter audio (under 3 minutes).**
-                    
-                    For best results:
-                    1. Split your audio into 5-minute segments
-                    2. Use: https://mp3cut.net
-                    3. Transcribe each segment separately
-                    
-                    Or try transcribing anyway (may take longer)...
-                    """)
-                    
-                    # Ask user if they want to continue
-                    st.warning("⏱️ Processing long audio - this may take several minutes...")
-                
-                # Process in 60-second chunks (longer to capture Q&A exchanges)
-                transcription_segments = []
-                chunk_duration = 60  # Increased to 60 seconds for full Q&A
-                current_time = 0
-                
-                progress = st.progress(0)
-                status = st.empty()
-                
-                chunk_num = 0
-                max_chunks = (total_duration // chunk_duration + 1) if total_duration > 0 else 10
-                
-                while True:
-                    try:
-                        # Record next chunk
-                        audio_data = recognizer.record(source, duration=chunk_duration)
-                        
-                        if len(audio_data.frame_data) == 0:
-                            break  # No more audio
-                        
-                        chunk_num += 1
-                        status.text(f"Processing chunk {chunk_num}/{max_chunks}...")
-                        
-                        # Calculate timestamp for this chunk
-                        start_time = current_time
-                        end_time = current_time + chunk_duration
-                        
-                        # Transcribe chunk
-                        try:
-                            chunk_text = recognizer.recognize_google(audio_data, language='ha')
-                            if chunk_text.strip():
-                                transcription_segments.append({
-                                    'start': start_time,
-                                    'end': end_time,
-                                    'text': chunk_text
-                                })
-                        except sr.UnknownValueError:
-                            # Try English for this chunk
-                            try:
-                                chunk_text = recognizer.recognize_google(audio_data, language='en')
-                                if chunk_text.strip():
-                                    transcription_segments.append({
-                                        'start': start_time,
-                                        'end': end_time,
-                                        'text': chunk_text
-                                    })
-                            except sr.UnknownValueError:
-                                # Skip silent/unclear chunk
-                                pass
-                        
-                        # Update current time
-                        current_time = end_time
-                        
-                        # Update progress
-                        if total_duration > 0:
-                            progress_val = min(chunk_num / max_chunks, 1.0)
-                            progress.progress(progress_val)
-                        
-                    except sr.RequestError:
-                        st.error(f"❌ API request failed on chunk {chunk_num}")
-                        st.info("""
-                        **Google's API has limits:**
-                        - Maximum audio length per request
-                        - Rate limiting (too many requests)
-                        
-                        **Solutions:**
-                        1. Split audio into smaller files (5 minutes each)
-                        2. Wait a few minutes and try again
-                        3. Use lower quality audio (smaller file size)
-                        """)
-                        break
-                    
-                    except Exception:
-                        # End of file or other error
-                        break
-                
-                progress.empty()
-                status.empty()
-                
-                if transcription_segments:
-                    # Parse Q&A structure from all segments
-                    full_text = " ".join([seg['text'] for seg in transcription_segments])
-                    qa_pairs = parse_qa_from_text(full_text)
-                    
-                    # Store both segments and Q&A pairs in session state
-                    st.session_state.transcription_segments = transcription_segments
-                    st.session_state.qa_pairs = qa_pairs
-                    
-                    # Return combined text for backward compatibility
-                    return full_text
-                else:
-                    # Try processing entire file at once for short audio
-                    st.info("🔄 Trying to process entire audio at once...")
-                    
-                    with sr.AudioFile(tmp_path) as source2:
-                        recognizer.adjust_for_ambient_noise(source2, duration=0.5)
-                        audio_data = recognizer.record(source2)
-                        
-                        try:
-                            text = recognizer.recognize_google(audio_data, language='ha')
-                            # Create a single segment for short audio
-                            st.session_state.transcription_segments = [{
-                                'start': 0,
-                                'end': total_duration if total_duration > 0 else 60,
-                                'text': text
-                            }]
-                            return text
-                        except sr.UnknownValueError:
-                            # Try English
-                            text = recognizer.recognize_google(audio_data, language='en')
-                            st.session_state.transcription_segments = [{
-                                'start': 0,
-                                'end': total_duration if total_duration > 0 else 60,
-                                'text': text
-                            }]
-                            return text
+    if kind == 'decode':
+        show_conversion_help(result['filename'].split('.')[-1].lower())
         
-    except sr.UnknownValueError:
+    elif kind == 'no_speech':
         st.error("❌ Could not understand the audio")
         st.info("""
         **Tips for better results:**
@@ -708,215 +400,218 @@ def transcribe_wav(audio_file, original_filename="audio.wav"):
         - Speaker should be close to mic
         - Try recording again with better quality
         """)
-        return None
         
-    except sr.RequestError as e:
-        st.error(f"❌ Service error: {e}")
+    elif kind in ('service', 'failed_chunks'):
+        st.error(f"❌ {result['error_message']}")
+        st.caption("⏯️ Completed chunks were saved - transcribing the same file again resumes where it stopped")
         st.info("""
         **This usually means:**
-        - Audio file is too large (Google has ~10MB limit per request)
-        - Audio is too long (best results under 1 minute)
         - Too many requests (rate limited)
+        - The speech service is unreachable or down
         
         **Solutions:**
-        1. **Split your audio** into shorter segments (3-5 minutes each)
-           - Use: https://mp3cut.net
-           - Process each segment separately
-        
-        2. **Reduce file size:**
-           - Lower bitrate to 64kbps or 96kbps
-           - Use: https://online-audio-converter.com
+        1. **Wait a few minutes** if you've made many requests
         
-        3. **Wait a few minutes** if you've made many requests
+        2. **Check internet connection** and try again
         
-        4. **Check internet connection** and try again
+        3. **Lower "Parallel recognition requests"** in the sidebar
         """)
-        return None
         
-    except Exception as e:
-        st.error(f"❌ Error: {str(e)}")
+    else:
+        st.error(f"❌ Error: {result.get('error_message', 'Failed to process this record')}")
         st.info("""
         **For best results with long audio:**
         
         Please split your audio file into smaller segments (5-10 minutes each)
         using an online tool like https://mp3cut.net
         """)
+
+
+@st.cache_resource
+def get_recognition_cache():
+    """Shared on-disk cache of chunk recognition results"""
+    return ResultCache('recognition')
+
+
+@st.cache_resource
+def get_translation_cache():
+    """Shared on-disk cache of (source text, target language) translations"""
+    return ResultCache('translation')
+
+
+@st.cache_resource
+def get_checkpoint_store():
+    """Shared chunk checkpoints so interrupted files resume where they stopped"""
+    return CheckpointStore()
+
+
+@st.cache_resource
+def get_results_store():
+    """Shared on-disk store of finished results, read page by page by the results view"""
+    return ResultStore()
+
+
+@st.cache_resource
+def get_recognizer_backend(name):
+    """One shared instance per engine, so a local model is loaded only once"""
+    return backends.create_recognizer(name)
+
+
+@st.cache_resource
+def get_translator_backend():
+    return backends.create_translator()
+
+
+@st.cache_resource
+def get_job_manager():
+    """
+    Background transcription workers shared by all browser sessions, or with
+    HAUSA_TRANSCRIBER_BROKER set, the shared queue that worker processes drain
+    """
+    if DEFAULT_BROKER:
+        return QueuedJobManager(create_broker(DEFAULT_BROKER))
+    return JobManager(workers=2)
+
+
+@st.cache_resource
+def get_metrics_server():
+    """Prometheus endpoint on the port in HAUSA_TRANSCRIBER_METRICS_PORT (off when unset)"""
+    port = os.environ.get('HAUSA_TRANSCRIBER_METRICS_PORT')
+    if not port:
         return None
-        
-    finally:
-        # Cleanup
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                import time
-                time.sleep(0.3)
-                os.unlink(tmp_path)
-            except Exception:
-                pass
-        
-        if converted_path and os.path.exists(converted_path):
-            try:
-                import time
-                time.sleep(0.3)
-                os.unlink(converted_path)
-            except Exception:
-                pass
-
-
-def detect_speaker_role(text):
-    """Detect if text is from interviewer (question) or respondent (answer)"""
-    text_lower = text.lower()
-    
-    # Check for question patterns
-    if any(word in text_lower for word in ['q1', 'q2', 'q3', 'q4', 'q5', 'q6', 'q7', 'q8', 'q9', 
-                                            'q10', 'q20', 'q30', 'q40', 'q50', 'q60', 'q70', 'q80', 'q90',
-                                            'q100', 'q101', 'q102', 'q103', 'q104', 'q105', 'q106', 'q107',
-                                            'q108', 'q109', 'q110', 'q111', 'q112', 'q113', 'q114', 'q115',
-                                            'q120', 'q121', 'q125', 'q130', 'q131', 'q132', 'q133', 'q134', 'q135']):
-        return "❓ INTERVIEWER"
-    elif any(word in text_lower for word in ['how many', 'what is', 'menene', 'nawa', 'wanne', 
-                                              'kin taba', 'kina da', 'do you', 'have you', 'are you',
-                                              'shin', 'kindly', 'select', 'enter', 'confirm',
-                                              'name of', 'phone number', 'age', 'gender', 'household']):
-        return "❓ INTERVIEWER"
-    elif '?' in text:
-        return "❓ INTERVIEWER"
+    try:
+        return metrics.start_metrics_server(int(port))
+    except (OSError, ValueError):
+        return None  # Port in use or invalid - the app works without it
+
+
+def get_query_param(name):
+    if hasattr(st, 'query_params'):
+        return st.query_params.get(name)
+    return st.experimental_get_query_params().get(name, [None])[0]
+
+
+def set_query_param(name, value):
+    if hasattr(st, 'query_params'):
+        st.query_params[name] = value
     else:
-        return "💭 RESPONDENT"
+        st.experimental_set_query_params(**{name: value})
 
 
-def translate_text(text, target_lang):
-    """Translate text using Google Translate (FREE) via deep-translator"""
-    if not text or len(text.strip()) == 0:
-        return ""
-    
-    try:
-        # Use deep-translator for more reliable translation
-        translator = GoogleTranslator(source='auto', target=target_lang[1])
-        
-        with st.spinner(f"🔄 Translating to {target_lang[0]}..."):
-            result = translator.translate(text)
-            if result:
-                return result
-            else:
-                st.warning("⚠️ Translation returned empty result")
-                return text  # Return original if translation fails
-    except Exception as e:
-        st.warning(f"⚠️ Translation error: {str(e)}")
-        st.info("💡 Using original transcription (translation skipped)")
-        return text  # Return original text instead of None
+job_manager = get_job_manager()
+get_metrics_server()
 
+# The job ID is kept in the URL so a browser refresh reconnects to the running batch
+if st.session_state.get('active_job') is None:
+    st.session_state.active_job = get_query_param('job')
 
-# Process audio files
+# Submit audio files to the background workers
+recognizer_backend = None
 if transcribe_btn and uploaded_files:
+    try:
+        recognizer_backend = get_recognizer_backend(recognizer_name)
+    except backends.BackendError as e:
+        st.error(f"❌ {recognizer_name} engine unavailable: {e}")
+
+if recognizer_backend is not None:
+    # Copied to disk block by block - the job outlives this script run and its uploads
+    spooled = []
+    try:
+        for uploaded_file in uploaded_files:
+            spooled.append((uploaded_file.name, decode.spool_upload(uploaded_file)))
+        job_id = job_manager.submit(spooled, {
+            'target_language': target_lang[1],
+            'recognition_workers': recognition_workers,
+            'chunk_duration': chunk_seconds,
+            'recognition_cache': get_recognition_cache() if use_cache else None,
+            'translation_cache': get_translation_cache() if use_cache else None,
+            'use_ffmpeg': FFMPEG_AVAILABLE,
+            'checkpoints': get_checkpoint_store(),
+            'recognizer': recognizer_backend,
+            'translator': get_translator_backend(),
+            'results': get_results_store(),
+            'reuse_results': use_cache
+        })
+    except BaseException:
+        # Closing a spool deletes it; the job closes them itself once it is submitted
+        for _, spool in spooled:
+            spool.close()
+        raise
+    st.session_state.active_job = job_id
+    st.session_state.loaded_job = None  # Hide previous results
+    set_query_param('job', job_id)
+
+active_job = job_manager.get(st.session_state.active_job) if st.session_state.active_job else None
+
+# Show progress of the running job
+if active_job is not None and active_job.active:
     st.markdown("---")
     st.markdown("### 🔄 Processing Your Audio Files...")
-    
-    # Initialize batch results storage
-    if 'batch_results' not in st.session_state:
-        st.session_state.batch_results = []
-    
-    st.session_state.batch_results = []  # Clear previous results
+    st.caption(f"Job `{active_job.id}` - you can keep using the page, processing continues in the background")
     
     # Overall progress
-    overall_progress = st.progress(0)
-    overall_status = st.empty()
+    st.progress(active_job.progress)
     
-    # Process each file
-    for file_idx, uploaded_file in enumerate(uploaded_files, 1):
-        overall_status.text(f"Processing file {file_idx}/{len(uploaded_files)}: {uploaded_file.name}")
-        
-        st.markdown(f"---")
-        st.markdown(f"## � Record {file_idx}: {uploaded_file.name}")
-        
-        # File progress
-        file_progress = st.progress(0)
-        file_status = st.empty()
-        
-        # Transcribe
-        file_progress.progress(25)
-        file_status.text(f"Step 1/3: Transcribing Record {file_idx}...")
+    if active_job.status == 'queued':
+        ahead = job_manager.queue_position(active_job.id)
+        st.info(f"⏳ Waiting for a free worker ({ahead} batch(es) ahead)")
+    elif active_job.current_file:
+        filename = active_job.files[active_job.current_file - 1][0] if active_job.files else ""
+        stage = "Step 1/2: Transcribing" if active_job.stage == 'transcribing' else "Step 2/2: Translating"
+        st.text(f"Processing file {active_job.current_file}/{active_job.total}: {filename}")
+        st.text(f"{stage}... {active_job.detail}")
+        if getattr(active_job, 'workers', 1) > 1:
+            st.caption(f"👷 {active_job.workers} workers are processing files of this batch")
         
-        uploaded_file.seek(0)  # Reset file pointer
-        transcription = transcribe_wav(uploaded_file, uploaded_file.name)
-        
-        file_progress.progress(50)
-        
-        if transcription:
-            file_status.text(f"Step 2/3: Translating Record {file_idx}...")
-            
-            # Store transcription temporarily
-            temp_transcription_segments = st.session_state.transcription_segments
-            
-            # Translate full text
-            file_progress.progress(75)
-            translation = translate_text(transcription, target_lang)
-            
-            # Translate segments
-            translated_segments = None
-            if temp_transcription_segments:
-                translated_segments = []
-                total_segments = len(temp_transcription_segments)
-                
-                for idx, seg in enumerate(temp_transcription_segments):
-                    try:
-                        translator = GoogleTranslator(source='auto', target=target_lang[1])
-                        translated_text = translator.translate(seg['text'])
-                        translated_segments.append({
-                            'start': seg['start'],
-                            'end': seg['end'],
-                            'text': translated_text
-                        })
-                        
-                        # Update progress
-                        trans_progress = 75 + (20 * (idx + 1) / total_segments)
-                        file_progress.progress(int(trans_progress))
-                    except Exception:
-                        translated_segments.append(seg)
-            
-            file_progress.progress(100)
-            file_status.text(f"✅ Record {file_idx} Complete!")
-            
-            # Get Q&A pairs if available
-            qa_pairs = st.session_state.get('qa_pairs', [])
-            
-            # Store result
-            st.session_state.batch_results.append({
-                'record_number': file_idx,
-                'filename': uploaded_file.name,
-                'transcription': transcription,
-                'translation': translation,
-                'transcription_segments': temp_transcription_segments,
-                'translation_segments': translated_segments,
-                'qa_pairs': qa_pairs  # Add structured Q&A
-            })
-            
-            st.success(f"✅ Record {file_idx} processed successfully!")
+        # Segments appear as soon as their chunk is recognized; translations fill in as they arrive
+        live_segments = active_job.live_segments
+        if live_segments:
+            st.caption(f"📝 Live transcript - {len(live_segments)} segment(s) so far")
+            st.dataframe(
+                [
+                    {
+                        "AUDIO MINUTE": format_time_range(seg['start'], seg['end']),
+                        "TRANSCRIBED VERSION": seg['text'],
+                        "TRANSLATED VERSION": seg['translation']
+                    }
+                    for seg in live_segments
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+    
+    for result in active_job.results:
+        if result.get('error'):
+            st.error(f"❌ Failed to process Record {result['record_number']}: {result['filename']}")
         else:
-            file_progress.empty()
-            file_status.empty()
-            st.error(f"❌ Failed to process Record {file_idx}")
-            
-            # Store failed result
-            st.session_state.batch_results.append({
-                'record_number': file_idx,
-                'filename': uploaded_file.name,
-                'transcription': None,
-                'translation': None,
-                'transcription_segments': None,
-                'translation_segments': None,
-                'error': True
-            })
-        
-        # Update overall progress
-        overall_progress.progress(file_idx / len(uploaded_files))
-        
-        # Small delay between files
-        import time
-        time.sleep(0.5)
+            st.success(f"✅ Record {result['record_number']} processed successfully!")
+
+# Load the results of a finished job once
+elif active_job is not None and st.session_state.get('loaded_job') != active_job.id:
+    st.session_state.loaded_job = active_job.id
+    
+    if active_job.status == 'failed':
+        st.error(f"❌ Batch failed: {active_job.error}")
+    else:
+        st.success(f"🎉 Batch processing complete! {active_job.total} records processed.")
     
-    overall_progress.progress(100)
-    overall_status.text(f"✅ All {len(uploaded_files)} files processed!")
-    st.success(f"🎉 Batch processing complete! {len(uploaded_files)} records processed.")
+    options = active_job.options
+    if options.get('recognition_cache') is not None:
+        cache_stats = options['recognition_cache'].stats()
+        st.caption(
+            f"♻️ Recognition cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+            f"({cache_stats['entries']} chunks stored)"
+        )
+    if options.get('translation_cache') is not None:
+        cache_stats = options['translation_cache'].stats()
+        st.caption(
+            f"♻️ Translation cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+            f"({cache_stats['entries']} phrases stored)"
+        )
+
+# After a server restart the job itself is gone, but its results are still in the store
+elif active_job is None and st.session_state.active_job and st.session_state.get('loaded_job') is None:
+    st.session_state.loaded_job = st.session_state.active_job
 
 
 
@@ -1019,105 +714,170 @@ def highlight_potential_q_and_a(transcript_text):
 
     return '\n'.join(highlighted_text)
 
-# Display batch results
-if 'batch_results' in st.session_state and len(st.session_state.batch_results) > 0:
+PAGE_ROWS = 100  # Segments per page of a record's tables
+SEARCH_LIMIT = 50  # Hits shown per search
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def get_batch_view(batch_id):
+    """Per-file summaries and the job summary of a finished batch, read from the results store once per batch ID"""
+    records = get_results_store().batch(batch_id)
+    return {
+        'records': records,
+        'summary': metrics.job_summary([record.get('metrics') for record in records]),
+        'segments': sum(record.get('segments', 0) for record in records)
+    }
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def get_record_downloads(recording_id, saved_at):
+    """Per-record transcript and translation CSVs, built once per stored recording and save time"""
+    result = get_results_store().load_result(recording_id, None, None)
+    with metrics.timer('render_tables'):
+        tables = record_tables(result)
+    return {'transcript_csv': tables['transcript_csv'], 'translation_csv': tables['translation_csv']}
+
+
+# Streamlit 1.50+ builds a download when its button is clicked (download_button accepts a callable)
+try:
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    DEFERRED_DOWNLOADS = hasattr(MediaFileManager, 'add_deferred')
+except ImportError:
+    DEFERRED_DOWNLOADS = False
+
+
+def get_export(batch_id, fmt):
+    """
+    Combined export of a finished batch in one format, streamed from the store
+    through a spooled file. Nothing is cached between reruns: where Streamlit
+    supports it the export is only built when its download button is clicked.
+    """
+    store = get_results_store()
+
+    def build():
+        with metrics.timer('export', format=fmt):
+            with export_file(combined_records(store.batch_results(batch_id)), fmt, COMBINED_COLUMNS) as f:
+                return f.read()
+
+    return build if DEFERRED_DOWNLOADS else build()
+
+
+# Reruns triggered inside the results view (e.g. a download click) only rerun this part of the page
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+
+@fragment
+def show_batch_results(batch_id):
+    tables = get_batch_view(batch_id)
+    batch_results = tables['records']
+    if not batch_results:
+        return
+    
     st.markdown("---")
     st.markdown("## 📝 Batch Processing Results")
-    st.info(f"✨ Processed {len(st.session_state.batch_results)} audio files")
+    st.info(f"✨ Processed {len(batch_results)} audio files")
+    
+    # Where this job's time went
+    summary = tables['summary']
+    if summary['stages']:
+        with st.expander("⏱️ Job Summary", expanded=False):
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Recognition Requests", summary['recognition_requests'])
+            with col2:
+                st.metric("Retries", summary['retries'])
+            with col3:
+                st.metric("Uploaded", f"{summary['upload_bytes'] / (1024 * 1024):.1f} MB")
+            with col4:
+                st.metric("Cache Hits", f"{summary['cache_hits']}/{summary['cache_hits'] + summary['cache_misses']}")
+            if summary['failed_requests']:
+                st.caption(f"⚠️ {summary['failed_requests']} request(s) failed")
+            st.dataframe(summary['stages'], use_container_width=True, hide_index=True)
     
     # Add download all button
     st.markdown("### 📥 Download All Results")
     
-    # Prepare combined CSV for all records
-    all_records_data = []
-    for result in st.session_state.batch_results:
-        if not result.get('error') and result['transcription_segments']:
-            for seg in result['transcription_segments']:
-                start_min = int(seg['start'] // 60)
-                start_sec = int(seg['start'] % 60)
-                end_min = int(seg['end'] // 60)
-                end_sec = int(seg['end'] % 60)
-                time_range = f"{start_min:02d}:{start_sec:02d} - {end_min:02d}:{end_sec:02d} min"
-                
-                # Detect speaker role
-                role = detect_speaker_role(seg['text'])
-                
-                all_records_data.append({
-                    "Record": f"Record {result['record_number']}",
-                    "Filename": result['filename'],
-                    "Audio Minute": time_range,
-                    "Role": role,
-                    "Hausa Transcription": seg['text'],
-                    "English Translation": ""  # Will fill below
-                })
-    
-    # Add translations
-    trans_idx = 0
-    for result in st.session_state.batch_results:
-        if not result.get('error') and result['translation_segments']:
-            for seg in result['translation_segments']:
-                if trans_idx < len(all_records_data):
-                    all_records_data[trans_idx]["English Translation"] = seg['text']
-                    trans_idx += 1
-    
-    if all_records_data:
-        df_all = pd.DataFrame(all_records_data)
-        csv_all = df_all.to_csv(index=False)
-        
+    if tables['segments']:
         col_download1, col_download2 = st.columns(2)
+        with col_download2:
+            fmt = st.selectbox(
+                "Export format",
+                available_formats(),
+                format_func=lambda name: FORMATS[name]['label'],
+                help="XLSX opens directly in Excel; JSON Lines and Parquet suit data tools"
+            )
         with col_download1:
+            info = FORMATS[fmt]
             st.download_button(
-                "📥 Download All Records (CSV)",
-                data=csv_all,
-                file_name=f"all_transcriptions_{len(st.session_state.batch_results)}_records.csv",
-                mime="text/csv",
+                f"📥 Download All Records ({info['label']})",
+                data=get_export(batch_id, fmt),
+                file_name=f"all_transcriptions_{len(batch_results)}_records.{info['extension']}",
+                mime=info['mime'],
                 use_container_width=True
             )
-        with col_download2:
-            # Excel format would be nice but requires openpyxl
-            st.info("💡 Open CSV in Excel for easy viewing")
     
     st.markdown("---")
     
+    # Get display options
+    display_opts = st.session_state.get('display_options', {
+        'timestamped': True,
+        'translation': True
+    })
+    
     # Display each record
-    for result in st.session_state.batch_results:
+    for result in batch_results:
         st.markdown(f"## 📁 Record {result['record_number']}: {result['filename']}")
         
         if result.get('error'):
-            st.error(f"❌ Failed to process this record")
+            show_record_error(result)
             st.markdown("---")
             continue
         
-        # Get display options
-        display_opts = st.session_state.get('display_options', {
-            'timestamped': True,
-            'translation': True
-        })
+        recording_id = result.get('recording_id')
+        
+        if result.get('from_store'):
+            st.caption("♻️ Already transcribed - loaded from the results store")
+        if result.get('requests'):
+            st.caption(f"🗣️ Detected language: {result['language'].upper()} ({result['requests']} recognition requests)")
+        if result.get('resumed_chunks'):
+            st.caption(f"⏯️ Resumed: {result['resumed_chunks']} chunk(s) restored from an earlier run")
+        if result.get('failed_chunks'):
+            st.warning(
+                f"⚠️ {len(result['failed_chunks'])} chunk(s) still failed after retries "
+                f"(first: chunk {result['failed_chunks'][0]}) - this transcript has gaps. "
+                "Transcribe the same file again to recognize only the missing chunks."
+            )
+        if result.get('failed_translations'):
+            st.warning(f"⚠️ Translation failed for {result['failed_translations']} segment(s) - original transcription kept")
+        
+        if recording_id is None:
+            st.markdown("---")
+            continue
+        
+        # Tables show one page of segments at a time, read from the results store
+        pages = max(1, math.ceil(result['segments'] / PAGE_ROWS))
+        page = 1
+        if pages > 1:
+            page = st.number_input(
+                f"Page (of {pages}, {PAGE_ROWS} segments each)",
+                min_value=1,
+                max_value=pages,
+                value=1,
+                key=f"page_{batch_id}_{result['record_number']}"
+            )
+        offset = (page - 1) * PAGE_ROWS
+        store = get_results_store()
+        segments = store.segments(recording_id, offset, PAGE_ROWS)
+        translations = store.translations(recording_id, offset, PAGE_ROWS)
+        with metrics.timer('render_tables'):
+            transcript, translation, _ = segment_tables(segments, translations)
+        downloads = get_record_downloads(recording_id, store.saved_at(recording_id))
         
         # Timestamped Transcription
-        if display_opts.get('timestamped', True) and result['transcription_segments'] and len(result['transcription_segments']) > 0:
+        if display_opts.get('timestamped', True) and downloads['transcript_csv']:
             st.markdown(f"### 🕐 Timestamped Transcript - Record {result['record_number']}")
-            
-            transcript_data = []
-            for seg in result['transcription_segments']:
-                start_min = int(seg['start'] // 60)
-                start_sec = int(seg['start'] % 60)
-                end_min = int(seg['end'] // 60)
-                end_sec = int(seg['end'] % 60)
-                time_range = f"{start_min:02d}:{start_sec:02d} - {end_min:02d}:{end_sec:02d} min"
-                
-                # Detect speaker role
-                role = detect_speaker_role(seg['text'])
-                
-                transcript_data.append({
-                    "AUDIO MINUTE": time_range,
-                    "ROLE": role,
-                    "TRANSCRIBED VERSION": seg['text']
-                })
-            
-            df_transcript = pd.DataFrame(transcript_data)
             st.dataframe(
-                df_transcript,
+                transcript,
                 use_container_width=True,
                 hide_index=True,
                 column_config={
@@ -1128,31 +888,13 @@ if 'batch_results' in st.session_state and len(st.session_state.batch_results) >
             )
         
         # Timestamped Translation
-        if display_opts.get('translation', True) and result['translation_segments'] and len(result['translation_segments']) > 0:
-            st.markdown(f"### 🌐 {target_lang[0]} Translation - Record {result['record_number']}")
-            
-            translation_data = []
-            for idx, seg in enumerate(result['translation_segments']):
-                start_min = int(seg['start'] // 60)
-                start_sec = int(seg['start'] % 60)
-                end_min = int(seg['end'] // 60)
-                end_sec = int(seg['end'] % 60)
-                time_range = f"{start_min:02d}:{start_sec:02d} - {end_min:02d}:{end_sec:02d} min"
-                
-                # Detect speaker role from original transcription
-                role = "💭 RESPONDENT"
-                if idx < len(result['transcription_segments']):
-                    role = detect_speaker_role(result['transcription_segments'][idx]['text'])
-                
-                translation_data.append({
-                    "AUDIO MINUTE": time_range,
-                    "ROLE": role,
-                    "TRANSLATED VERSION": seg['text']
-                })
-            
-            df_translation = pd.DataFrame(translation_data)
+        if display_opts.get('translation', True) and downloads['translation_csv']:
+            # The language the file was translated to, not the one selected now
+            language_name = TARGET_LANGUAGE_NAMES.get(result.get('target_language'))
+            translation_title = f"{language_name} Translation" if language_name else "Translation"
+            st.markdown(f"### 🌐 {translation_title} - Record {result['record_number']}")
             st.dataframe(
-                df_translation,
+                translation,
                 use_container_width=True,
                 hide_index=True,
                 column_config={
@@ -1165,23 +907,19 @@ if 'batch_results' in st.session_state and len(st.session_state.batch_results) >
         # Individual download buttons
         col1, col2 = st.columns(2)
         with col1:
-            if result['transcription_segments']:
-                df_t = pd.DataFrame(transcript_data)
-                csv_t = df_t.to_csv(index=False)
+            if downloads['transcript_csv']:
                 st.download_button(
                     f"📥 Download Record {result['record_number']} Transcript",
-                    data=csv_t,
+                    data=downloads['transcript_csv'],
                     file_name=f"record_{result['record_number']}_transcript.csv",
                     mime="text/csv",
                     use_container_width=True
                 )
         with col2:
-            if result['translation_segments']:
-                df_tr = pd.DataFrame(translation_data)
-                csv_tr = df_tr.to_csv(index=False)
+            if downloads['translation_csv']:
                 st.download_button(
                     f"📥 Download Record {result['record_number']} Translation",
-                    data=csv_tr,
+                    data=downloads['translation_csv'],
                     file_name=f"record_{result['record_number']}_translation.csv",
                     mime="text/csv",
                     use_container_width=True
@@ -1191,19 +929,73 @@ if 'batch_results' in st.session_state and len(st.session_state.batch_results) >
         st.markdown(f"#### 📊 Record {result['record_number']} Statistics")
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Words", len(result['transcription'].split()))
+            st.metric("Words", result['words'])
         with col2:
-            st.metric("Characters", len(result['transcription']))
+            st.metric("Characters", result['characters'])
         with col3:
-            st.metric("Segments", len(result['transcription_segments']) if result['transcription_segments'] else 0)
+            st.metric("Segments", result['segments'])
         
         st.markdown("---")
 
+
+@fragment
+def show_search():
+    """Search every stored transcript and translation (typing here only reruns this panel)"""
+    with st.expander("🔎 Search All Transcripts", expanded=False):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            query = st.text_input(
+                "Search",
+                placeholder='e.g. zazzabi, "kasuwar kano", asibit*',
+                help="Finds segments containing every word. Quote a phrase; end a word with * to match its start. "
+                     "ɓ ɗ ƙ ƴ can be typed as b d k y."
+            )
+        with col2:
+            source = st.selectbox(
+                "In",
+                [None, 'transcript', 'translation'],
+                format_func=lambda name: {None: "Both", 'transcript': "Transcripts", 'translation': "Translations"}[name]
+            )
+        if not query:
+            return
+        
+        started = time.perf_counter()
+        hits = get_results_store().search(query, source=source, limit=SEARCH_LIMIT)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        st.caption(f"{len(hits)}{'+' if len(hits) == SEARCH_LIMIT else ''} matching segment(s) in {elapsed_ms:.0f} ms")
+        if hits:
+            st.dataframe(
+                [
+                    {
+                        "RECORD": f"Record {hit['record_number']}" if hit['record_number'] else "",
+                        "FILENAME": hit['filename'],
+                        "AUDIO MINUTE": format_time_range(hit['start'], hit['end']),
+                        "SOURCE": hit['source'].title(),
+                        "TEXT": hit['text'],
+                        "OPEN": f"?job={hit['batch_id']}" if hit['batch_id'] else None
+                    }
+                    for hit in hits
+                ],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "TEXT": st.column_config.TextColumn("TEXT", width="large"),
+                    "OPEN": st.column_config.LinkColumn("OPEN", display_text="Open batch")
+                }
+            )
+
+
+show_search()
+
+# Display batch results
+if st.session_state.get('loaded_job'):
+    show_batch_results(st.session_state.loaded_job)
+
 # Footer
 
 st.markdown("---")
 
-if PYDUB_AVAILABLE:
+if FFMPEG_AVAILABLE:
     st.success("""
     ### ✨ **FFmpeg Enabled - Full Audio Support!**
 
@@ -1311,3 +1103,8 @@ with footer_img_col:
         """, unsafe_allow_html=True)
 
 st.markdown("---")
+
+# Poll the background job until it finishes
+if active_job is not None and active_job.active:
+    time.sleep(1)
+    st.rerun()
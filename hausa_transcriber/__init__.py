@@ -0,0 +1,6 @@
+"""
+Core audio processing for the Hausa Audio Transcriber.
+
+Everything in this package is independent of Streamlit so it can be shared
+between the web app (app.py) and other entry points.
+"""
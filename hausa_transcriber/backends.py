@@ -0,0 +1,288 @@
+"""
+Speech recognition and translation backends.
+
+A recognizer backend turns one PCM chunk (a speech_recognition.AudioData)
+into a ``show_all``-style response for a language; a translator backend
+translates a batch of strings. Backends register themselves by name, and the
+app and CLI pick them by name (HAUSA_TRANSCRIBER_RECOGNIZER /
+HAUSA_TRANSCRIBER_TRANSLATOR, or the UI/CLI options):
+
+- ``google``: Google Speech Recognition / Google Translate (free public APIs)
+- ``vosk``: offline, CPU-only recognition with a local Vosk model, loaded once
+  per process and shared by all threads (``pip install vosk``; model directory
+  in HAUSA_TRANSCRIBER_VOSK_MODEL)
+- ``fake``: deterministic local stand-ins with optional latency and errors,
+  for tests and benchmarks
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from functools import lru_cache
+from importlib.util import find_spec
+
+import speech_recognition as sr
+
+# vosk loads the Kaldi native library on import - only done when the backend is used
+VOSK_AVAILABLE = find_spec('vosk') is not None
+
+
+DEFAULT_RECOGNIZER = os.environ.get('HAUSA_TRANSCRIBER_RECOGNIZER', 'google')
+DEFAULT_TRANSLATOR = os.environ.get('HAUSA_TRANSCRIBER_TRANSLATOR', 'google')
+
+RECOGNIZERS = {}
+TRANSLATORS = {}
+
+
+class BackendError(Exception):
+    """A backend is unknown or cannot be set up (missing package or model)"""
+
+
+def register_recognizer(name):
+    def register(cls):
+        cls.name = name
+        RECOGNIZERS[name] = cls
+        return cls
+    return register
+
+
+def register_translator(name):
+    def register(cls):
+        cls.name = name
+        TRANSLATORS[name] = cls
+        return cls
+    return register
+
+
+class RecognizerBackend:
+    """
+    ``recognize(audio_data, language)`` returns a dict like Google's
+    ``show_all=True`` response ({'alternative': [{'transcript', 'confidence'}]})
+    or [] when nothing was recognized, and raises
+    speech_recognition.RequestError when the service fails (these calls are
+    retried, see ratelimit). Instances are shared by the recognition threads.
+    """
+
+    name = None
+    languages = None  # Languages the backend can recognize; None means any
+    rate_limit = None  # RateLimiter options, e.g. {'rate': 5.0}; None = no token bucket
+
+    def recognize(self, audio_data, language):
+        raise NotImplementedError
+
+    def settings(self):
+        """Everything besides the audio and language that changes results (part of cache keys)"""
+        return {'backend': self.name}
+
+
+class TranslatorBackend:
+    """
+    ``translate_batch(texts, target_language)`` returns one translation per
+    text, None where that text cannot be translated, and raises when the
+    service fails (the batch is then retried, see ratelimit). Instances are
+    shared by threads.
+    """
+
+    name = None
+    batch_size = 16
+    rate_limit = None
+
+    def translate_batch(self, texts, target_language):
+        raise NotImplementedError
+
+
+@register_recognizer('google')
+class GoogleRecognizer(RecognizerBackend):
+    """Google Speech Recognition via speech_recognition (free public API)"""
+
+    rate_limit = {'rate': 5.0, 'burst': 10}
+
+    def __init__(self):
+        # Tuned to capture ALL voices (interviewer + respondent)
+        self.recognizer = sr.Recognizer()
+        self.recognizer.energy_threshold = 300  # Lower = more sensitive (default is 300)
+        self.recognizer.dynamic_energy_threshold = True  # Adapt to audio levels
+        self.recognizer.pause_threshold = 0.8  # Shorter pause = captures more speech
+
+    def recognize(self, audio_data, language):
+        try:
+            return self.recognizer.recognize_google(audio_data, language=language, show_all=True)
+        except sr.UnknownValueError:
+            return []
+
+    def settings(self):
+        # Same settings as before backends existed, so earlier cache entries stay valid
+        return {
+            'energy_threshold': self.recognizer.energy_threshold,
+            'pause_threshold': self.recognizer.pause_threshold
+        }
+
+
+@lru_cache(maxsize=None)
+def _vosk_model(path):
+    import vosk
+
+    # Loading a model takes seconds and hundreds of MB; do it once per process
+    vosk.SetLogLevel(-1)
+    return vosk.Model(path)
+
+
+@register_recognizer('vosk')
+class VoskRecognizer(RecognizerBackend):
+    """Offline recognition with a local Vosk (Kaldi) model; one model per language"""
+
+    def __init__(self, model_path=None, language=None):
+        if not VOSK_AVAILABLE:
+            raise BackendError("The vosk backend needs the vosk package (pip install vosk)")
+        model_path = model_path or os.environ.get('HAUSA_TRANSCRIBER_VOSK_MODEL')
+        if not model_path or not os.path.isdir(model_path):
+            raise BackendError("Set HAUSA_TRANSCRIBER_VOSK_MODEL to a downloaded Vosk model directory")
+
+        self.model_path = os.path.abspath(model_path)
+        self.languages = [language or os.environ.get('HAUSA_TRANSCRIBER_VOSK_LANGUAGE', 'ha')]
+        self.model = _vosk_model(self.model_path)
+
+    def recognize(self, audio_data, language):
+        if language not in self.languages:
+            return []
+
+        import vosk
+
+        # Recognizers are cheap and not thread-safe; the model is shared
+        recognizer = vosk.KaldiRecognizer(self.model, audio_data.sample_rate)
+        recognizer.SetWords(True)
+        recognizer.AcceptWaveform(audio_data.get_raw_data(convert_width=2))
+        result = json.loads(recognizer.FinalResult())
+
+        text = result.get('text', '').strip()
+        if not text:
+            return []
+        words = result.get('result') or []
+        confidence = sum(word.get('conf', 0.0) for word in words) / len(words) if words else 0.5
+        return {'alternative': [{'transcript': text, 'confidence': confidence}], 'final': True}
+
+    def settings(self):
+        return {'backend': self.name, 'model': os.path.basename(self.model_path), 'languages': self.languages}
+
+
+class _Attempts:
+    """Counts calls per input so a retry of the same input gets a fresh (but reproducible) draw"""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def rng(self, data, *parts):
+        digest = hashlib.sha256(data + repr(parts).encode('utf-8')).digest()
+        with self._lock:
+            attempt = self._counts[digest] = self._counts.get(digest, 0) + 1
+        return random.Random(digest), random.Random(digest + attempt.to_bytes(4, 'little'))
+
+
+def _fake_delay(latency, jitter, rng):
+    if latency > 0:
+        time.sleep(max(0.0, latency * (1 + rng.uniform(-jitter, jitter))))
+
+
+@register_recognizer('fake')
+class FakeRecognizer(RecognizerBackend):
+    """
+    Deterministic stand-in: the same audio and language always give the same
+    text, and the n-th attempt for them the same latency and error, whichever
+    thread handles them. Errors look like throttling. ``language`` gets a high
+    confidence, every other language a low one.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, jitter=0.2, seed=0, language='ha'):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.seed = seed
+        self.language = language
+        self._attempts = _Attempts()
+
+    def recognize(self, audio_data, language):
+        rng, attempt_rng = self._attempts.rng(audio_data.frame_data, language, self.seed)
+        _fake_delay(self.latency, self.jitter, attempt_rng)
+        if attempt_rng.random() < self.error_rate:
+            raise sr.RequestError("recognition request failed: Too Many Requests (simulated)")
+
+        words = [f"kalma{rng.randrange(500)}" for _ in range(rng.randint(4, 20))]
+        text = ('menene ' if language == 'ha' else 'what is ') + ' '.join(words)
+        confidence = 0.9 if language == self.language else 0.4
+        return {'alternative': [{'transcript': text, 'confidence': confidence}], 'final': True}
+
+    def settings(self):
+        return {'backend': self.name, 'seed': self.seed, 'language': self.language}
+
+
+@register_translator('google')
+class GoogleTranslatorBackend(TranslatorBackend):
+    """Google Translate via deep-translator (free public API)"""
+
+    batch_size = 1  # One HTTP request per text; a retry never repeats finished texts
+    rate_limit = {'rate': 5.0, 'burst': 10}
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _client(self, target_language):
+        # deep-translator (and requests/BeautifulSoup behind it) loads on the first translation
+        from deep_translator import GoogleTranslator as _GoogleTranslateClient
+
+        with self._lock:
+            if target_language not in self._clients:
+                self._clients[target_language] = _GoogleTranslateClient(source='auto', target=target_language)
+            return self._clients[target_language]
+
+    def translate_batch(self, texts, target_language):
+        from deep_translator.exceptions import NotValidLength, NotValidPayload, TranslationNotFound
+
+        client = self._client(target_language)
+        translations = []
+        for text in texts:
+            try:
+                translations.append(client.translate(text) or None)
+            except (NotValidLength, NotValidPayload, TranslationNotFound):
+                translations.append(None)  # This text can't be translated; retrying won't help
+        return translations
+
+
+@register_translator('fake')
+class FakeTranslator(TranslatorBackend):
+    """Deterministic stand-in that tags each text with the target language; errors fail the whole batch"""
+
+    def __init__(self, latency=0.0, error_rate=0.0, jitter=0.2, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.seed = seed
+        self._attempts = _Attempts()
+
+    def translate_batch(self, texts, target_language):
+        # One simulated request per batch: one latency, one chance of failing
+        _, attempt_rng = self._attempts.rng('\n'.join(texts).encode('utf-8'), target_language, self.seed)
+        _fake_delay(self.latency, self.jitter, attempt_rng)
+        if attempt_rng.random() < self.error_rate:
+            raise RuntimeError("Too Many Requests (simulated)")
+        return [f"[{target_language}] {text}" for text in texts]
+
+
+def create_recognizer(name=None, **options):
+    """New recognizer backend by registered name (default: HAUSA_TRANSCRIBER_RECOGNIZER or 'google')"""
+    name = name or DEFAULT_RECOGNIZER
+    if name not in RECOGNIZERS:
+        raise BackendError(f"Unknown recognizer backend '{name}' (available: {', '.join(sorted(RECOGNIZERS))})")
+    return RECOGNIZERS[name](**options)
+
+
+def create_translator(name=None, **options):
+    """New translator backend by registered name (default: HAUSA_TRANSCRIBER_TRANSLATOR or 'google')"""
+    name = name or DEFAULT_TRANSLATOR
+    if name not in TRANSLATORS:
+        raise BackendError(f"Unknown translator backend '{name}' (available: {', '.join(sorted(TRANSLATORS))})")
+    return TRANSLATORS[name](**options)
@@ -0,0 +1,199 @@
+"""
+Per-file processing shared by the batch entry points: transcribe a recording,
+translate its segments and return the result dict that the CLI exports and
+the web app saves to its ResultStore. The ``shared_*`` helpers give the CLI's
+and the queue workers' processes one of each cache, store and backend, and
+check for FFmpeg once.
+"""
+
+from functools import lru_cache
+
+import speech_recognition as sr
+
+from . import backends, decode, metrics
+from .cache import ResultCache
+from .checkpoint import CheckpointStore, file_digest
+from .decode import DECODE_SAMPLE_RATE, DecodeError
+from .store import ResultStore
+from .transcribe import CHUNK_DURATION, CHUNK_OVERLAP, transcribe_file
+from .translate import translate_segments
+
+
+@lru_cache(maxsize=None)
+def shared_caches(enabled):
+    """One pair of recognition/translation cache connections per process"""
+    if not enabled:
+        return None, None
+    return ResultCache('recognition'), ResultCache('translation')
+
+
+@lru_cache(maxsize=None)
+def shared_checkpoints(enabled):
+    """One checkpoint store connection per process"""
+    return CheckpointStore() if enabled else None
+
+
+@lru_cache(maxsize=None)
+def shared_results(enabled):
+    """One results store connection per process"""
+    return ResultStore() if enabled else None
+
+
+@lru_cache(maxsize=None)
+def shared_ffmpeg():
+    """Whether FFmpeg can be run, checked once per process rather than per file"""
+    return decode.ffmpeg_available()
+
+
+@lru_cache(maxsize=None)
+def shared_backends(recognizer, translator):
+    """One recognizer and translator per process (a local model is loaded once)"""
+    return backends.create_recognizer(recognizer), backends.create_translator(translator)
+
+
+def failed_result(record_number, filename, message, kind='error'):
+    """
+    Result entry for a record that could not be processed.
+    ``kind`` is one of 'decode', 'service', 'no_speech', 'failed_chunks' or 'error'.
+    """
+    return {
+        'record_number': record_number,
+        'filename': filename,
+        'transcription': None,
+        'translation': None,
+        'transcription_segments': None,
+        'translation_segments': None,
+        'error': True,
+        'error_kind': kind,
+        'error_message': message
+    }
+
+
+def process_file(audio_file, filename, record_number, target_language='en', recognition_workers=4,
+                 recognition_cache=None, translation_cache=None, use_ffmpeg=True, progress_callback=None,
+                 checkpoints=None, recognizer=None, translator=None, results=None, reuse_results=True,
+                 chunk_duration=CHUNK_DURATION, chunk_overlap=CHUNK_OVERLAP, live=None):
+    """
+    Transcribe and translate one file-like recording.
+
+    ``progress_callback(stage, fraction, detail)`` is called with stage
+    'transcribing' or 'translating'; ``fraction`` is None while the total
+    is not known yet. With a CheckpointStore and ``reuse_results``, an
+    interrupted file resumes from its first missing chunk. ``recognizer`` and ``translator`` are
+    backend instances (default: the configured backends). ``chunk_duration``
+    and ``chunk_overlap`` set the seconds of speech per recognition request
+    and how much neighbouring chunks overlap where speech is cut. With a
+    live.LiveTranscript, each chunk's text and each translation are published
+    to it as soon as they arrive. The result's 'metrics' is a snapshot of the
+    file's stage timings and request counters (see metrics.job_summary).
+
+    With a ResultStore, complete results are saved to it (the result gets a
+    'recording_id'), and when ``reuse_results`` a file already stored with the
+    same settings is returned from the store ('from_store') without being
+    processed again. Without ``reuse_results`` every chunk is recognized
+    again and nothing is checkpointed.
+    """
+    with metrics.collect() as file_metrics:
+        with metrics.timer('file'):
+            result = _process_file(
+                audio_file, filename, record_number, target_language, recognition_workers,
+                recognition_cache, translation_cache, use_ffmpeg, progress_callback, checkpoints,
+                recognizer, translator, results, reuse_results, chunk_duration, chunk_overlap, live
+            )
+        outcome = result['error_kind'] if result.get('error') else 'stored' if result.get('from_store') else 'ok'
+        metrics.inc('files_total', outcome=outcome)
+
+    result['metrics'] = file_metrics.snapshot()
+    return result
+
+
+def _process_file(audio_file, filename, record_number, target_language, recognition_workers,
+                  recognition_cache, translation_cache, use_ffmpeg, progress_callback, checkpoints,
+                  recognizer, translator, results, reuse_results, chunk_duration, chunk_overlap, live):
+    def on_transcribe(recognized, submitted, position, duration):
+        if progress_callback:
+            fraction = min(position / duration, 1.0) if duration else None
+            progress_callback('transcribing', fraction, f"{recognized}/{submitted} chunks recognized")
+
+    def on_translate(done, total):
+        if progress_callback:
+            progress_callback('translating', done / total, f"{done}/{total} segments translated")
+
+    recognizer = recognizer or backends.create_recognizer()
+    translator = translator or backends.create_translator()
+
+    content_key = None
+    if results is not None:
+        content_key = file_digest(audio_file, {
+            'chunk_duration': chunk_duration,
+            'chunk_overlap': chunk_overlap,
+            'sample_rate': DECODE_SAMPLE_RATE,
+            'recognizer': recognizer.settings(),
+            'translator': translator.name,
+            'target_language': target_language
+        })
+        recording_id = results.lookup(content_key) if reuse_results else None
+        if recording_id is not None:
+            stored = results.load_result(recording_id, record_number, filename)
+            if stored is not None:
+                return stored
+
+    try:
+        transcription = transcribe_file(
+            audio_file,
+            filename,
+            max_workers=recognition_workers,
+            cache=recognition_cache,
+            use_ffmpeg=use_ffmpeg,
+            progress_callback=on_transcribe,
+            checkpoints=checkpoints if reuse_results else None,
+            recognizer=recognizer,
+            chunk_duration=chunk_duration,
+            chunk_overlap=chunk_overlap,
+            chunk_callback=live.add_chunk if live is not None else None
+        )
+    except DecodeError as e:
+        return failed_result(record_number, filename, str(e), 'decode')
+    except sr.RequestError as e:
+        return failed_result(record_number, filename, f"Service error: {e}", 'service')
+
+    if not transcription['segments']:
+        if transcription['failed_chunks']:
+            message = f"API requests failed for all {len(transcription['failed_chunks'])} chunk(s) after retries"
+            return failed_result(record_number, filename, message, 'failed_chunks')
+        return failed_result(record_number, filename, "Could not understand the audio", 'no_speech')
+
+    if live is not None:
+        live.set_segments(transcription['segments'])
+
+    with metrics.timer('translate'):
+        translated_segments, failed_translations = translate_segments(
+            transcription['segments'],
+            target_language,
+            cache=translation_cache,
+            progress_callback=on_translate,
+            translator=translator,
+            translation_callback=live.add_translation if live is not None else None
+        )
+
+    result = {
+        'record_number': record_number,
+        'filename': filename,
+        'transcription': transcription['transcription'],
+        'translation': " ".join(seg['text'] for seg in translated_segments),
+        'transcription_segments': transcription['segments'],
+        'translation_segments': translated_segments,
+        'qa_pairs': transcription['qa_pairs'],
+        'language': transcription['language'],
+        'target_language': target_language,
+        'requests': transcription['requests'],
+        'failed_chunks': transcription['failed_chunks'],
+        'resumed_chunks': transcription['resumed_chunks'],
+        'failed_translations': failed_translations
+    }
+
+    # A result with gaps is stored for display, but the file is processed again (resuming from checkpoints)
+    if results is not None:
+        complete = not transcription['failed_chunks'] and not failed_translations
+        result['recording_id'] = results.save_recording(content_key, result, target_language, complete)
+    return result
@@ -0,0 +1,374 @@
+"""
+Offline benchmark of the processing pipeline.
+
+    python -m hausa_transcriber bench --seconds 600 --files 2 --formats wav flac mp3 -o bench.json
+
+Synthetic recordings (tone bursts separated by silence, so the voice activity
+detector finds speech) are generated in a temporary directory and pushed
+through decoding, chunking, recognition, translation, result tables and
+export. Recognition and translation use the deterministic ``fake`` backends
+with configurable latency and error rates, so
+runs need no network and are comparable across commits. The report is JSON
+with per-stage throughput, latency percentiles and peak RSS.
+
+    python -m hausa_transcriber bench --startup --runs 5
+
+times the web app instead: its first script run in a fresh interpreter (cold
+start, including imports) and the reruns that follow (what every widget
+interaction costs), using Streamlit's AppTest.
+"""
+
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+from . import decode, vad
+from .backends import FakeRecognizer, FakeTranslator
+from .batch import process_file
+from .export import FORMATS, available_formats, write_records
+from .records import COMBINED_COLUMNS, combined_records, result_tables
+from .transcribe import CHUNK_DURATION
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+SAMPLE_RATE = 16000
+SOUNDFILE_FORMATS = {'wav': 'WAV', 'flac': 'FLAC', 'mp3': 'MP3', 'ogg': 'OGG'}
+DEFAULT_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+# Runs in a fresh interpreter per sample, so nothing is imported or cached yet
+STARTUP_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=300)
+started = time.perf_counter()
+app.run()
+first_run = time.perf_counter() - started
+reruns = []
+for _ in range(int(sys.argv[2])):
+    started = time.perf_counter()
+    app.run()
+    reruns.append(time.perf_counter() - started)
+print(json.dumps({'first_run': first_run, 'reruns': reruns, 'errors': [str(e.value) for e in app.exception]}))
+"""
+
+
+def synthetic_audio(seconds, sample_rate=SAMPLE_RATE, seed=0):
+    """
+    Int16 mono samples alternating 2-8 s "speech" bursts (amplitude-modulated
+    tones over noise) with 0.5-3 s pauses, reproducible for a given seed.
+    """
+    rng = np.random.default_rng(seed)
+    samples = rng.normal(0, 30, int(seconds * sample_rate)).astype(np.float32)
+    position = rng.uniform(0.5, 2.0)
+    while position < seconds:
+        length = min(rng.uniform(2.0, 8.0), seconds - position)
+        start, end = int(position * sample_rate), int((position + length) * sample_rate)
+        t = np.arange(end - start) / sample_rate
+        pitch = rng.uniform(110, 260)
+        envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)  # Syllable-rate modulation
+        samples[start:end] += 6000 * envelope * np.sin(2 * np.pi * pitch * t)
+        position += length + rng.uniform(0.5, 3.0)
+    return samples.clip(-32768, 32767).astype(np.int16)
+
+
+def write_synthetic_file(path, seconds, fmt, seed=0):
+    """Write a synthetic recording in ``fmt`` (wav, flac, mp3 or ogg) with soundfile"""
+    sf.write(path, synthetic_audio(seconds, seed=seed), SAMPLE_RATE, format=SOUNDFILE_FORMATS[fmt])
+    return path
+
+
+class Timings:
+    """Thread-safe list of per-item durations for one stage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.values = []
+
+    def add(self, seconds):
+        with self._lock:
+            self.values.append(seconds)
+
+
+def percentiles(values):
+    if not values:
+        return {'count': 0}
+    data = np.asarray(values) * 1000.0
+    return {
+        'count': len(values),
+        'mean_ms': round(float(data.mean()), 3),
+        'p50_ms': round(float(np.percentile(data, 50)), 3),
+        'p90_ms': round(float(np.percentile(data, 90)), 3),
+        'p99_ms': round(float(np.percentile(data, 99)), 3),
+        'max_ms': round(float(data.max()), 3)
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class _TimedRecognizer(FakeRecognizer):
+    def __init__(self, timings, **options):
+        super().__init__(**options)
+        self.timings = timings
+
+    def recognize(self, audio_data, language):
+        started = time.perf_counter()
+        try:
+            return super().recognize(audio_data, language)
+        finally:
+            self.timings.add(time.perf_counter() - started)
+
+
+class _TimedTranslator(FakeTranslator):
+    def __init__(self, timings, **options):
+        super().__init__(**options)
+        self.timings = timings
+
+    def translate_batch(self, texts, target_language):
+        started = time.perf_counter()
+        try:
+            return super().translate_batch(texts, target_language)
+        finally:
+            self.timings.add(time.perf_counter() - started)
+
+
+def _stage(seconds, items, audio_seconds=None, latencies=None):
+    stage = {
+        'seconds': round(seconds, 4),
+        'items': items,
+        'items_per_second': round(items / seconds, 2) if seconds > 0 else None,
+        'peak_rss_mb': peak_rss_mb()
+    }
+    if audio_seconds is not None:
+        stage['audio_seconds_per_second'] = round(audio_seconds / seconds, 2) if seconds > 0 else None
+    if latencies is not None:
+        stage['latency'] = percentiles(latencies)
+    return stage
+
+
+def bench_decode(paths, use_ffmpeg):
+    """Decode every file to PCM and split it into speech chunks, timing each step separately"""
+    decode_seconds = chunk_seconds = audio_seconds = 0.0
+    chunks = 0
+    per_file = []
+    for path in paths:
+        file_ext = path.rsplit('.', 1)[-1]
+        with open(path, 'rb') as f:
+            started = time.perf_counter()
+            with decode.open_pcm_stream(f, file_ext, use_ffmpeg=use_ffmpeg) as stream:
+                blocks = list(stream)
+                sample_rate = stream.sample_rate
+            decoded = time.perf_counter()
+        audio_seconds += sum(len(block) for block in blocks) / sample_rate
+
+        for _ in vad.iter_speech_segments(iter(blocks), sample_rate, max_duration=CHUNK_DURATION):
+            chunks += 1
+        finished = time.perf_counter()
+
+        decode_seconds += decoded - started
+        chunk_seconds += finished - decoded
+        per_file.append(finished - started)
+        del blocks
+
+    return (
+        _stage(decode_seconds, len(paths), audio_seconds, per_file),
+        _stage(chunk_seconds, chunks, audio_seconds)
+    )
+
+
+def run_benchmark(seconds=300, files=1, formats=('wav',), recognition_workers=4, recognition_latency=0.05,
+                  translation_latency=0.01, recognition_error_rate=0.0, translation_error_rate=0.0,
+                  export_formats=None, seed=0, work_dir=None):
+    """Run every stage over ``files`` synthetic recordings per format and return the report dict"""
+    use_ffmpeg = decode.ffmpeg_available()
+    export_formats = list(export_formats or available_formats())
+    report = {
+        'parameters': {
+            'seconds': seconds, 'files': files, 'formats': list(formats),
+            'recognition_workers': recognition_workers,
+            'recognition_latency': recognition_latency, 'translation_latency': translation_latency,
+            'recognition_error_rate': recognition_error_rate, 'translation_error_rate': translation_error_rate,
+            'export_formats': export_formats, 'seed': seed
+        },
+        'environment': environment(use_ffmpeg),
+        'stages': {}
+    }
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        started = time.perf_counter()
+        paths = []
+        for fmt in formats:
+            for idx in range(files):
+                path = os.path.join(tmp, f'synthetic_{idx + 1}.{fmt}')
+                paths.append(write_synthetic_file(path, seconds, fmt, seed=seed + idx))
+        report['stages']['generate'] = _stage(time.perf_counter() - started, len(paths), seconds * len(paths))
+
+        report['stages']['decode'], report['stages']['chunking'] = bench_decode(paths, use_ffmpeg)
+
+        # Full per-file pipeline against the local stand-ins (no caches, so every chunk is requested)
+        results = []
+        file_latencies = []
+        timings = {'recognition': Timings(), 'translation': Timings()}
+        recognizer = _TimedRecognizer(timings['recognition'], latency=recognition_latency,
+                                      error_rate=recognition_error_rate, seed=seed)
+        translator = _TimedTranslator(timings['translation'], latency=translation_latency,
+                                      error_rate=translation_error_rate, seed=seed)
+        started = time.perf_counter()
+        for record_number, path in enumerate(paths, 1):
+            file_started = time.perf_counter()
+            with open(path, 'rb') as f:
+                results.append(process_file(
+                    f, os.path.basename(path), record_number, recognition_workers=recognition_workers,
+                    use_ffmpeg=use_ffmpeg, recognizer=recognizer, translator=translator
+                ))
+            file_latencies.append(time.perf_counter() - file_started)
+        pipeline_seconds = time.perf_counter() - started
+
+        recognition = timings['recognition'].values
+        translation = timings['translation'].values
+        # Request throughput is measured against the pipeline's wall time (requests overlap)
+        report['stages']['recognition'] = _stage(pipeline_seconds, len(recognition), latencies=recognition)
+        report['stages']['translation'] = _stage(pipeline_seconds, len(translation), latencies=translation)
+        report['stages']['pipeline'] = _stage(pipeline_seconds, len(paths), seconds * len(paths), file_latencies)
+        report['stages']['pipeline']['failed_files'] = sum(1 for result in results if result.get('error'))
+        report['stages']['pipeline']['segments'] = sum(
+            len(result['transcription_segments'] or []) for result in results
+        )
+
+        started = time.perf_counter()
+        tables = result_tables(results)
+        report['stages']['render_tables'] = _stage(time.perf_counter() - started, tables['segments'])
+
+        for fmt in export_formats:
+            path = os.path.join(tmp, f"export.{FORMATS[fmt]['extension']}")
+            started = time.perf_counter()
+            rows = write_records(combined_records(results), path, fmt, COMBINED_COLUMNS)
+            stage = _stage(time.perf_counter() - started, rows)
+            stage['bytes'] = os.path.getsize(path)
+            report['stages'][f'export_{fmt}'] = stage
+
+    report['peak_rss_mb'] = peak_rss_mb()
+    return report
+
+
+def run_startup_benchmark(app_path=DEFAULT_APP, runs=3, reruns=5, work_dir=None):
+    """
+    Time ``runs`` cold starts of the web app (each in a new interpreter, with
+    an empty cache directory) and ``reruns`` reruns after each one.
+    """
+    first_runs = []
+    rerun_times = []
+    errors = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+            env = dict(os.environ, HAUSA_TRANSCRIBER_CACHE=tmp)
+            env.pop('HAUSA_TRANSCRIBER_METRICS_PORT', None)
+            proc = subprocess.run(
+                [sys.executable, '-c', STARTUP_SCRIPT, app_path, str(reruns)],
+                cwd=os.path.dirname(app_path), env=env, capture_output=True, text=True
+            )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Startup run failed: {proc.stderr.strip()[-2000:]}")
+        sample = json.loads(proc.stdout.strip().splitlines()[-1])
+        first_runs.append(sample['first_run'])
+        rerun_times.extend(sample['reruns'])
+        errors.extend(sample['errors'])
+
+    return {
+        'parameters': {'app': app_path, 'runs': runs, 'reruns': reruns},
+        'environment': environment(decode.ffmpeg_available()),
+        'startup': {
+            'cold_start': percentiles(first_runs),
+            'rerun': percentiles(rerun_times),
+            'errors': sorted(set(errors))
+        }
+    }
+
+
+def environment(use_ffmpeg):
+    """Where the numbers came from, so reports from different commits can be compared"""
+    commit = None
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'ffmpeg': use_ffmpeg,
+        'numpy': np.__version__,
+        'soundfile': sf.__version__
+    }
+
+
+def run_bench(args):
+    if args.startup:
+        report = run_startup_benchmark(app_path=os.path.abspath(args.app), runs=args.runs, reruns=args.reruns)
+    else:
+        report = run_benchmark(
+            seconds=args.seconds,
+            files=args.files,
+            formats=args.formats,
+            recognition_workers=args.recognition_workers,
+            recognition_latency=args.recognition_latency,
+            translation_latency=args.translation_latency,
+            recognition_error_rate=args.recognition_error_rate,
+            translation_error_rate=args.translation_error_rate,
+            export_formats=args.export_formats,
+            seed=args.seed
+        )
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with io.open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"📊 Benchmark report -> {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+def add_arguments(parser):
+    parser.add_argument('--seconds', type=float, default=300, help="Length of each synthetic recording")
+    parser.add_argument('--files', type=int, default=1, help="Recordings per input format")
+    parser.add_argument('--formats', nargs='+', default=['wav', 'flac', 'mp3'], choices=sorted(SOUNDFILE_FORMATS),
+                        help="Input formats to generate")
+    parser.add_argument('--recognition-workers', type=int, default=4, help="Parallel recognition requests per file")
+    parser.add_argument('--recognition-latency', type=float, default=0.05, help="Simulated seconds per request")
+    parser.add_argument('--translation-latency', type=float, default=0.01, help="Simulated seconds per translation")
+    parser.add_argument('--recognition-error-rate', type=float, default=0.0, help="Fraction of failed requests")
+    parser.add_argument('--translation-error-rate', type=float, default=0.0,
+                        help="Fraction of failed translations")
+    parser.add_argument('--export-formats', nargs='+', choices=sorted(FORMATS),
+                        help="Export formats to time (default: every available one)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for audio, latencies and errors")
+    parser.add_argument('--startup', action='store_true',
+                        help="Time the web app's cold start and reruns instead of the pipeline")
+    parser.add_argument('--app', default=DEFAULT_APP, help="Streamlit script for --startup")
+    parser.add_argument('--runs', type=int, default=3, help="Cold starts to time with --startup")
+    parser.add_argument('--reruns', type=int, default=5, help="Reruns timed after each cold start")
+    parser.add_argument('-o', '--output', help="Write the JSON report here instead of stdout")
+    parser.set_defaults(func=run_bench)
@@ -0,0 +1,133 @@
+"""
+Persistent, content-addressed result caches.
+
+Results are stored in a small SQLite database under the user's cache
+directory (override with the HAUSA_TRANSCRIBER_CACHE environment variable).
+Each cache is bounded by the total size of its stored values and evicts the
+least recently used entries first, so repeated runs only pay for work they
+have not seen before.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from . import metrics
+
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'HAUSA_TRANSCRIBER_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'hausa_transcriber')
+)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_MISSING = object()
+
+
+class ResultCache:
+    """
+    A size-bounded LRU key/value store backed by one SQLite table.
+    Values are anything JSON can encode, including None.
+    """
+
+    def __init__(self, name, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.name = name
+        self.path = os.path.join(cache_dir, f'{name}.sqlite3')
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' key TEXT PRIMARY KEY,'
+            ' value TEXT,'
+            ' size INTEGER NOT NULL,'
+            ' last_used REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)')
+        self._db.commit()
+
+    def get(self, key, default=_MISSING):
+        """Return the cached value for ``key``, or ``default`` (raises KeyError if not given)"""
+        with self._lock:
+            row = self._db.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._db.execute('UPDATE entries SET last_used = ? WHERE key = ?', (time.time(), key))
+                self._db.commit()
+
+        metrics.inc('cache_lookups_total', cache=self.name, result='miss' if row is None else 'hit')
+        if row is not None:
+            return json.loads(row[0])
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def set(self, key, value):
+        """Store ``value`` under ``key`` and evict old entries if the cache is over its size limit"""
+        encoded = json.dumps(value, ensure_ascii=False)
+        size = len(key) + len(encoded.encode('utf-8'))
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)',
+                (key, encoded, size, time.time())
+            )
+            self._evict()
+            self._db.commit()
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._db.execute('SELECT 1 FROM entries WHERE key = ?', (key,)).fetchone() is not None
+
+    def _evict(self):
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Walk entries from least to most recently used until enough space is freed
+        excess = total - self.max_bytes
+        stale = []
+        for key, size in self._db.execute('SELECT key, size FROM entries ORDER BY last_used'):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany('DELETE FROM entries WHERE key = ?', stale)
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            entries, total = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': total}
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM entries')
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def recognition_key(pcm_bytes, sample_rate, language, settings):
+    """
+    Content address for a recognition result: the chunk's PCM bytes plus the
+    language(s) and recognizer settings that produced it.
+    """
+    digest = hashlib.sha256(pcm_bytes)
+    digest.update(json.dumps([sample_rate, language, settings], sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def translation_key(text, target_language):
+    """Content address for a translation: the source text and target language"""
+    return hashlib.sha256(json.dumps([text, target_language]).encode('utf-8')).hexdigest()
@@ -0,0 +1,118 @@
+"""
+Durable chunk-level checkpoints for long recordings.
+
+Every recognized chunk is written to a SQLite database as soon as it
+finishes, keyed by a hash of the file's contents and the settings that decide
+how it is chunked. If a run stops part way (e.g. the API starts refusing
+requests on chunk 38 of 60), running the same file again skips every
+checkpointed chunk and only recognizes what is missing. Files whose chunks are
+all checkpointed are answered without decoding the audio at all.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .cache import DEFAULT_CACHE_DIR
+
+
+READ_BLOCK_BYTES = 1 << 20
+MAX_AGE_DAYS = 30  # Checkpoints untouched for longer are removed
+
+
+def file_digest(audio_file, settings):
+    """Hash a file-like object's contents (read block by block) together with chunking settings"""
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    audio_file.seek(0)
+    while True:
+        data = audio_file.read(READ_BLOCK_BYTES)
+        if not data:
+            break
+        digest.update(data)
+    audio_file.seek(0)
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """Completed chunk results per file, safe to use from several threads"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_age_days=MAX_AGE_DAYS):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'checkpoints.sqlite3')
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            ' file_key TEXT PRIMARY KEY,'
+            ' filename TEXT,'
+            ' chunk_count INTEGER,'
+            ' updated REAL NOT NULL)'
+        )
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS chunks ('
+            ' file_key TEXT NOT NULL,'
+            ' chunk_index INTEGER NOT NULL,'
+            ' start REAL NOT NULL,'
+            ' end REAL NOT NULL,'
+            ' text TEXT,'
+            ' PRIMARY KEY (file_key, chunk_index))'
+        )
+        self._prune(max_age_days)
+        self._db.commit()
+
+    def _prune(self, max_age_days):
+        cutoff = time.time() - max_age_days * 24 * 60 * 60
+        stale = [row[0] for row in self._db.execute('SELECT file_key FROM files WHERE updated < ?', (cutoff,))]
+        for file_key in stale:
+            self._db.execute('DELETE FROM chunks WHERE file_key = ?', (file_key,))
+            self._db.execute('DELETE FROM files WHERE file_key = ?', (file_key,))
+
+    def begin(self, file_key, filename):
+        """Register a file (keeps any chunks already checkpointed for it)"""
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO files (file_key, filename, chunk_count, updated) VALUES (?, ?, NULL, ?) '
+                'ON CONFLICT (file_key) DO UPDATE SET updated = excluded.updated',
+                (file_key, filename, time.time())
+            )
+            self._db.commit()
+
+    def load(self, file_key):
+        """Return {chunk_index: (start, end, text)} for every checkpointed chunk"""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT chunk_index, start, end, text FROM chunks WHERE file_key = ?', (file_key,)
+            ).fetchall()
+        return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+    def chunk_count(self, file_key):
+        """Number of chunks in the file if every one of them has been checkpointed, else None"""
+        with self._lock:
+            row = self._db.execute('SELECT chunk_count FROM files WHERE file_key = ?', (file_key,)).fetchone()
+        return row[0] if row else None
+
+    def save_chunk(self, file_key, chunk_index, start, end, text):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO chunks (file_key, chunk_index, start, end, text) VALUES (?, ?, ?, ?, ?)',
+                (file_key, chunk_index, start, end, text)
+            )
+            self._db.commit()
+
+    def complete(self, file_key, chunk_count):
+        """Mark a file as fully recognized"""
+        with self._lock:
+            self._db.execute(
+                'UPDATE files SET chunk_count = ?, updated = ? WHERE file_key = ?',
+                (chunk_count, time.time(), file_key)
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,226 @@
+"""
+Headless command line entry point.
+
+    python -m hausa_transcriber batch <dir> --workers N -o all_transcriptions.csv
+    python -m hausa_transcriber bench --seconds 600 -o bench.json
+    python -m hausa_transcriber search "kasuwar kano" --source transcript
+    python -m hausa_transcriber worker
+
+Files are fanned out over a process pool (one process per file at a time,
+each recognizing its chunks on its own thread pool) and the combined export is
+the same one the web app's "Download All Records" button produces. Records
+are written in order as soon as every earlier file has finished.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import backends, bench, decode, metrics, worker
+from .batch import failed_result, process_file, shared_backends, shared_caches, shared_checkpoints, shared_results
+from .export import FORMATS, available_formats, format_for_path, write_records
+from .questionnaire import QUESTIONNAIRE_ENV, Questionnaire
+from .records import COMBINED_COLUMNS, combined_records, format_time_range
+from .roles import RULES_ENV, load_rules
+from .store import ResultStore
+from .transcribe import CHUNK_DURATION, CHUNK_OVERLAP
+
+
+def find_audio_files(directory, recursive=False):
+    """Supported audio files under ``directory`` in a stable (sorted) order"""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.rsplit('.', 1)[-1].lower() in decode.SUPPORTED_FORMATS:
+                paths.append(os.path.join(root, name))
+        if not recursive:
+            break
+    return paths
+
+
+def _process_path(path, filename, record_number, options):
+    recognition_cache, translation_cache = shared_caches(options['use_cache'])
+    recognizer, translator = shared_backends(options['recognizer'], options['translator'])
+    try:
+        with open(path, 'rb') as audio_file:
+            return process_file(
+                audio_file,
+                filename,
+                record_number,
+                target_language=options['target_language'],
+                recognition_workers=options['recognition_workers'],
+                recognition_cache=recognition_cache,
+                translation_cache=translation_cache,
+                use_ffmpeg=options['use_ffmpeg'],
+                checkpoints=shared_checkpoints(options['resume']),
+                recognizer=recognizer,
+                translator=translator,
+                results=shared_results(options['resume']),
+                reuse_results=options['use_cache'],
+                chunk_duration=options['chunk_duration'],
+                chunk_overlap=options['chunk_overlap']
+            )
+    except Exception as e:
+        return failed_result(record_number, filename, str(e))
+
+
+def run_batch(args):
+    paths = find_audio_files(args.directory, recursive=args.recursive)
+    if not paths:
+        print(f"No audio files found in {args.directory}", file=sys.stderr)
+        return 1
+
+    fmt = args.format or format_for_path(args.output)
+    if fmt not in available_formats():
+        print(f"❌ {FORMATS[fmt]['label']} export is not available - install its optional dependency", file=sys.stderr)
+        return 1
+
+    if args.rules:
+        try:
+            load_rules(args.rules)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not load role rules: {e}", file=sys.stderr)
+            return 1
+        # Worker processes inherit the environment and build their matcher from it
+        os.environ[RULES_ENV] = os.path.abspath(args.rules)
+
+    if args.questionnaire:
+        try:
+            Questionnaire.load(args.questionnaire)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not load questionnaire: {e}", file=sys.stderr)
+            return 1
+        os.environ[QUESTIONNAIRE_ENV] = os.path.abspath(args.questionnaire)
+
+    options = {
+        'target_language': args.target_language,
+        'recognition_workers': args.recognition_workers,
+        'chunk_duration': args.chunk_seconds,
+        'chunk_overlap': args.chunk_overlap,
+        'use_cache': not args.no_cache,
+        'resume': not args.no_resume,
+        'recognizer': args.recognizer,
+        'translator': args.translator,
+        'use_ffmpeg': decode.ffmpeg_available()
+    }
+    try:
+        # Fail before any file is processed if a backend is missing its package or model
+        shared_backends(args.recognizer, args.translator)
+    except backends.BackendError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    if not options['use_ffmpeg']:
+        print("⚠️ FFmpeg not found - only WAV/FLAC/OGG files can be decoded", file=sys.stderr)
+
+    if args.metrics_port:
+        metrics.start_metrics_server(args.metrics_port)
+        print(f"📈 Metrics at http://127.0.0.1:{args.metrics_port}/metrics", file=sys.stderr)
+
+    print(f"Processing {len(paths)} file(s) with {args.workers} worker process(es)...", file=sys.stderr)
+    started = time.time()
+    failed = 0
+
+    def ordered_results(futures):
+        """Results in record order, each released as soon as all earlier records are done"""
+        nonlocal failed
+        pending = {}
+        next_record = 1
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            # Worker processes have their own registries; fold each file's metrics into this one
+            if result.get('metrics'):
+                metrics.REGISTRY.merge(result['metrics'])
+            failed += 1 if result.get('error') else 0
+            state = f"❌ {result['error_message']}" if result.get('error') else "♻️" if result.get('from_store') else "✅"
+            print(f"[{done}/{len(paths)}] Record {result['record_number']}: {result['filename']} {state}", file=sys.stderr)
+
+            pending[result['record_number']] = result
+            while next_record in pending:
+                yield pending.pop(next_record)
+                next_record += 1
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(_process_path, path, os.path.relpath(path, args.directory), record_number, options)
+            for record_number, path in enumerate(paths, 1)
+        ]
+        write_records(combined_records(ordered_results(futures)), args.output, fmt, COMBINED_COLUMNS)
+
+    print(
+        f"🎉 {len(paths) - failed}/{len(paths)} records processed in {time.time() - started:.1f}s "
+        f"-> {args.output}",
+        file=sys.stderr
+    )
+    return 0 if failed < len(paths) else 1
+
+
+def run_search(args):
+    """Print the stored segments matching a query, best matches first"""
+    store = ResultStore()
+    try:
+        hits = store.search(args.query, source=args.source, limit=args.limit)
+    finally:
+        store.close()
+
+    for hit in hits:
+        record = f"Record {hit['record_number']}" if hit['record_number'] else "-"
+        print(f"{record}\t{hit['filename']}\t{format_time_range(hit['start'], hit['end'])}\t"
+              f"{hit['source']}\t{hit['text']}")
+    print(f"🔎 {len(hits)} matching segment(s)", file=sys.stderr)
+    return 0 if hits else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m hausa_transcriber', description="Hausa Audio Transcriber")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('batch', help="Transcribe and translate every audio file in a directory")
+    batch.add_argument('directory', help="Directory containing audio files")
+    batch.add_argument('-o', '--output', default='all_transcriptions.csv',
+                       help="Combined export to write (format taken from the extension)")
+    batch.add_argument('--format', choices=sorted(FORMATS),
+                       help="Export format, overriding the output file's extension")
+    batch.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Files processed in parallel")
+    batch.add_argument('--recognition-workers', type=int, default=4,
+                       help="Parallel recognition requests per file")
+    batch.add_argument('--chunk-seconds', type=float, default=CHUNK_DURATION,
+                       help="Most seconds of speech per recognition request (shorter = faster, more requests)")
+    batch.add_argument('--chunk-overlap', type=float, default=CHUNK_OVERLAP,
+                       help="Seconds repeated where speech is cut between chunks (0 turns stitching off)")
+    batch.add_argument('--target-language', default='en', help="Translation target language code")
+    batch.add_argument('--recursive', action='store_true', help="Include files in subdirectories")
+    batch.add_argument('--no-cache', action='store_true',
+                       help="Do not reuse cached recognition/translation results, checkpoints or stored files")
+    batch.add_argument('--no-resume', action='store_true',
+                       help="Do not checkpoint chunks or store results (nothing is resumed or reused)")
+    batch.add_argument('--recognizer', default=backends.DEFAULT_RECOGNIZER, choices=sorted(backends.RECOGNIZERS),
+                       help="Speech recognition backend")
+    batch.add_argument('--translator', default=backends.DEFAULT_TRANSLATOR, choices=sorted(backends.TRANSLATORS),
+                       help="Translation backend")
+    batch.add_argument('--rules', help="JSON file with speaker role / question keyword rules")
+    batch.add_argument('--questionnaire',
+                       help="CSV/JSON file of question codes with Hausa and English wording (fills 'Question Code')")
+    batch.add_argument('--metrics-port', type=int, help="Serve Prometheus metrics on this local port while running")
+    batch.set_defaults(func=run_batch)
+
+    benchmark = commands.add_parser('bench', help="Benchmark the pipeline offline on synthetic recordings")
+    bench.add_arguments(benchmark)
+
+    search = commands.add_parser('search', help="Search stored transcripts and translations")
+    search.add_argument('query', help='Words to find; quote a "phrase", end a word with * to match its start')
+    search.add_argument('--source', choices=['transcript', 'translation'], help="Only search one of the two")
+    search.add_argument('--limit', type=int, default=50, help="Most matching segments to print")
+    search.set_defaults(func=run_search)
+
+    queue_worker = commands.add_parser('worker', help="Process files the web app submits to the shared job queue")
+    worker.add_arguments(queue_worker)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,248 @@
+"""
+Streaming audio decoding.
+
+Uploads are decoded straight into 16 kHz mono 16-bit PCM blocks that feed
+the voice activity detector - the rate speech recognition needs, so a 44.1 kHz
+stereo export is not uploaded at five times the size. Compressed formats are
+piped through a single ffmpeg process (upload bytes in on stdin, raw PCM out
+on stdout), so no intermediate WAV files are written and memory stays bounded
+for very long recordings. Natively read formats are downmixed and resampled
+block by block with soxr.
+"""
+
+import os
+import subprocess
+import tempfile
+import threading
+
+import numpy as np
+
+
+FFMPEG_BINARY = 'ffmpeg'    # Replaced with the local binary path when one is bundled
+DECODE_SAMPLE_RATE = 16000  # Output rate of every PCM stream
+BLOCK_SECONDS = 5           # Audio per PCM block handed to the segmenter
+READ_BLOCK_BYTES = 1 << 20  # Upload bytes copied per write
+SPOOL_MEMORY_BYTES = 1 << 20  # Spooled uploads larger than this are written to disk
+
+# Read natively by soundfile, no ffmpeg process needed
+NATIVE_FORMATS = {'wav', 'flac', 'ogg'}
+
+# MP4-family containers may keep their index at the end of the file, so
+# ffmpeg has to be able to seek - these are spooled to disk instead of piped
+SEEKABLE_CONTAINERS = {'m4a', 'mp4', '3gp', 'mov'}
+
+
+# Everything ffmpeg is expected to decode
+SUPPORTED_FORMATS = {
+    'wav', 'mp3', 'm4a', 'amr', 'aac', '3gp', 'ogg', 'flac', 'wma', 'webm',
+    'opus', 'aiff', 'au', 'mp2', 'mp4', 'mkv', 'avi'
+}
+
+
+class DecodeError(Exception):
+    """Raised when an audio file cannot be decoded"""
+
+
+class PcmStream:
+    """
+    An iterable of mono int16 NumPy blocks at ``sample_rate``.
+    ``duration`` is the length in seconds when known up front, otherwise None.
+    """
+
+    def __init__(self, sample_rate, blocks, duration=None, close=None):
+        self.sample_rate = sample_rate
+        self.duration = duration
+        self._blocks = blocks
+        self._close = close
+
+    def __iter__(self):
+        return iter(self._blocks)
+
+    def close(self):
+        if self._close is not None:
+            self._close()
+            self._close = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def ffmpeg_available():
+    """Check whether FFMPEG_BINARY can be run"""
+    try:
+        subprocess.run([FFMPEG_BINARY, '-version'], capture_output=True, timeout=2, check=True)
+        return True
+    except (subprocess.SubprocessError, OSError):
+        return False
+
+
+def to_mono(block):
+    """Downmix an int16 (frames, channels) block to a 1-D mono int16 block"""
+    if block.ndim == 1:
+        return block
+    if block.shape[1] == 1:
+        return block[:, 0]
+    return block.mean(axis=1, dtype=np.float32).astype(np.int16)
+
+
+def resample_blocks(blocks, source_rate, target_rate=DECODE_SAMPLE_RATE):
+    """
+    Resample mono int16 blocks through one soxr stream, so block boundaries
+    leave no seams; yields int16 blocks at ``target_rate``.
+    """
+    import soxr
+
+    resampler = soxr.ResampleStream(source_rate, target_rate, 1, dtype='int16')
+    for block in blocks:
+        resampled = resampler.resample_chunk(block)
+        if len(resampled):
+            yield resampled
+    tail = resampler.resample_chunk(np.zeros(0, dtype=np.int16), last=True)
+    if len(tail):
+        yield tail
+
+
+def open_pcm_stream(audio_file, file_ext, use_ffmpeg=True, block_seconds=BLOCK_SECONDS):
+    """
+    Open a file-like upload as a 16 kHz mono PcmStream.
+
+    WAV/FLAC/OGG are read in blocks with soundfile. Everything else (and
+    anything soundfile cannot read) goes through ffmpeg when ``use_ffmpeg``.
+    """
+    file_ext = file_ext.lower()
+
+    if file_ext in NATIVE_FORMATS or not use_ffmpeg:
+        try:
+            return _soundfile_stream(audio_file, block_seconds)
+        except Exception as e:
+            if not use_ffmpeg:
+                raise DecodeError(f"Unable to decode {file_ext.upper()} without FFmpeg: {e}")
+            audio_file.seek(0)
+
+    return _ffmpeg_stream(audio_file, file_ext, DECODE_SAMPLE_RATE, block_seconds)
+
+
+def _soundfile_stream(audio_file, block_seconds):
+    import soundfile as sf
+
+    sound = sf.SoundFile(audio_file)
+    sample_rate = sound.samplerate
+    duration = sound.frames / float(sample_rate) if sound.frames > 0 else None
+
+    def blocks():
+        for block in sound.blocks(blocksize=int(sample_rate * block_seconds), dtype='int16', always_2d=True):
+            yield to_mono(block)
+
+    if sample_rate != DECODE_SAMPLE_RATE:
+        return PcmStream(DECODE_SAMPLE_RATE, resample_blocks(blocks(), sample_rate),
+                         duration=duration, close=sound.close)
+    return PcmStream(sample_rate, blocks(), duration=duration, close=sound.close)
+
+
+def _copy_blocks(audio_file, target):
+    """Copy a file-like object into ``target`` one block at a time"""
+    while True:
+        data = audio_file.read(READ_BLOCK_BYTES)
+        if not data:
+            break
+        target.write(data)
+
+
+def spool_upload(upload, max_memory=SPOOL_MEMORY_BYTES):
+    """
+    Copy a file-like upload into a spooled temporary file, one block at a
+    time, and return it rewound. Only small uploads stay in memory; the
+    caller closes the spool (which deletes it) when done.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    try:
+        upload.seek(0)
+        _copy_blocks(upload, spool)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+def _ffmpeg_stream(audio_file, file_ext, sample_rate, block_seconds):
+    tmp_path = None
+    if file_ext in SEEKABLE_CONTAINERS:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_ext}') as tmp:
+            _copy_blocks(audio_file, tmp)
+            tmp_path = tmp.name
+        source = tmp_path
+    else:
+        source = 'pipe:0'
+
+    cmd = [
+        FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error',
+        '-i', source,
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ac', '1', '-ar', str(sample_rate),
+        'pipe:1'
+    ]
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL if tmp_path else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+    except OSError as e:
+        if tmp_path:
+            os.unlink(tmp_path)
+        raise DecodeError(f"FFmpeg could not be started: {e}")
+
+    stderr_chunks = []
+    threads = [threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)]
+
+    if not tmp_path:
+        def feed():
+            try:
+                _copy_blocks(audio_file, proc.stdin)
+            except (BrokenPipeError, OSError):
+                pass  # ffmpeg stopped reading (bad input or stream closed early)
+            finally:
+                try:
+                    proc.stdin.close()
+                except OSError:
+                    pass
+        threads.append(threading.Thread(target=feed, daemon=True))
+
+    for thread in threads:
+        thread.start()
+
+    def blocks():
+        block_bytes = int(sample_rate * block_seconds) * 2
+        decoded_any = False
+        while True:
+            data = proc.stdout.read(block_bytes)
+            if not data:
+                break
+            if len(data) % 2:
+                data = data[:-1]
+            decoded_any = True
+            yield np.frombuffer(data, dtype=np.int16)
+
+        proc.wait()
+        if proc.returncode != 0 and not decoded_any:
+            for thread in threads:
+                thread.join(timeout=1)
+            message = b''.join(stderr_chunks).decode('utf-8', 'replace').strip()
+            raise DecodeError(f"FFmpeg could not decode {file_ext.upper()}: {message or 'unknown error'}")
+
+    def close():
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        proc.stdout.close()
+        for thread in threads:
+            thread.join(timeout=1)
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+    return PcmStream(sample_rate, blocks(), close=close)
@@ -0,0 +1,159 @@
+"""
+Streaming exports of tabular records.
+
+Records (dicts keyed by column name, e.g. from records.combined_records) are
+written to the output as they are produced, a chunk of rows at a time, so
+memory stays flat however large the batch is. Supported formats are CSV,
+JSON Lines, Parquet (one row group per chunk; needs pyarrow) and XLSX
+(openpyxl's write-only mode). The web app and the CLI share these writers.
+"""
+
+import codecs
+import csv
+import json
+import os
+import tempfile
+from importlib.util import find_spec
+
+# pyarrow and openpyxl are only imported when a Parquet/XLSX export is written
+PARQUET_AVAILABLE = find_spec('pyarrow') is not None
+XLSX_AVAILABLE = find_spec('openpyxl') is not None
+
+
+CHUNK_ROWS = 1000           # Rows buffered per write (and per Parquet row group)
+SPOOL_MAX_BYTES = 8 << 20   # In-memory export payloads larger than this spill to disk
+
+FORMATS = {
+    'csv': {'label': 'CSV', 'extension': 'csv', 'mime': 'text/csv'},
+    'jsonl': {'label': 'JSONL', 'extension': 'jsonl', 'mime': 'application/x-ndjson'},
+    'parquet': {'label': 'Parquet', 'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'xlsx': {
+        'label': 'XLSX',
+        'extension': 'xlsx',
+        'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    },
+}
+
+
+class ExportError(Exception):
+    """The requested export format cannot be written"""
+
+
+def available_formats():
+    """Format names whose optional dependencies are installed"""
+    missing = set()
+    if not PARQUET_AVAILABLE:
+        missing.add('parquet')
+    if not XLSX_AVAILABLE:
+        missing.add('xlsx')
+    return [fmt for fmt in FORMATS if fmt not in missing]
+
+
+def format_for_path(path, default='csv'):
+    """Export format implied by a file name's extension"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    for fmt, info in FORMATS.items():
+        if extension == info['extension']:
+            return fmt
+    return default
+
+
+def _chunks(records, columns, chunk_rows):
+    chunk = []
+    for record in records:
+        chunk.append([record.get(column, '') for column in columns])
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_csv(records, out, columns, chunk_rows):
+    text = codecs.getwriter('utf-8')(out)
+    writer = csv.writer(text, lineterminator='\n')
+    writer.writerow(columns)
+    count = 0
+    for chunk in _chunks(records, columns, chunk_rows):
+        writer.writerows(chunk)
+        count += len(chunk)
+    return count
+
+
+def _write_jsonl(records, out, columns, chunk_rows):
+    count = 0
+    for chunk in _chunks(records, columns, chunk_rows):
+        lines = (json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in chunk)
+        out.write(''.join(lines).encode('utf-8'))
+        count += len(chunk)
+    return count
+
+
+def _write_parquet(records, out, columns, chunk_rows):
+    if not PARQUET_AVAILABLE:
+        raise ExportError("Parquet export needs pyarrow (pip install pyarrow)")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    count = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        for chunk in _chunks(records, columns, chunk_rows):
+            arrays = [
+                pa.array([None if row[i] is None else str(row[i]) for row in chunk], pa.string())
+                for i in range(len(columns))
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema), row_group_size=chunk_rows)
+            count += len(chunk)
+    return count
+
+
+def _write_xlsx(records, out, columns, chunk_rows):
+    if not XLSX_AVAILABLE:
+        raise ExportError("Excel export needs openpyxl (pip install openpyxl)")
+    from openpyxl import Workbook
+
+    # Write-only workbooks stream rows to a temporary file instead of keeping cells in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Records')
+    sheet.append(columns)
+    count = 0
+    for chunk in _chunks(records, columns, chunk_rows):
+        for row in chunk:
+            sheet.append(row)
+        count += len(chunk)
+    workbook.save(out)
+    return count
+
+
+_WRITERS = {
+    'csv': _write_csv,
+    'jsonl': _write_jsonl,
+    'parquet': _write_parquet,
+    'xlsx': _write_xlsx,
+}
+
+
+def write_records(records, out, fmt, columns, chunk_rows=CHUNK_ROWS):
+    """
+    Write an iterable of record dicts to ``out`` (a path or a binary file
+    object) in ``fmt``, ``chunk_rows`` rows at a time. Returns the row count.
+    """
+    if fmt not in _WRITERS:
+        raise ExportError(f"Unknown export format: {fmt}")
+
+    if isinstance(out, (str, os.PathLike)):
+        with open(out, 'wb') as f:
+            return _WRITERS[fmt](records, f, columns, chunk_rows)
+    return _WRITERS[fmt](records, out, columns, chunk_rows)
+
+
+def export_file(records, fmt, columns, chunk_rows=CHUNK_ROWS):
+    """
+    Export to a spooled temporary file (kept in memory while small) and
+    return it rewound, ready to hand to a download or upload.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    write_records(records, spool, fmt, columns, chunk_rows)
+    spool.seek(0)
+    return spool
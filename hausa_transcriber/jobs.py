@@ -0,0 +1,173 @@
+"""
+In-process background job queue.
+
+The web app hands each batch of uploads to a JobManager instead of
+transcribing inside the Streamlit script run. Jobs wait in a queue, worker
+threads process them file by file, and the page only polls a job's status and
+progress - so reruns, widget clicks and browser refreshes do not interrupt the
+work, and several users can submit batches at the same time. The file being
+processed publishes its segments to a live.LiveTranscript as they are
+recognized and translated, so the page can show them before the file is done.
+"""
+
+import queue
+import threading
+import time
+import uuid
+
+from .batch import failed_result, process_file
+from .live import LiveTranscript
+from .transcribe import CHUNK_DURATION, CHUNK_OVERLAP
+
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+KEEP_FINISHED_SECONDS = 6 * 60 * 60  # Finished jobs are forgotten after this long
+
+
+class Job:
+    """One submitted batch of files and its progress"""
+
+    def __init__(self, files, options):
+        self.id = uuid.uuid4().hex[:12]
+        self.files = files              # List of (filename, file-like) pairs, closed when the job ends
+        self.options = options
+        self.status = QUEUED
+        self.created = time.time()
+        self.finished = None
+        self.results = []
+        self.current_file = None        # 1-based index of the file being processed
+        self.stage = None
+        self.stage_progress = None      # 0..1 within the current file, None if unknown
+        self.detail = ''
+        self.live = None                # LiveTranscript of the file being processed
+        self.error = None
+
+    @property
+    def total(self):
+        return len(self.files)
+
+    @property
+    def progress(self):
+        """Overall progress 0..1 across all files"""
+        done = len(self.results)
+        if self.status in (DONE, FAILED) or not self.total:
+            return 1.0
+        return min((done + (self.stage_progress or 0.0) * 0.9) / self.total, 1.0)
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def live_segments(self):
+        """Segments of the current file recognized so far (see LiveTranscript.rows)"""
+        live = self.live
+        return live.rows() if live is not None else []
+
+
+class JobManager:
+    """Queue of jobs processed by a fixed number of daemon worker threads"""
+
+    def __init__(self, workers=2):
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        for _ in range(max(1, workers)):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, files, options):
+        """Queue a batch of (filename, file-like) pairs; returns the job ID"""
+        job = Job(files, options)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._queue.put(job)
+        return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job_id):
+        """How many queued jobs are ahead of this one (0 when running)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return 0
+            return sum(1 for other in self._jobs.values() if other.status == QUEUED and other.created < job.created)
+
+    def _prune(self):
+        cutoff = time.time() - KEEP_FINISHED_SECONDS
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._run(job)
+            except Exception as e:
+                job.error = str(e)
+                job.status = FAILED
+            finally:
+                job.finished = time.time()
+                for _, audio_file in job.files:
+                    audio_file.close()  # Deletes spooled uploads
+                job.files = []
+                self._queue.task_done()
+
+    def _run(self, job):
+        job.status = RUNNING
+        options = job.options
+
+        for file_idx, (filename, audio_file) in enumerate(job.files, 1):
+            job.current_file = file_idx
+            job.stage = 'transcribing'
+            job.stage_progress = None
+            job.detail = ''
+            job.live = LiveTranscript()
+
+            def on_progress(stage, fraction, detail):
+                job.stage = stage
+                job.stage_progress = fraction
+                job.detail = detail
+
+            try:
+                result = process_file(
+                    audio_file,
+                    filename,
+                    file_idx,
+                    target_language=options.get('target_language', 'en'),
+                    recognition_workers=options.get('recognition_workers', 4),
+                    recognition_cache=options.get('recognition_cache'),
+                    translation_cache=options.get('translation_cache'),
+                    use_ffmpeg=options.get('use_ffmpeg', True),
+                    progress_callback=on_progress,
+                    checkpoints=options.get('checkpoints'),
+                    recognizer=options.get('recognizer'),
+                    translator=options.get('translator'),
+                    results=options.get('results'),
+                    reuse_results=options.get('reuse_results', True),
+                    chunk_duration=options.get('chunk_duration', CHUNK_DURATION),
+                    chunk_overlap=options.get('chunk_overlap', CHUNK_OVERLAP),
+                    live=job.live
+                )
+            except Exception as e:
+                result = failed_result(file_idx, filename, str(e))
+
+            # With a ResultStore the job keeps only summaries; text and segments are read from the store
+            if options.get('results') is not None:
+                result = options['results'].add_to_batch(job.id, result)
+            job.results.append(result)
+
+        job.current_file = None
+        job.stage = None
+        job.live = None
+        job.status = DONE
@@ -0,0 +1,118 @@
+"""
+Per-file language selection for speech recognition.
+
+Recordings are mostly in one language, so instead of sending every chunk as
+Hausa and then again as English, the first few chunks of a file are probed in
+every candidate language. Their confidence scores pick the dominant language,
+and the remaining chunks are recognized in that language only. The other
+languages are tried only when the result's confidence is actually low.
+"""
+
+import threading
+
+from . import metrics
+
+
+DEFAULT_LANGUAGES = ('ha', 'en')
+PROBE_CHUNKS = 3            # Chunks recognized in every language at the start of a file
+LOW_CONFIDENCE = 0.6        # Below this, the next language is tried as a fallback
+DEFAULT_CONFIDENCE = 0.5    # Probe score of a result reported without a confidence
+
+
+def parse_response(response):
+    """
+    Return (text, confidence) from a ``show_all=True`` recognize_google response.
+    Unrecognized audio gives (None, 0.0); the confidence is None when the
+    service did not report one (Google often leaves it out).
+    """
+    if not isinstance(response, dict):
+        return None, 0.0
+    for alternative in response.get('alternative', []):
+        text = alternative.get('transcript', '').strip()
+        if text:
+            return text, alternative.get('confidence')
+    return None, 0.0
+
+
+def _score(confidence):
+    return DEFAULT_CONFIDENCE if confidence is None else confidence
+
+
+class LanguagePlan:
+    """
+    Language choice for one file, shared by all recognition threads.
+
+    ``recognize(request, audio_data)`` calls ``request(audio_data, language)``
+    (which must return a show_all response) and returns (text, language).
+    """
+
+    def __init__(self, languages=DEFAULT_LANGUAGES, probe_chunks=PROBE_CHUNKS, low_confidence=LOW_CONFIDENCE):
+        self.languages = list(languages)
+        self.probe_chunks = probe_chunks
+        self.low_confidence = low_confidence
+        self.scores = {language: 0.0 for language in self.languages}
+        self.requests = 0
+
+        self._lock = threading.Lock()
+        self._started = 0
+        self._finished = 0
+        self._decided = threading.Event()
+        if probe_chunks <= 0 or len(self.languages) < 2:
+            self._decided.set()
+
+    def order(self):
+        """Languages from most to least likely (ties keep the configured preference)"""
+        with self._lock:
+            return sorted(self.languages, key=lambda language: -self.scores[language])
+
+    @property
+    def language(self):
+        return self.order()[0]
+
+    def _request(self, request, audio_data, language):
+        with self._lock:
+            self.requests += 1
+        return parse_response(request(audio_data, language))
+
+    def recognize(self, request, audio_data):
+        with self._lock:
+            probing = not self._decided.is_set() and self._started < self.probe_chunks
+            if probing:
+                self._started += 1
+
+        if probing:
+            return self._probe(request, audio_data)
+
+        # Wait for the probes so the rest of the file uses the dominant language
+        self._decided.wait()
+
+        best = (None, 0.0, None)
+        for attempt, language in enumerate(self.order()):
+            if attempt:
+                metrics.inc('retries_total', service='recognition', reason='language_fallback')
+            text, confidence = self._request(request, audio_data, language)
+            # No reported confidence is not a low one - it does not justify another request
+            if text and (confidence is None or confidence >= self.low_confidence):
+                return text, language
+            if text and (best[0] is None or confidence > best[1]):
+                best = (text, confidence, language)
+        return best[0], best[2]
+
+    def _probe(self, request, audio_data):
+        try:
+            results = {}
+            for language in self.languages:
+                results[language] = self._request(request, audio_data, language)
+
+            with self._lock:
+                for language, (text, confidence) in results.items():
+                    if text:
+                        self.scores[language] += _score(confidence)
+
+            language = max(self.languages, key=lambda lang: _score(results[lang][1]))
+            return results[language][0], (language if results[language][0] else None)
+        finally:
+            with self._lock:
+                self._finished += 1
+                if self._finished >= self.probe_chunks:
+                    self._decided.set()
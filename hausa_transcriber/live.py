@@ -0,0 +1,60 @@
+"""
+Partial results of the file being processed, for showing while it runs.
+
+A LiveTranscript is the channel between the thread processing a file and
+whoever displays it. The processing side publishes each chunk's text as soon
+as the chunk is recognized, the stitched segments once transcription is done
+and each translation as it arrives (see batch.process_file). The page reads
+``rows()`` whenever it polls; reading never consumes anything, so any number
+of browser sessions can follow the same file, and a refreshed page picks up
+every row published so far.
+"""
+
+import threading
+
+from .stitch import stitch_segments
+
+
+class LiveTranscript:
+    """Thread-safe, append-only view of one file's transcript while it is processed"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chunks = {}           # Chunk index -> (start, end, text)
+        self._segments = None       # Final stitched segments, once transcription is done
+        self._translations = {}     # Segment text -> translation
+
+    def add_chunk(self, idx, start, end, text):
+        """A recognized chunk (``text`` is None when nothing was heard)"""
+        with self._lock:
+            self._chunks[idx] = (start, end, text)
+
+    def set_segments(self, segments):
+        """The file's stitched transcript segments, replacing the chunks published so far"""
+        with self._lock:
+            self._segments = [dict(seg) for seg in segments]
+
+    def add_translation(self, text, translation):
+        """Translation of a segment text (None when it failed)"""
+        if translation is None:
+            return
+        with self._lock:
+            self._translations[text] = translation
+
+    def rows(self):
+        """
+        Segments so far in timestamp order, as dicts with 'start', 'end',
+        'text' and 'translation' ('' until it arrives).
+        """
+        with self._lock:
+            segments = self._segments
+            chunks = sorted(self._chunks.items())
+            translations = dict(self._translations)
+
+        if segments is None:
+            # Neighbours that both arrived are stitched already; a gap stays until its chunk is in
+            segments = stitch_segments({'start': start, 'end': end, 'text': text} for _, (start, end, text) in chunks)
+        return [
+            {'start': seg['start'], 'end': seg['end'], 'text': seg['text'], 'translation': translations.get(seg['text'], '')}
+            for seg in segments
+        ]
@@ -0,0 +1,283 @@
+"""
+Per-stage timers and counters with a Prometheus text endpoint.
+
+Instrumented code calls ``observe``/``inc``/``timer`` without knowing who
+listens. While a file is processed, its measurements go to a per-file
+Registry (see ``collect``) that becomes the result's 'metrics' snapshot and
+is then merged into the process-wide REGISTRY. Outside of ``collect`` they
+go to REGISTRY directly. ``start_metrics_server(port)`` serves REGISTRY in
+the Prometheus text format on http://127.0.0.1:<port>/metrics.
+
+Histograms use fixed buckets, so snapshots from worker processes (the batch
+CLI) merge into the parent's registry without losing anything.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+PREFIX = 'hausa_transcriber_'
+
+# Seconds; covers a cache lookup up to a long file
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+HELP = {
+    'stage_seconds': "Time spent in each processing stage",
+    'requests_total': "Requests sent to external services by outcome",
+    'retries_total': "Requests re-sent for the same input",
+    'upload_bytes_total': "Bytes sent to external services (PCM audio, UTF-8 text)",
+    'cache_lookups_total': "Result cache lookups by cache and result",
+    'files_total': "Files processed by outcome",
+    'queue_tasks_total': "Queued file tasks finished by workers, by outcome",
+}
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Registry:
+    """Counters and fixed-bucket histograms, keyed by metric name and labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}     # (name, labels) -> value
+        self._histograms = {}   # (name, labels) -> [bucket counts..., sum, count]
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            key = (name, _key(labels))
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        with self._lock:
+            key = (name, _key(labels))
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [0] * len(BUCKETS) + [0.0, 0]
+            for idx, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    entry[idx] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def total(self, name, **labels):
+        """Sum of a counter over every label set that includes ``labels``"""
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(
+                value for (counter, counter_labels), value in self._counters.items()
+                if counter == name and wanted <= set(counter_labels)
+            )
+
+    def snapshot(self):
+        """Plain (picklable, JSON-friendly) copy of every metric"""
+        with self._lock:
+            return {
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self._counters.items()
+                ],
+                'histograms': [
+                    {'name': name, 'labels': dict(labels), 'buckets': entry[:-2], 'sum': entry[-2], 'count': entry[-1]}
+                    for (name, labels), entry in self._histograms.items()
+                ]
+            }
+
+    def merge(self, snapshot):
+        """Add a snapshot (e.g. from a per-file registry or a worker process) into this registry"""
+        with self._lock:
+            for counter in snapshot.get('counters', []):
+                key = (counter['name'], _key(counter['labels']))
+                self._counters[key] = self._counters.get(key, 0) + counter['value']
+            for histogram in snapshot.get('histograms', []):
+                key = (histogram['name'], _key(histogram['labels']))
+                entry = self._histograms.get(key)
+                if entry is None:
+                    entry = self._histograms[key] = [0] * len(BUCKETS) + [0.0, 0]
+                for idx, count in enumerate(histogram['buckets']):
+                    entry[idx] += count
+                entry[-2] += histogram['sum']
+                entry[-1] += histogram['count']
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        snapshot = self.snapshot()
+        lines = []
+        described = set()
+
+        def describe(name, kind):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {PREFIX}{name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        for counter in sorted(snapshot['counters'], key=lambda c: (c['name'], sorted(c['labels'].items()))):
+            describe(counter['name'], 'counter')
+            lines.append(f"{PREFIX}{counter['name']}{_labels(counter['labels'])} {counter['value']}")
+
+        for histogram in sorted(snapshot['histograms'], key=lambda h: (h['name'], sorted(h['labels'].items()))):
+            name, labels = histogram['name'], histogram['labels']
+            describe(name, 'histogram')
+            # Stored bucket counts are already cumulative (every bound >= the value is incremented)
+            for bound, count in zip(BUCKETS, histogram['buckets']):
+                lines.append(f"{PREFIX}{name}_bucket{_labels(labels, le=repr(bound))} {count}")
+            lines.append(f"{PREFIX}{name}_bucket{_labels(labels, le='+Inf')} {histogram['count']}")
+            lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {histogram['sum']:.6f}")
+            lines.append(f"{PREFIX}{name}_count{_labels(labels)} {histogram['count']}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **extra):
+    labels = {**labels, **extra}
+    if not labels:
+        return ''
+    escaped = (
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in sorted(labels.items())
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+REGISTRY = Registry()
+_current = contextvars.ContextVar('hausa_transcriber_metrics', default=None)
+
+
+def _target():
+    return _current.get() or REGISTRY
+
+
+def inc(name, amount=1, **labels):
+    _target().inc(name, amount, **labels)
+
+
+def observe(name, value, **labels):
+    _target().observe(name, value, **labels)
+
+
+@contextmanager
+def timer(stage, **labels):
+    """Observe the block's wall time as ``stage_seconds{stage=...}``"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe('stage_seconds', time.perf_counter() - started, stage=stage, **labels)
+
+
+class TimedIterator:
+    """
+    Iterate ``iterable`` while adding up the time spent producing items;
+    ``exclude`` subtracts the time of an inner TimedIterator it pulls from.
+    The total is observed as one ``stage_seconds`` sample when iteration ends.
+    """
+
+    def __init__(self, iterable, stage, exclude=None):
+        self._iterator = iter(iterable)
+        self.stage = stage
+        self.exclude = exclude
+        self.seconds = 0.0
+        self._observed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            item = next(self._iterator)
+        except StopIteration:
+            self.seconds += time.perf_counter() - started
+            self.finish()
+            raise
+        self.seconds += time.perf_counter() - started
+        return item
+
+    def finish(self):
+        if not self._observed:
+            self._observed = True
+            own = self.seconds - (self.exclude.seconds if self.exclude is not None else 0.0)
+            observe('stage_seconds', max(own, 0.0), stage=self.stage)
+
+
+@contextmanager
+def collect():
+    """
+    Route measurements made in this context (and in threads started with a
+    copy of it) to a fresh Registry, which is yielded. It is merged into
+    REGISTRY when the block ends.
+    """
+    registry = Registry()
+    token = _current.set(registry)
+    try:
+        yield registry
+    finally:
+        _current.reset(token)
+        REGISTRY.merge(registry.snapshot())
+
+
+def submit(pool, fn, *args):
+    """``pool.submit`` that keeps the caller's metrics context in the worker thread"""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def job_summary(snapshots):
+    """
+    Totals across the per-file snapshots of a job: 'stages' rows (calls,
+    total and mean seconds, slowest first) and the main counter totals.
+    """
+    registry = Registry()
+    for snapshot in snapshots:
+        if snapshot:
+            registry.merge(snapshot)
+
+    stages = {}
+    for (name, labels), entry in registry._histograms.items():
+        if name == 'stage_seconds':
+            stage = dict(labels).get('stage')
+            row = stages.setdefault(stage, {'Stage': stage, 'Calls': 0, 'Total (s)': 0.0})
+            row['Calls'] += entry[-1]
+            row['Total (s)'] += entry[-2]
+    rows = sorted(stages.values(), key=lambda row: -row['Total (s)'])
+    for row in rows:
+        row['Mean (s)'] = round(row['Total (s)'] / row['Calls'], 3) if row['Calls'] else 0.0
+        row['Total (s)'] = round(row['Total (s)'], 3)
+
+    return {
+        'stages': rows,
+        'recognition_requests': registry.total('requests_total', service='recognition'),
+        'translation_requests': registry.total('requests_total', service='translation'),
+        'failed_requests': registry.total('requests_total', outcome='error'),
+        'retries': registry.total('retries_total'),
+        'upload_bytes': registry.total('upload_bytes_total'),
+        'cache_hits': registry.total('cache_lookups_total', result='hit'),
+        'cache_misses': registry.total('cache_lookups_total', result='miss')
+    }
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes would otherwise be logged to stderr
+
+
+def start_metrics_server(port, host='127.0.0.1'):
+    """Serve REGISTRY at http://host:port/metrics from a daemon thread; returns the server"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,157 @@
+"""
+Survey questionnaire index: which question a transcript segment belongs to.
+
+A questionnaire file lists every question's code with its Hausa and English
+wording, either as CSV with ``code``, ``hausa`` and ``english`` columns or as
+a JSON list of objects with those keys. When the file is loaded, each
+wording is folded like search text (search.fold) and cut into character
+4-grams, and an inverted index maps every 4-gram to the wordings that
+contain it. A segment is matched by looking up its own 4-grams once:
+
+- a wording's score is the share of its 4-grams found in the segment, so a
+  segment holding a question followed by its answer still scores fully, and
+  recognition errors only cost the 4-grams they touch
+- a question code read out loud ("Q12", "q 12") matches its question outright
+
+Segments that match no question are taken to answer the last question matched
+before them. Point the app at a questionnaire with the
+HAUSA_TRANSCRIBER_QUESTIONNAIRE environment variable (or pass
+``--questionnaire`` to the CLI).
+"""
+
+import csv
+import json
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from .search import fold
+
+
+QUESTIONNAIRE_ENV = 'HAUSA_TRANSCRIBER_QUESTIONNAIRE'
+
+NGRAM = 4           # Characters per indexed gram (3 matches unrelated Hausa far too often)
+MIN_SCORE = 0.65    # Share of a wording's grams a segment must contain to match it
+MIN_GRAMS = 6       # ...and at least this many of them (short wordings match too easily)
+
+_FIELDS = ('code', 'hausa', 'english')
+_NON_WORD = re.compile(r'[\W_]+')
+_SPOKEN_CODE = re.compile(r'\b([a-z]{1,2}) ?(\d{1,3}[a-z]?)\b')
+
+
+def _grams(folded):
+    """Distinct character n-grams of folded text, words separated by single spaces"""
+    text = ' ' + _NON_WORD.sub(' ', folded).strip() + ' '
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _normalize_code(code):
+    return _NON_WORD.sub('', fold(code))
+
+
+def _read_questions(path):
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if path.lower().endswith('.json'):
+            rows = json.load(f)
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                raise ValueError(f"{path} must hold a JSON list of question objects")
+        else:
+            rows = list(csv.DictReader(f))
+
+    questions = []
+    for number, row in enumerate(rows, 1):
+        row = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+        question = {field: str(row.get(field) or '').strip() for field in _FIELDS}
+        if not question['code']:
+            raise ValueError(f"Question {number} in {path} has no code")
+        if not question['hausa'] and not question['english']:
+            raise ValueError(f"Question '{question['code']}' in {path} has no wording")
+        questions.append(question)
+    if not questions:
+        raise ValueError(f"{path} lists no questions")
+    return questions
+
+
+class Questionnaire:
+    """Character n-gram index over a questionnaire's wordings; use ``match`` and ``question_codes``"""
+
+    def __init__(self, questions):
+        self.questions = list(questions)
+        self._codes = {}
+        self._wording_question = []   # Question index of each indexed wording
+        sizes = []
+        postings = {}
+
+        for number, question in enumerate(self.questions):
+            self._codes.setdefault(_normalize_code(question['code']), number)
+            for language in ('hausa', 'english'):
+                grams = _grams(fold(question.get(language, '')))
+                if not grams:
+                    continue
+                wording = len(self._wording_question)
+                self._wording_question.append(number)
+                sizes.append(len(grams))
+                for gram in grams:
+                    postings.setdefault(gram, []).append(wording)
+
+        self._index = {gram: np.array(wordings, dtype=np.int32) for gram, wordings in postings.items()}
+        self._sizes = np.array(sizes, dtype=np.float64)
+        self._min_hits = np.minimum(self._sizes, MIN_GRAMS)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a questionnaire file (CSV or .json). Raises OSError when it cannot
+        be read and ValueError when a question has no code or no wording.
+        """
+        return cls(_read_questions(path))
+
+    def match(self, text):
+        """``(code, score)`` of the question ``text`` most likely belongs to, or None"""
+        folded = fold(text)
+        for letters, digits in _SPOKEN_CODE.findall(folded):
+            number = self._codes.get(letters + digits)
+            if number is not None:
+                return self.questions[number]['code'], 1.0
+
+        postings = [self._index[gram] for gram in _grams(folded) if gram in self._index]
+        if not postings:
+            return None
+        hits = np.bincount(np.concatenate(postings), minlength=len(self._sizes))
+        scores = np.where(hits >= self._min_hits, hits / self._sizes, 0.0)
+        # Ties go to the wording with more matched grams (the longer, more specific one)
+        best = int(np.lexsort((hits, scores))[-1])
+        if scores[best] < MIN_SCORE:
+            return None
+        return self.questions[self._wording_question[best]]['code'], float(scores[best])
+
+    def question_codes(self, texts, translations=None):
+        """
+        Question code for each segment of a recording, in order: the question
+        the segment matches, else the last one matched before it (it is an
+        answer), else ''. A segment's translation is tried when its text
+        matches nothing.
+        """
+        translations = translations or []
+        codes = []
+        current = ''
+        for idx, text in enumerate(texts):
+            found = self.match(text)
+            if found is None and idx < len(translations) and translations[idx]:
+                found = self.match(translations[idx])
+            if found is not None:
+                current = found[0]
+            codes.append(current)
+        return codes
+
+
+@lru_cache(maxsize=None)
+def _questionnaire_for(path):
+    return Questionnaire.load(path) if path else None
+
+
+def default_questionnaire():
+    """Questionnaire named by HAUSA_TRANSCRIBER_QUESTIONNAIRE, loaded once per process (None when unset)"""
+    return _questionnaire_for(os.environ.get(QUESTIONNAIRE_ENV) or None)
@@ -0,0 +1,170 @@
+"""
+Adaptive rate limiting for calls to recognition and translation services.
+
+Every backend gets one RateLimiter per process, shared by all threads and
+jobs that use it. A call through ``RateLimiter.call``:
+
+- waits for a token from a token bucket (when the backend declares a rate),
+- waits for a concurrency slot, whose limit grows additively after each
+  success and halves when the service signals throttling (AIMD),
+- is retried after a jittered exponential backoff when it fails, as long as
+  the per-call retry limit and the limiter's retry budget allow it.
+
+Throttling also halves the token rate, which then creeps back up with
+successes, so batches settle at the highest rate the service sustains.
+"""
+
+import random
+import threading
+import time
+
+from . import metrics
+
+
+MAX_RETRIES = 6             # Retries per call
+BASE_DELAY = 0.5            # Seconds before the first retry
+MAX_DELAY = 30.0            # Longest single backoff
+RETRY_RATIO = 0.2           # Each call adds this much retry budget...
+RETRY_BUDGET = 20.0         # ...up to this many retries (also the starting balance)
+RATE_STEP = 0.05            # Tokens/second added to the rate per success
+DECREASE_COOLDOWN = 1.0     # Seconds between two multiplicative decreases
+
+THROTTLE_MARKERS = ('too many requests', '429', 'quota', 'rate limit', 'service unavailable', '503')
+
+
+def is_throttled(error):
+    """Whether an error means "slow down" rather than "this request is broken" """
+    if type(error).__name__ == 'TooManyRequests':
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+class RateLimiter:
+    """Token bucket, AIMD concurrency limit and retry budget for one backend"""
+
+    def __init__(self, name, rate=None, burst=None, max_rate=None, min_rate=0.2, max_concurrency=16,
+                 max_retries=MAX_RETRIES, base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+        self.name = name
+        self.rate = rate                    # Tokens per second; None means no token bucket
+        self.burst = burst or (rate * 2 if rate else None)
+        self.max_rate = max_rate or (rate * 10 if rate else None)
+        self.min_rate = min_rate
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._tokens = self.burst or 0.0
+        self._refilled = time.monotonic()
+        self._retry_balance = RETRY_BUDGET
+        self._last_decrease = 0.0
+
+    def _take_token(self, tokens):
+        """Seconds to wait before ``tokens`` are available (0 when taken); called with the lock held"""
+        if self.rate is None:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+        # A request larger than the bucket may go once the bucket is full
+        needed = min(tokens, self.burst)
+        if self._tokens >= needed:
+            self._tokens -= needed
+            return 0.0
+        return (needed - self._tokens) / self.rate
+
+    def _acquire(self, tokens):
+        with self._condition:
+            while self._in_flight >= max(1, int(self.concurrency)):
+                self._condition.wait()
+            self._in_flight += 1
+
+        while True:
+            with self._condition:
+                wait = self._take_token(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def _release(self, outcome):
+        with self._condition:
+            self._in_flight -= 1
+            if outcome == 'ok':
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+                if self.rate is not None:
+                    self.rate = min(self.max_rate, self.rate + RATE_STEP)
+            elif outcome == 'throttled':
+                now = time.monotonic()
+                # Requests already in flight fail together; count that as one signal
+                if now - self._last_decrease >= DECREASE_COOLDOWN:
+                    self._last_decrease = now
+                    self.concurrency = max(1.0, self.concurrency / 2)
+                    if self.rate is not None:
+                        self.rate = max(self.min_rate, self.rate / 2)
+            self._condition.notify_all()
+
+    def _spend_retry(self):
+        with self._condition:
+            if self._retry_balance < 1:
+                return False
+            self._retry_balance -= 1
+            return True
+
+    def backoff(self, attempt):
+        """Delay before retry number ``attempt`` (1-based): exponential, +/-50% jitter"""
+        return min(self.max_delay, self.base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+    def call(self, fn, *args, retry_on=(Exception,), tokens=1, service=None):
+        """
+        Call ``fn(*args)`` under the limits, retrying exceptions in
+        ``retry_on``. The last error is raised when retries run out.
+        """
+        with self._condition:
+            self._retry_balance = min(RETRY_BUDGET, self._retry_balance + RETRY_RATIO)
+
+        attempt = 0
+        while True:
+            self._acquire(tokens)
+            try:
+                result = fn(*args)
+            except retry_on as error:
+                throttled = is_throttled(error)
+                self._release('throttled' if throttled else 'error')
+                if attempt >= self.max_retries or not self._spend_retry():
+                    raise
+                attempt += 1
+                metrics.inc('retries_total', service=service or self.name,
+                            reason='throttled' if throttled else 'error')
+                time.sleep(self.backoff(attempt))
+                continue
+            except BaseException:
+                self._release('error')
+                raise
+            self._release('ok')
+            return result
+
+    def state(self):
+        with self._condition:
+            return {
+                'rate': self.rate,
+                'concurrency': self.concurrency,
+                'in_flight': self._in_flight,
+                'retry_balance': self._retry_balance
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(service, backend):
+    """The process-wide limiter for a backend, configured from its ``rate_limit`` dict"""
+    name = f'{service}:{backend.name}'
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(name, **(backend.rate_limit or {}))
+        return _limiters[name]
@@ -0,0 +1,118 @@
+"""
+Tabular records built from batch results, shared by the web app and the CLI.
+"""
+
+from .questionnaire import default_questionnaire
+from .roles import RESPONDENT, detect_speaker_roles
+
+
+COMBINED_COLUMNS = [
+    "Record", "Filename", "Audio Minute", "Role", "Question Code", "Hausa Transcription", "English Translation"
+]
+TRANSCRIPT_COLUMNS = ["AUDIO MINUTE", "ROLE", "TRANSCRIBED VERSION"]
+TRANSLATION_COLUMNS = ["AUDIO MINUTE", "ROLE", "TRANSLATED VERSION"]
+
+
+def format_time_range(start, end):
+    """Format a segment's start/end seconds as 'MM:SS - MM:SS min'"""
+    start_min = int(start // 60)
+    start_sec = int(start % 60)
+    end_min = int(end // 60)
+    end_sec = int(end % 60)
+    return f"{start_min:02d}:{start_sec:02d} - {end_min:02d}:{end_sec:02d} min"
+
+
+def _combined_rows(result, roles, codes):
+    translations = result.get('translation_segments') or []
+    for idx, seg in enumerate(result['transcription_segments']):
+        yield {
+            "Record": f"Record {result['record_number']}",
+            "Filename": result['filename'],
+            "Audio Minute": format_time_range(seg['start'], seg['end']),
+            "Role": roles[idx],
+            "Question Code": codes[idx],
+            "Hausa Transcription": seg['text'],
+            "English Translation": translations[idx]['text'] if idx < len(translations) else ""
+        }
+
+
+def combined_records(batch_results):
+    """
+    Rows of the combined "all records" CSV: one row per transcription segment
+    of every successful result, with its translation alongside and the
+    questionnaire question it belongs to (blank without a questionnaire).
+    """
+    questionnaire = default_questionnaire()
+    for result in batch_results:
+        if result.get('error') or not result['transcription_segments']:
+            continue
+
+        texts = [seg['text'] for seg in result['transcription_segments']]
+        roles = detect_speaker_roles(texts)
+        if questionnaire is not None:
+            translations = [seg['text'] for seg in result.get('translation_segments') or []]
+            codes = questionnaire.question_codes(texts, translations)
+        else:
+            codes = [''] * len(texts)
+        yield from _combined_rows(result, roles, codes)
+
+
+def segment_tables(segments, translations):
+    """
+    Timestamped transcript and translation DataFrames (each with its speaker
+    role) for a list of segments and the translations aligned with them,
+    e.g. one page of a stored recording. Returns (transcript, translation, roles).
+    """
+    import pandas as pd  # Only needed once there are results; keeps app startup light
+
+    roles = detect_speaker_roles([seg['text'] for seg in segments])
+
+    transcript = pd.DataFrame({
+        "AUDIO MINUTE": [format_time_range(seg['start'], seg['end']) for seg in segments],
+        "ROLE": list(roles),
+        "TRANSCRIBED VERSION": [seg['text'] for seg in segments]
+    }, columns=TRANSCRIPT_COLUMNS)
+
+    # Translated segments take the role of the transcription segment they came from
+    translation = pd.DataFrame({
+        "AUDIO MINUTE": [format_time_range(seg['start'], seg['end']) for seg in translations],
+        "ROLE": [roles[idx] if idx < len(roles) else RESPONDENT for idx in range(len(translations))],
+        "TRANSLATED VERSION": [seg['text'] for seg in translations]
+    }, columns=TRANSLATION_COLUMNS)
+
+    return transcript, translation, list(roles)
+
+
+def record_tables(result):
+    """
+    Display tables and CSV payloads for one successful result: the
+    timestamped transcript and translation (each with its speaker role) and
+    the word/character/segment counts.
+    """
+    segments = result['transcription_segments'] or []
+    translations = result.get('translation_segments') or []
+    transcript, translation, roles = segment_tables(segments, translations)
+
+    return {
+        'roles': roles,
+        'transcript': transcript,
+        'translation': translation,
+        'transcript_csv': transcript.to_csv(index=False) if segments else None,
+        'translation_csv': translation.to_csv(index=False) if translations else None,
+        'words': len(result['transcription'].split()),
+        'characters': len(result['transcription']),
+        'segments': len(segments)
+    }
+
+
+def result_tables(batch_results):
+    """
+    Every table and CSV payload the results view shows for a batch, built in
+    one pass: ``{'records': {record_number: record_tables(...)}, 'segments': total}``.
+    The combined export is streamed separately (see export.write_records).
+    """
+    records = {}
+    for result in batch_results:
+        if not result.get('error'):
+            records[result['record_number']] = record_tables(result)
+    return {'records': records, 'segments': sum(record['segments'] for record in records.values())}
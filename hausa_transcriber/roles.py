@@ -0,0 +1,223 @@
+"""
+Speaker role and question/answer detection for survey transcripts.
+
+All keyword rules are compiled once into a single case-insensitive
+alternation regex per check, so each text is scanned once instead of once per
+keyword. The rules are plain lists that can be replaced from a JSON file (see
+``load_rules``; the HAUSA_TRANSCRIBER_RULES environment variable points the
+default matcher at one), so a new questionnaire needs no code changes.
+When a questionnaire file is configured (see questionnaire), Q&A pairs follow
+the questions it matches instead of these keywords.
+"""
+
+import json
+import os
+import re
+from functools import lru_cache
+
+from .questionnaire import default_questionnaire
+
+
+INTERVIEWER = "❓ INTERVIEWER"
+RESPONDENT = "💭 RESPONDENT"
+
+DEFAULT_RULES = {
+    # Question codes read out by the interviewer (matched anywhere in a segment)
+    'question_codes': [
+        'q1', 'q2', 'q3', 'q4', 'q5', 'q6', 'q7', 'q8', 'q9',
+        'q10', 'q20', 'q30', 'q40', 'q50', 'q60', 'q70', 'q80', 'q90',
+        'q100', 'q101', 'q102', 'q103', 'q104', 'q105', 'q106', 'q107',
+        'q108', 'q109', 'q110', 'q111', 'q112', 'q113', 'q114', 'q115',
+        'q120', 'q121', 'q125', 'q130', 'q131', 'q132', 'q133', 'q134', 'q135'
+    ],
+    # Phrases that mark a segment as the interviewer's
+    'interviewer_phrases': [
+        'how many', 'what is', 'menene', 'nawa', 'wanne',
+        'kin taba', 'kina da', 'do you', 'have you', 'are you',
+        'shin', 'kindly', 'select', 'enter', 'confirm',
+        'name of', 'phone number', 'age', 'gender', 'household'
+    ],
+    # Common Hausa question patterns from the survey (Q&A parsing)
+    'hausa_question_words': [
+        'menene',      # what is
+        'wanne',       # which
+        'nawa',        # how many
+        'shin',        # whether/if
+        'kin taba',    # have you ever
+        'kina da',     # do you have
+        'ka',          # questions
+        'kika',        # you (feminine)
+        'zaka',        # will you
+        'kuna',        # do you (plural)
+        'akwai',       # is there
+    ],
+    # Common English question patterns from the survey (Q&A parsing)
+    'english_question_words': [
+        'how many', 'what is', 'do you', 'have you', 'are you',
+        'can you', 'did you', 'does', 'was', 'were', 'will you',
+        'have you ever', 'kindly', 'select', 'gender', 'name',
+        'age', 'phone number', 'household', 'education', 'born'
+    ],
+    # Sentence openings that make a sentence a question
+    'question_prefixes': [
+        'what', 'how', 'when', 'where', 'which', 'who', 'why', 'do ', 'does ', 'did ',
+        'have ', 'has ', 'had ', 'can ', 'could ', 'would ', 'should ', 'is ', 'are ', 'was ', 'were '
+    ],
+}
+
+RULES_ENV = 'HAUSA_TRANSCRIBER_RULES'
+
+
+def load_rules(path):
+    """
+    Read rules from a JSON file. Keys missing from the file keep their
+    defaults; unknown keys are rejected so typos do not go unnoticed.
+    """
+    with open(path, encoding='utf-8') as f:
+        overrides = json.load(f)
+
+    unknown = set(overrides) - set(DEFAULT_RULES)
+    if unknown:
+        raise ValueError(f"Unknown rule keys in {path}: {', '.join(sorted(unknown))}")
+
+    rules = dict(DEFAULT_RULES)
+    for key, words in overrides.items():
+        if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+            raise ValueError(f"Rule '{key}' in {path} must be a list of strings")
+        rules[key] = words
+    return rules
+
+
+def _alternation(words):
+    """Longest-first escaped alternation of plain substrings (never matches when empty)"""
+    words = sorted({word.lower() for word in words if word}, key=len, reverse=True)
+    return '|'.join(re.escape(word) for word in words) or r'(?!)'
+
+
+class RoleMatcher:
+    """Keyword rules compiled once; use ``roles`` and ``is_question``"""
+
+    def __init__(self, rules=None):
+        self.rules = dict(DEFAULT_RULES if rules is None else rules)
+
+        # Substring semantics match the original keyword checks (e.g. 'q1' also matches 'q12')
+        self.interviewer_pattern = re.compile(
+            _alternation(self.rules['question_codes'] + self.rules['interviewer_phrases']) + r'|\?',
+            re.IGNORECASE
+        )
+        prefixes = _alternation(self.rules['question_prefixes'])
+        self.question_pattern = re.compile(
+            r'\bq\d+|\?'
+            f"|{_alternation(self.rules['hausa_question_words'] + self.rules['english_question_words'])}"
+            f'|^(?:{prefixes})',
+            re.IGNORECASE
+        )
+
+    def roles(self, texts):
+        """Roles for many segments at once; ``texts`` is a pandas Series or any iterable of strings"""
+        import pandas as pd  # Only needed once there are results; keeps app startup light
+
+        if not isinstance(texts, pd.Series):
+            texts = pd.Series(list(texts), dtype=object)
+        is_interviewer = texts.fillna('').astype(str).str.contains(self.interviewer_pattern, regex=True)
+        return is_interviewer.map({True: INTERVIEWER, False: RESPONDENT}).astype(object)
+
+    def is_question(self, sentence):
+        return self.question_pattern.search(sentence) is not None
+
+
+@lru_cache(maxsize=None)
+def _matcher_for(path):
+    return RoleMatcher(load_rules(path) if path else None)
+
+
+def default_matcher():
+    """Matcher for the rules file named by HAUSA_TRANSCRIBER_RULES, or the built-in rules"""
+    return _matcher_for(os.environ.get(RULES_ENV) or None)
+
+
+def parse_qa_from_text(text, matcher=None):
+    """
+    Parse transcribed text into Question-Answer pairs
+    Identifies survey questions (Q1, Q2, etc.) and separates from answers
+    Specifically designed for mortality/reproductive health survey
+    """
+    matcher = matcher or default_matcher()
+
+    # Split by sentences
+    sentences = re.split(r'[.?!]', text)
+    qa_pairs = []
+    current_question = None
+    current_answer = []
+
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if not sentence or len(sentence) < 5:
+            continue
+
+        if matcher.is_question(sentence):
+            # Save previous Q&A pair if exists
+            if current_question and current_answer:
+                qa_pairs.append({
+                    'type': 'Question',
+                    'text': current_question
+                })
+                qa_pairs.append({
+                    'type': 'Answer',
+                    'text': ' '.join(current_answer)
+                })
+
+            # Start new question
+            current_question = sentence
+            current_answer = []
+        elif current_question:
+            # This is part of the answer (or continuation); text before the first question is skipped
+            current_answer.append(sentence)
+
+    # Add the last Q&A pair
+    if current_question:
+        qa_pairs.append({
+            'type': 'Question',
+            'text': current_question
+        })
+        if current_answer:
+            qa_pairs.append({
+                'type': 'Answer',
+                'text': ' '.join(current_answer)
+            })
+
+    return qa_pairs
+
+
+def parse_qa_from_segments(segments, matcher=None, questionnaire=None):
+    """
+    Question-Answer pairs for a recording's segments. With a questionnaire
+    (default: the HAUSA_TRANSCRIBER_QUESTIONNAIRE file), a pair starts at each
+    segment that matches a question and carries its code; without one, the
+    joined text is parsed by keywords (parse_qa_from_text).
+    """
+    questionnaire = questionnaire or default_questionnaire()
+    if questionnaire is None:
+        text = ' '.join(seg['text'] for seg in segments)
+        return parse_qa_from_text(text, matcher) if text else []
+
+    qa_pairs = []
+    answer = []
+    for seg in segments:
+        found = questionnaire.match(seg['text'])
+        if found is not None:
+            if answer:
+                qa_pairs.append({'type': 'Answer', 'code': qa_pairs[-1]['code'], 'text': ' '.join(answer)})
+            qa_pairs.append({'type': 'Question', 'code': found[0], 'text': seg['text']})
+            answer = []
+        elif qa_pairs:
+            # Text before the first matched question is skipped, as in parse_qa_from_text
+            answer.append(seg['text'])
+    if answer:
+        qa_pairs.append({'type': 'Answer', 'code': qa_pairs[-1]['code'], 'text': ' '.join(answer)})
+    return qa_pairs
+
+
+def detect_speaker_roles(texts, matcher=None):
+    """Interviewer (question) or respondent (answer) role of each segment text in a pandas Series (or list)"""
+    return (matcher or default_matcher()).roles(texts)
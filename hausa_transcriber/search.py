@@ -0,0 +1,70 @@
+"""
+Text handling for full-text search over stored transcripts and translations.
+
+Segments are indexed with SQLite FTS5 (see store.ResultStore.search). Before
+indexing and before querying, text is folded so that searches work the way
+people type Hausa on ordinary keyboards: the hooked letters ɓ ɗ ƙ ƴ match
+b d k y, apostrophe variants match each other, and case and tone marks are
+ignored.
+"""
+
+import re
+import unicodedata
+
+
+_FOLD = str.maketrans({
+    'ɓ': 'b', 'Ɓ': 'b',
+    'ɗ': 'd', 'Ɗ': 'd',
+    'ƙ': 'k', 'Ƙ': 'k',
+    'ƴ': 'y', 'Ƴ': 'y',
+    '’': "'", 'ʼ': "'", '‘': "'",
+})
+
+_WORD = re.compile(r"\w+")
+_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+MARK_START = '«'
+MARK_END = '»'
+
+
+def fold(text):
+    """Lower-cased text without tone marks, with hooked letters and apostrophes folded"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower().translate(_FOLD)
+
+
+def parse_query(query):
+    """
+    Split a search box query into terms: (words, prefix) pairs, where
+    ``words`` is a list of folded words (more than one for a "quoted phrase")
+    and ``prefix`` is True for a trailing ``*`` (e.g. ``zazza*``).
+    """
+    terms = []
+    for phrase, word in _TERM.findall(query or ''):
+        text = phrase if phrase else word
+        words = _WORD.findall(fold(text))
+        if words:
+            terms.append((words, not phrase and word.endswith('*')))
+    return terms
+
+
+def match_expression(terms):
+    """FTS5 MATCH expression requiring every term (None when there are no terms)"""
+    if not terms:
+        return None
+    # Quoting every word keeps FTS5 operators and punctuation in user input from being interpreted
+    return ' '.join('"' + ' '.join(words) + '"' + ('*' if prefix else '') for words, prefix in terms)
+
+
+def highlight(text, terms):
+    """``text`` with the words matching ``terms`` wrapped in « »"""
+    exact = {word for words, prefix in terms for word in (words if not prefix else words[:-1])}
+    prefixes = tuple(words[-1] for words, prefix in terms if prefix)
+
+    def mark(match):
+        word = fold(match.group(0))
+        if word in exact or (prefixes and word.startswith(prefixes)):
+            return MARK_START + match.group(0) + MARK_END
+        return match.group(0)
+
+    return _WORD.sub(mark, text or '')
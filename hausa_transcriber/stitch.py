@@ -0,0 +1,97 @@
+"""
+Stitching of overlapping chunk transcripts.
+
+When speech runs on past the chunk length, the chunker cuts it and starts the
+next chunk CHUNK_OVERLAP seconds before the cut (see vad), so a word spoken
+across the cut is heard whole at least once. Both transcripts then contain
+the words of the overlap. ``stitch_segments`` finds that shared word run -
+the longest suffix of the earlier transcript's tokens that is also a prefix
+of the later one's - with the KMP failure function, in time linear in the
+tokens compared, and keeps it only once. Up to EDGE_TOKENS words right at
+either cut may be half-heard, so they are allowed to differ and are dropped
+when a run is found around them.
+"""
+
+import re
+
+from .search import fold
+
+
+WORDS_PER_SECOND = 4    # Most words the overlap can hold per second (bounds the tokens compared)
+EDGE_TOKENS = 2         # Words at a cut that may be mangled
+MIN_RUN_TOKENS = 2      # Shorter shared runs are too likely to be chance ("da ... da")
+
+_PUNCTUATION = re.compile(r'[\W_]+')
+
+
+def _key(token):
+    return _PUNCTUATION.sub('', fold(token))
+
+
+def overlap_length(left, right):
+    """Length of the longest suffix of ``left`` that is also a prefix of ``right`` (lists of tokens)"""
+    # Failure function of right + separator + left: its last value is the longest border
+    # that starts in ``right`` and ends at the end of ``left``; O(len(left) + len(right))
+    pattern = list(right) + [None] + list(left)
+    failure = [0] * len(pattern)
+    for i in range(1, len(pattern)):
+        k = failure[i - 1]
+        while k and pattern[i] != pattern[k]:
+            k = failure[k - 1]
+        if pattern[i] == pattern[k]:
+            k += 1
+        failure[i] = k
+    return failure[-1]
+
+
+def stitch_texts(left, right, overlap_seconds):
+    """
+    ``(left, right)`` with the word run they share across an overlap of
+    ``overlap_seconds`` kept only in ``left``; unchanged when no run is found.
+    """
+    left_tokens = left.split()
+    right_tokens = right.split()
+    window = int(overlap_seconds * WORDS_PER_SECOND) + EDGE_TOKENS
+    left_keys = [_key(token) for token in left_tokens[-window:]]
+    right_keys = [_key(token) for token in right_tokens[:window]]
+
+    best_length, trim_left, trim_right = 0, 0, 0
+    for dropped_left in range(min(EDGE_TOKENS, len(left_keys)) + 1):
+        for dropped_right in range(min(EDGE_TOKENS, len(right_keys)) + 1):
+            length = overlap_length(left_keys[:len(left_keys) - dropped_left], right_keys[dropped_right:])
+            if length > best_length:
+                best_length, trim_left, trim_right = length, dropped_left, dropped_right
+    if best_length < MIN_RUN_TOKENS:
+        return left, right
+
+    left_tokens = left_tokens[:len(left_tokens) - trim_left]
+    right_tokens = right_tokens[trim_right + best_length:]
+    return ' '.join(left_tokens), ' '.join(right_tokens)
+
+
+def stitch_segments(segments):
+    """
+    Transcript segments (dicts with 'start', 'end' and 'text', None for a
+    chunk without text) in chunk order, with the words repeated by
+    overlapping neighbours removed. Empty segments are left out, and a
+    stitched segment starts where the one before it ends.
+    """
+    stitched = []
+    previous = None
+    for seg in segments:
+        seg = dict(seg)
+        if not seg['text'] or not seg['text'].strip():
+            previous = None
+            continue
+
+        if previous is not None and seg['start'] < previous['end']:
+            previous['text'], seg['text'] = stitch_texts(previous['text'], seg['text'], previous['end'] - seg['start'])
+            if not seg['text']:
+                # Everything it heard was already in the previous segment
+                previous['end'] = seg['end']
+                continue
+            seg['start'] = previous['end']
+
+        previous = seg
+        stitched.append(seg)
+    return [seg for seg in stitched if seg['text']]
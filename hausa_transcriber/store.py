@@ -0,0 +1,345 @@
+"""
+Persistent store of finished results.
+
+Every successfully processed recording is written to a SQLite database next
+to the caches: one row per recording (keyed by a hash of the file's contents
+and the settings that produced the result), its transcription segments and
+its translated segments. Each batch (a web app job) only keeps a small
+summary row per file that points at its recording.
+
+The results view pages segments out of the store instead of holding every
+batch in the browser session, results survive a refresh or a server
+restart, and uploading a file that was already processed with the same
+settings returns its stored result without decoding or recognizing it again.
+
+Transcription and translated segments are also indexed in an FTS5 table as
+they are saved, so ``search`` finds every recording that mentions a word in
+milliseconds (see the search module for how text is folded).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .cache import DEFAULT_CACHE_DIR
+from .roles import parse_qa_from_segments
+from .search import fold, highlight, match_expression, parse_query
+
+
+# Result fields that are kept in the recordings/segments tables, not in batch summaries
+_CONTENT_FIELDS = ('transcription', 'translation', 'transcription_segments', 'translation_segments', 'qa_pairs')
+
+# Search index rowids encode (recording_id, segment index, source), so one
+# recording's entries form a contiguous rowid range that can be replaced cheaply
+_SOURCES = ('transcript', 'translation')
+_INDEX_BITS = 21  # Up to ~1M segments per recording
+
+RANK_LIMIT = 5000  # Queries matching more segments than this are not ranked
+
+
+def _search_rowid(recording_id, idx, source):
+    return (recording_id << _INDEX_BITS | idx) << 1 | _SOURCES.index(source)
+
+
+def _search_rows(recording_id, segments, source):
+    for idx, seg in enumerate(segments):
+        yield (_search_rowid(recording_id, idx, source), fold(seg['text']), seg['text'], seg['start'], seg['end'])
+
+
+class ResultStore:
+    """Recordings, their segments and per-batch summaries; safe to use from several threads"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'results.sqlite3')
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA foreign_keys=ON')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS recordings ('
+            ' recording_id INTEGER PRIMARY KEY,'
+            ' content_key TEXT NOT NULL UNIQUE,'
+            ' filename TEXT,'
+            ' language TEXT,'
+            ' target_language TEXT,'
+            ' transcription TEXT,'
+            ' translation TEXT,'
+            ' segment_count INTEGER NOT NULL,'
+            ' words INTEGER NOT NULL,'
+            ' characters INTEGER NOT NULL,'
+            ' complete INTEGER NOT NULL,'
+            ' created REAL NOT NULL)'
+        )
+        for table in ('segments', 'translations'):
+            self._db.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} ('
+                ' recording_id INTEGER NOT NULL REFERENCES recordings ON DELETE CASCADE,'
+                ' idx INTEGER NOT NULL,'
+                ' start REAL NOT NULL,'
+                ' end REAL NOT NULL,'
+                ' text TEXT,'
+                ' PRIMARY KEY (recording_id, idx))'
+            )
+            self._db.execute(f'CREATE INDEX IF NOT EXISTS {table}_time ON {table} (recording_id, start)')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS batch_records ('
+            ' batch_id TEXT NOT NULL,'
+            ' record_number INTEGER NOT NULL,'
+            ' recording_id INTEGER REFERENCES recordings ON DELETE SET NULL,'
+            ' summary TEXT NOT NULL,'
+            ' created REAL NOT NULL,'
+            ' PRIMARY KEY (batch_id, record_number))'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS batch_records_recording ON batch_records (recording_id)')
+
+        indexed = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'segments_fts'"
+        ).fetchone()
+        self._db.execute(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5('
+            ' text, original UNINDEXED, start UNINDEXED, end UNINDEXED,'
+            " tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        if not indexed:
+            self._index_all()
+        self._db.commit()
+
+    def _index_all(self):
+        """Index every stored segment (stores created before search existed)"""
+        for table, source in (('segments', 'transcript'), ('translations', 'translation')):
+            rows = self._db.execute(f'SELECT recording_id, idx, start, end, text FROM {table}').fetchall()
+            self._db.executemany(
+                'INSERT INTO segments_fts (rowid, text, original, start, end) VALUES (?, ?, ?, ?, ?)',
+                (
+                    (_search_rowid(recording_id, idx, source), fold(text), text, start, end)
+                    for recording_id, idx, start, end, text in rows
+                )
+            )
+
+    def lookup(self, content_key):
+        """The recording_id of the complete result stored under ``content_key``, or None"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT recording_id FROM recordings WHERE content_key = ? AND complete', (content_key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_recording(self, content_key, result, target_language=None, complete=True):
+        """
+        Store a successful result's text and segments under ``content_key``
+        (replacing an earlier result for the same key) and return its
+        recording_id. Incomplete results (with gaps) are kept for display but
+        never returned by ``lookup``.
+        """
+        segments = result['transcription_segments'] or []
+        translations = result.get('translation_segments') or []
+        transcription = result['transcription'] or ''
+        with self._lock:
+            row = self._db.execute(
+                'SELECT recording_id FROM recordings WHERE content_key = ?', (content_key,)
+            ).fetchone()
+            values = (
+                result['filename'], result.get('language'), target_language, transcription,
+                result.get('translation'), len(segments), len(transcription.split()), len(transcription),
+                int(complete), time.time()
+            )
+            if row is None:
+                recording_id = self._db.execute(
+                    'INSERT INTO recordings (filename, language, target_language, transcription, translation,'
+                    ' segment_count, words, characters, complete, created, content_key)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    values + (content_key,)
+                ).lastrowid
+            else:
+                recording_id = row[0]
+                self._db.execute(
+                    'UPDATE recordings SET filename = ?, language = ?, target_language = ?, transcription = ?,'
+                    ' translation = ?, segment_count = ?, words = ?, characters = ?, complete = ?, created = ?'
+                    ' WHERE recording_id = ?',
+                    values + (recording_id,)
+                )
+                self._db.execute('DELETE FROM segments WHERE recording_id = ?', (recording_id,))
+                self._db.execute('DELETE FROM translations WHERE recording_id = ?', (recording_id,))
+
+            for table, rows in (('segments', segments), ('translations', translations)):
+                self._db.executemany(
+                    f'INSERT INTO {table} (recording_id, idx, start, end, text) VALUES (?, ?, ?, ?, ?)',
+                    ((recording_id, idx, seg['start'], seg['end'], seg['text']) for idx, seg in enumerate(rows))
+                )
+
+            # Replace the recording's search entries (one contiguous rowid range)
+            self._db.execute(
+                'DELETE FROM segments_fts WHERE rowid >= ? AND rowid < ?',
+                (recording_id << (_INDEX_BITS + 1), (recording_id + 1) << (_INDEX_BITS + 1))
+            )
+            for source, rows in (('transcript', segments), ('translation', translations)):
+                self._db.executemany(
+                    'INSERT INTO segments_fts (rowid, text, original, start, end) VALUES (?, ?, ?, ?, ?)',
+                    _search_rows(recording_id, rows, source)
+                )
+            self._db.commit()
+        return recording_id
+
+    def saved_at(self, recording_id):
+        """
+        When a recording was last saved, or None if it is unknown. Processing
+        the same file again rewrites its recording in place, so this tells
+        apart what was read from it before and after.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT created FROM recordings WHERE recording_id = ?', (recording_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _rows(self, table, recording_id, offset, limit):
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT start, end, text FROM {table} WHERE recording_id = ? ORDER BY idx LIMIT ? OFFSET ?',
+                (recording_id, -1 if limit is None else limit, offset)
+            ).fetchall()
+        return [{'start': start, 'end': end, 'text': text} for start, end, text in rows]
+
+    def segments(self, recording_id, offset=0, limit=None):
+        """Transcription segments of a recording, ``limit`` of them from ``offset`` (all when None)"""
+        return self._rows('segments', recording_id, offset, limit)
+
+    def translations(self, recording_id, offset=0, limit=None):
+        """Translated segments of a recording, aligned with ``segments`` by position"""
+        return self._rows('translations', recording_id, offset, limit)
+
+    def load_result(self, recording_id, record_number, filename):
+        """A stored recording as a full result dict (the shape batch.process_file returns)"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT language, target_language, transcription, translation FROM recordings'
+                ' WHERE recording_id = ?',
+                (recording_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        language, target_language, transcription, translation = row
+        segments = self.segments(recording_id)
+        return {
+            'record_number': record_number,
+            'filename': filename,
+            'transcription': transcription,
+            'translation': translation,
+            'transcription_segments': segments,
+            'translation_segments': self.translations(recording_id),
+            'qa_pairs': parse_qa_from_segments(segments),
+            'language': language,
+            'target_language': target_language,
+            'requests': 0,
+            'failed_chunks': [],
+            'resumed_chunks': 0,
+            'failed_translations': 0,
+            'recording_id': recording_id,
+            'from_store': True
+        }
+
+    def add_to_batch(self, batch_id, result):
+        """
+        Record a processed file (successful or not) as part of a batch and
+        return its summary: the result without its text and segments, plus
+        word/character/segment counts.
+        """
+        summary = {key: value for key, value in result.items() if key not in _CONTENT_FIELDS}
+        if not result.get('error'):
+            transcription = result['transcription'] or ''
+            summary['words'] = len(transcription.split())
+            summary['characters'] = len(transcription)
+            summary['segments'] = len(result['transcription_segments'] or [])
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO batch_records (batch_id, record_number, recording_id, summary, created)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (batch_id, result['record_number'], result.get('recording_id'),
+                 json.dumps(summary, ensure_ascii=False), time.time())
+            )
+            self._db.commit()
+        return summary
+
+    def batch(self, batch_id):
+        """Summaries of a batch's files in record order (empty if the batch is unknown)"""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT summary FROM batch_records WHERE batch_id = ? ORDER BY record_number', (batch_id,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def batch_results(self, batch_id):
+        """Full results of a batch in record order, loaded one recording at a time"""
+        for summary in self.batch(batch_id):
+            result = None
+            if not summary.get('error') and summary.get('recording_id') is not None:
+                result = self.load_result(summary['recording_id'], summary['record_number'], summary['filename'])
+            if result is None:
+                yield {
+                    **summary,
+                    'transcription': None,
+                    'translation': None,
+                    'transcription_segments': None,
+                    'translation_segments': None
+                }
+            else:
+                yield {**result, **summary, 'from_store': summary.get('from_store', False)}
+
+    def search(self, query, source=None, limit=50):
+        """
+        Segments matching every term of a search box query, best match first
+        (FTS5 bm25; queries matching more than RANK_LIMIT segments list the
+        newest matches instead, since ranking them all takes seconds).
+        ``source`` limits hits to 'transcript' or 'translation'.
+        Each hit has the recording's filename, the batch and record number it
+        was last processed in, the segment's times, its source and its text
+        with the matching words marked (see search.highlight).
+        """
+        terms = parse_query(query)
+        expression = match_expression(terms)
+        if expression is None:
+            return []
+
+        where = 'WHERE segments_fts MATCH ?'
+        params = [expression]
+        if source is not None:
+            where += ' AND (rowid & 1) = ?'
+            params.append(_SOURCES.index(source))
+
+        with self._lock:
+            broad = self._db.execute(
+                f'SELECT count(*) FROM (SELECT rowid FROM segments_fts {where} LIMIT ?)', params + [RANK_LIMIT + 1]
+            ).fetchone()[0] > RANK_LIMIT
+            order, score = ('rowid DESC', '-rowid') if broad else ('rank', 'rank')
+            # Recordings and batches are only looked up for the hits that are kept
+            rows = self._db.execute(
+                'SELECT f.rowid, f.original, f.start, f.end, r.filename, b.batch_id, b.record_number'
+                f' FROM (SELECT rowid, {score} AS score, original, start, end'
+                f'  FROM segments_fts {where} ORDER BY {order} LIMIT ?) f'
+                f' JOIN recordings r ON r.recording_id = f.rowid >> {_INDEX_BITS + 1}'
+                ' LEFT JOIN batch_records b ON b.rowid = ('
+                '  SELECT rowid FROM batch_records WHERE recording_id = r.recording_id ORDER BY created DESC LIMIT 1)'
+                ' ORDER BY f.score',
+                params + [limit]
+            ).fetchall()
+        return [
+            {
+                'recording_id': rowid >> (_INDEX_BITS + 1),
+                'filename': filename,
+                'batch_id': batch_id,
+                'record_number': record_number,
+                'source': _SOURCES[rowid & 1],
+                'start': start,
+                'end': end,
+                'text': highlight(original, terms)
+            }
+            for rowid, original, start, end, filename, batch_id, record_number in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,231 @@
+"""
+Speech recognition for whole recordings.
+
+A recording is decoded as a PCM stream, split into speech chunks by the voice
+activity detector and the chunks are recognized concurrently by a
+recognizer backend (Google Speech Recognition unless configured otherwise,
+see backends). No Streamlit code lives here; callers get progress
+through a callback and present results themselves.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+
+import speech_recognition as sr
+
+from . import backends, decode, metrics, ratelimit, vad
+from .cache import recognition_key
+from .checkpoint import file_digest
+from .language import DEFAULT_LANGUAGES, LanguagePlan
+from .roles import parse_qa_from_segments
+from .stitch import stitch_segments
+
+
+CHUNK_DURATION = 60  # Up to 60 seconds of speech per request (longer to capture Q&A exchanges)
+CHUNK_OVERLAP = 2.0  # Seconds repeated where speech is cut mid-sentence (see stitch)
+
+
+def recognize_chunk(recognizer, audio_data, cache=None, plan=None):
+    """Recognize one audio chunk in Hausa or English
+
+    ``recognizer`` is a backends.RecognizerBackend. The file's LanguagePlan
+    decides which language is requested first; the other language is only
+    tried when the result's confidence is low. With a cache, a chunk already
+    recognized with the same PCM bytes, languages and backend settings is
+    answered without a request.
+    """
+    if plan is None:
+        plan = LanguagePlan(probe_chunks=0)
+
+    key = None
+    if cache is not None:
+        key = recognition_key(
+            audio_data.frame_data,
+            audio_data.sample_rate,
+            plan.languages,
+            recognizer.settings()
+        )
+        try:
+            return cache.get(key)
+        except KeyError:
+            pass
+
+    limiter = ratelimit.limiter_for('recognition', recognizer)
+
+    def request(audio, language):
+        metrics.inc('upload_bytes_total', len(audio.frame_data), service='recognition', backend=recognizer.name)
+        outcome = 'error'
+        try:
+            with metrics.timer('recognition_request', backend=recognizer.name):
+                # Throttling and service errors are retried with backoff before giving up
+                response = limiter.call(
+                    recognizer.recognize, audio, language, retry_on=(sr.RequestError,), service='recognition'
+                )
+            outcome = 'ok' if response else 'no_speech'
+            return response
+        finally:
+            metrics.inc('requests_total', service='recognition', backend=recognizer.name, outcome=outcome)
+
+    # Silent/unclear chunks come back as None and are skipped
+    text, _ = plan.recognize(request, audio_data)
+
+    # Request errors are raised above and never cached
+    if cache is not None:
+        cache.set(key, text)
+    return text
+
+
+def _build_result(chunk_times, chunk_texts, plan, failed_chunks, duration, resumed_chunks):
+    # Put results back in timestamp order; words heard twice where chunks overlap are kept once
+    transcription_segments = stitch_segments(
+        {'start': start_time, 'end': end_time, 'text': chunk_texts.get(idx)}
+        for idx, (start_time, end_time) in enumerate(chunk_times)
+    )
+
+    full_text = " ".join([seg['text'] for seg in transcription_segments])
+    return {
+        'transcription': full_text,
+        'segments': transcription_segments,
+        'qa_pairs': parse_qa_from_segments(transcription_segments),
+        'language': plan.language,
+        'requests': plan.requests,
+        'failed_chunks': sorted(failed_chunks),
+        'resumed_chunks': resumed_chunks,
+        'duration': duration
+    }
+
+
+def transcribe_file(audio_file, filename, max_workers=4, cache=None, use_ffmpeg=True, progress_callback=None,
+                    checkpoints=None, recognizer=None, chunk_duration=CHUNK_DURATION, chunk_overlap=CHUNK_OVERLAP,
+                    chunk_callback=None):
+    """
+    Transcribe a file-like recording with timestamps.
+
+    Speech chunks are recognized on a pool of ``max_workers`` threads while
+    decoding continues; at most twice that many chunks are held in memory.
+    ``progress_callback(recognized, submitted, position, duration)`` is called
+    from the calling thread as chunks are submitted (``duration`` is None when
+    the length is not known up front). ``chunk_callback(idx, start, end, text)``
+    is called from the calling thread as soon as each chunk is recognized or
+    restored from a checkpoint, in completion order (``text`` is None when
+    nothing was heard). Chunks hold up to ``chunk_duration``
+    seconds of speech; where speech has to be cut mid-sentence, neighbouring
+    chunks overlap by ``chunk_overlap`` seconds and their transcripts are
+    stitched (see stitch). A recording in which no speech is detected is
+    sent whole, in fixed-length chunks.
+
+    With a CheckpointStore, each recognized chunk is saved as soon as it
+    finishes and a re-run of the same file only recognizes missing chunks.
+    ``recognizer`` is a shared backend instance (default: backends.create_recognizer()).
+    Requests go through the backend's shared RateLimiter; chunks that still
+    fail after their retries are listed (1-based) in 'failed_chunks' while
+    the rest of the file is recognized.
+
+    Returns a dict with 'transcription', 'segments', 'qa_pairs', 'language',
+    'requests', 'failed_chunks', 'resumed_chunks' and 'duration'. Raises
+    decode.DecodeError if the file cannot be decoded.
+    """
+    if recognizer is None:
+        recognizer = backends.create_recognizer()
+    file_ext = filename.split('.')[-1].lower()
+
+    # Probe the first chunks in every language the backend knows, then stick to the dominant one
+    plan = LanguagePlan(recognizer.languages or DEFAULT_LANGUAGES)
+
+    file_key = None
+    done_chunks = {}
+    if checkpoints is not None:
+        file_key = file_digest(audio_file, {
+            'chunk_duration': chunk_duration,
+            'chunk_overlap': chunk_overlap,
+            'sample_rate': decode.DECODE_SAMPLE_RATE,
+            'languages': plan.languages,
+            'use_ffmpeg': use_ffmpeg,
+            'recognizer': recognizer.settings()
+        })
+        checkpoints.begin(file_key, filename)
+        done_chunks = checkpoints.load(file_key)
+
+        # Every chunk already recognized - no need to decode the audio again
+        chunk_count = checkpoints.chunk_count(file_key)
+        if chunk_count is not None and all(idx in done_chunks for idx in range(chunk_count)):
+            chunk_times = [done_chunks[idx][:2] for idx in range(chunk_count)]
+            chunk_texts = {idx: done_chunks[idx][2] for idx in range(chunk_count)}
+            return _build_result(chunk_times, chunk_texts, plan, [], None, chunk_count)
+
+    def recognize(idx, start, end, audio_data):
+        text = recognize_chunk(recognizer, audio_data, cache, plan)
+        if checkpoints is not None:
+            checkpoints.save_chunk(file_key, idx, start, end, text)
+        return text
+
+    chunk_times = []
+    chunk_texts = {}
+    failed_chunks = []
+    in_flight = {}
+    resumed_chunks = 0
+
+    def collect(done_futures):
+        for future in done_futures:
+            idx = in_flight.pop(future)
+            try:
+                chunk_texts[idx] = future.result()
+            except sr.RequestError:
+                failed_chunks.append(idx + 1)
+                continue
+            if chunk_callback:
+                chunk_callback(idx, *chunk_times[idx], chunk_texts[idx])
+
+    # When the detector finds no speech at all, the whole recording is sent in fixed-length chunks instead
+    for chunker in (vad.iter_speech_segments, vad.iter_fixed_segments):
+        audio_file.seek(0)
+        with decode.open_pcm_stream(audio_file, file_ext, use_ffmpeg=use_ffmpeg) as stream:
+            # Decoding (ffmpeg or soundfile) and VAD chunking are timed separately
+            blocks = metrics.TimedIterator(stream, 'decode')
+            segments = metrics.TimedIterator(
+                chunker(blocks, stream.sample_rate, max_duration=chunk_duration, overlap=chunk_overlap),
+                'chunking',
+                exclude=blocks
+            )
+
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+                for idx, segment in enumerate(segments):
+                    chunk_times.append((segment['start'], segment['end']))
+
+                    # Resume: chunks checkpointed by an earlier run are not recognized again
+                    if idx in done_chunks:
+                        chunk_texts[idx] = done_chunks[idx][2]
+                        resumed_chunks += 1
+                        if chunk_callback:
+                            chunk_callback(idx, segment['start'], segment['end'], chunk_texts[idx])
+                    else:
+                        audio_data = sr.AudioData(segment['samples'].tobytes(), stream.sample_rate, 2)
+                        future = metrics.submit(pool, recognize, idx, segment['start'], segment['end'], audio_data)
+                        in_flight[future] = idx
+
+                    # Pick up finished chunks right away so their text is out while decoding continues
+                    collect([future for future in in_flight if future.done()])
+
+                    # Only keep a few chunks in memory while decoding continues
+                    if len(in_flight) >= 2 * max(1, max_workers):
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+
+                    if progress_callback:
+                        progress_callback(len(chunk_texts), len(chunk_times), segment['end'], stream.duration)
+
+                for future in as_completed(list(in_flight)):
+                    collect([future])
+                    if progress_callback:
+                        progress_callback(len(chunk_texts), len(chunk_times), chunk_times[-1][1], stream.duration)
+
+            blocks.finish()
+            segments.finish()
+            duration = stream.duration
+
+        if chunk_times:
+            break
+
+    if checkpoints is not None and not failed_chunks:
+        checkpoints.complete(file_key, len(chunk_times))
+
+    return _build_result(chunk_times, chunk_texts, plan, failed_chunks, duration, resumed_chunks)
@@ -0,0 +1,88 @@
+"""
+Translation of transcribed segments through a translator backend
+(Google Translate via deep-translator unless configured otherwise, see backends).
+"""
+
+from . import backends, metrics, ratelimit
+from .cache import translation_key
+
+
+def _translate_batch(texts, target_language, translator):
+    metrics.inc('upload_bytes_total', sum(len(text.encode('utf-8')) for text in texts),
+                service='translation', backend=translator.name)
+    limiter = ratelimit.limiter_for('translation', translator)
+    try:
+        with metrics.timer('translation_request', backend=translator.name):
+            # Throttling and service errors are retried with backoff before giving up
+            translations = limiter.call(
+                translator.translate_batch, texts, target_language, tokens=len(texts), service='translation'
+            )
+    except Exception:
+        translations = [None] * len(texts)
+
+    failed = sum(1 for translation in translations if not translation)
+    metrics.inc('requests_total', len(texts) - failed, service='translation', backend=translator.name, outcome='ok')
+    metrics.inc('requests_total', failed, service='translation', backend=translator.name, outcome='error')
+    return [translation or None for translation in translations]
+
+
+def translate_segments(segments, target_language, cache=None, progress_callback=None, translator=None,
+                       translation_callback=None):
+    """
+    Translate timestamped segments once each, ``translator.batch_size`` texts per backend call.
+    ``translation_callback(text, translation)`` is called for each distinct
+    text as soon as its translation is known (None when it failed).
+    Returns (translated_segments, failed_count); failed segments keep their original text.
+    """
+    if translator is None:
+        translator = backends.create_translator()
+
+    # Repeated phrases within the file are only translated once
+    translations = {}
+    pending = []
+    for seg in segments:
+        text = seg['text']
+        if text in translations:
+            continue
+        if not text or len(text.strip()) == 0:
+            translations[text] = ""
+            continue
+        if cache is not None:
+            try:
+                translations[text] = cache.get(translation_key(text, target_language))
+                if translation_callback:
+                    translation_callback(text, translations[text])
+                continue
+            except KeyError:
+                pass
+        translations[text] = None
+        pending.append(text)
+
+    done = len(translations) - len(pending)
+    for start in range(0, len(pending), translator.batch_size):
+        batch = pending[start:start + translator.batch_size]
+        for text, result in zip(batch, _translate_batch(batch, target_language, translator)):
+            translations[text] = result
+            if result and cache is not None:
+                cache.set(translation_key(text, target_language), result)
+            if translation_callback:
+                translation_callback(text, result)
+        done += len(batch)
+        if progress_callback:
+            progress_callback(done, len(translations))
+
+    translated_segments = []
+    failed = 0
+    for seg in segments:
+        translated_text = translations[seg['text']]
+        if translated_text is None:
+            failed += 1
+            translated_text = seg['text']
+
+        translated_segments.append({
+            'start': seg['start'],
+            'end': seg['end'],
+            'text': translated_text
+        })
+
+    return translated_segments, failed
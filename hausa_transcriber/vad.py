@@ -0,0 +1,256 @@
+"""
+Voice activity detection (VAD) for decoded PCM audio.
+
+The detector works on a stream of mono int16 blocks. Frame features
+(short-time energy and zero-crossing rate) are computed with vectorized NumPy
+as blocks arrive, and speech regions are emitted with real start/end times as
+soon as they are final. Regions are then packed into request-sized segments so
+silent stretches are never sent to the recognizer. Only a short look-ahead
+window is kept in memory, so long recordings do not have to be decoded in full.
+"""
+
+import numpy as np
+# np.percentile imports numpy.ma on first use, and that import runs ast.parse,
+# which on Python 3.11 is not thread-safe - load it here rather than in a job
+# thread while Streamlit compiles the script
+import numpy.ma  # noqa: F401
+
+
+FRAME_MS = 30               # Analysis frame length
+ENERGY_MARGIN_DB = 10.0     # How far above the noise floor speech must be
+SPEECH_HEADROOM_DB = 15.0   # Frames this close to the loudest ones are speech (if the margin allows)
+MIN_ENERGY_DB = -55.0       # Frames quieter than this are always silence
+ZCR_SPEECH_MIN = 0.10       # Zero-crossing rate typical for fricatives (s, sh, f)
+HANGOVER_MS = 200           # Padding kept around speech so word edges are not clipped
+MIN_SPEECH_MS = 150         # Shorter bursts are treated as clicks/noise
+MIN_SILENCE_MS = 500        # Shorter pauses do not split a region
+WINDOW_SECONDS = 10         # How much audio is buffered between VAD passes
+NOISE_HISTORY_SECONDS = 300 # How much recent audio the noise floor is estimated from
+
+
+def frame_features(samples, frame_len):
+    """Return per-frame energy (dBFS) and zero-crossing rate for the complete frames of int16 samples"""
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return np.zeros(0), np.zeros(0)
+
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float32) / 32768.0
+
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    energy_db = 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame_len)
+
+    return energy_db, zcr
+
+
+def _runs(mask):
+    """Return (start, stop) frame indices of every True run in a boolean mask"""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def noise_threshold(history_db, energy_margin_db=ENERGY_MARGIN_DB):
+    """
+    Speech energy threshold and margin for the energies of recently heard frames.
+
+    The noise floor is taken from the quietest frames. When nearly all of them
+    are speech (dense talk, or a recording that starts mid-sentence) that
+    "floor" is speech itself, and the threshold would sit on the speech peaks.
+    So the margin above the floor shrinks, down to half, to stay
+    SPEECH_HEADROOM_DB below the loudest frames. Returns (threshold, margin).
+    """
+    floor, loud = np.percentile(history_db, [10, 99])
+    margin = float(np.clip(loud - SPEECH_HEADROOM_DB - floor, energy_margin_db / 2, energy_margin_db))
+    return max(floor + margin, MIN_ENERGY_DB), margin
+
+
+def classify_frames(energy_db, zcr, threshold, energy_margin_db=ENERGY_MARGIN_DB):
+    """Classify frames as speech (True) or silence (False) against an energy threshold"""
+    voiced = energy_db > threshold
+    # Unvoiced consonants are quiet but noisy - keep them when close to the threshold
+    unvoiced = (energy_db > threshold - energy_margin_db / 2) & (zcr > ZCR_SPEECH_MIN)
+    return voiced | unvoiced
+
+
+def _pad(mask, frames):
+    """Widen every True run by ``frames`` on both sides"""
+    if frames <= 0 or not mask.any():
+        return mask
+    kernel = np.ones(2 * frames + 1)
+    return np.convolve(mask.astype(np.float32), kernel, mode='same') > 0
+
+
+def iter_speech_regions(blocks, sample_rate, frame_ms=FRAME_MS, max_region_seconds=60.0, overlap_seconds=0.0):
+    """
+    Detect speech in a stream of mono int16 sample blocks.
+
+    Yields (start_seconds, end_seconds, samples) for every speech region in
+    time order. Regions longer than ``max_region_seconds`` are split; each
+    piece after a split starts ``overlap_seconds`` before the previous one
+    ends, so a word spoken across the cut is whole in at least one of them.
+    """
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    frame_sec = frame_len / float(sample_rate)
+
+    min_gap = int(MIN_SILENCE_MS / frame_ms)
+    hangover = int(HANGOVER_MS / frame_ms)
+    min_speech = max(1, int(MIN_SPEECH_MS / frame_ms))
+    lookahead = hangover + min_gap + 1
+    window_frames = int(WINDOW_SECONDS / frame_sec)
+    history_frames = int(NOISE_HISTORY_SECONDS / frame_sec)
+    max_region = max(1, int(max_region_seconds / frame_sec))
+    overlap = min(int(overlap_seconds / frame_sec), max_region // 2)
+
+    pending = np.zeros(0, dtype=np.int16)   # Samples from frame `base` onwards
+    energy = np.zeros(0)
+    zcr = np.zeros(0)
+    history = np.zeros(0)
+    base = 0
+
+    def flush(final):
+        nonlocal pending, energy, zcr, base
+        n = len(energy)
+        if n == 0:
+            return []
+
+        # Estimate the noise floor from the quietest frames heard recently
+        speech = classify_frames(energy, zcr, *noise_threshold(history))
+        # Keep some padding around speech so word edges are not clipped
+        starts, stops = _runs(_pad(speech, hangover))
+
+        # Merge regions separated by a short pause
+        merged = []
+        for start, stop in zip(starts, stops):
+            if merged and start - merged[-1][1] < min_gap:
+                merged[-1][1] = stop
+            else:
+                merged.append([start, stop])
+
+        done = []
+        cut = n if final else max(0, n - lookahead)
+        for start, stop in merged:
+            if final or stop <= n - lookahead:
+                # Regions with too little speech in them are clicks or handling noise; syllables
+                # count together once merged, so dense speech is not thrown away with them
+                if np.count_nonzero(speech[start:stop]) >= min_speech:
+                    done.append((start, stop))
+            elif cut - start >= max_region:
+                # Still talking - emit what we have so memory stays bounded (the overlap is kept for the next piece)
+                done.append((start, start + max_region))
+                cut = start + max_region - overlap
+                break
+            else:
+                # Region may still grow, wait for more audio
+                cut = min(cut, start)
+                break
+
+        regions = []
+        for start, stop in done:
+            piece = start
+            while True:
+                piece_stop = min(piece + max_region, stop)
+                regions.append((
+                    float((base + piece) * frame_sec),
+                    float((base + piece_stop) * frame_sec),
+                    pending[piece * frame_len:piece_stop * frame_len].copy()
+                ))
+                if piece_stop >= stop:
+                    break
+                piece = piece_stop - overlap
+
+        pending = pending[cut * frame_len:]
+        energy = energy[cut:]
+        zcr = zcr[cut:]
+        base += cut
+        return regions
+
+    for block in blocks:
+        if len(block) == 0:
+            continue
+        computed = len(energy) * frame_len
+        pending = np.concatenate((pending, block))
+
+        new_energy, new_zcr = frame_features(pending[computed:], frame_len)
+        energy = np.concatenate((energy, new_energy))
+        zcr = np.concatenate((zcr, new_zcr))
+        history = np.concatenate((history, new_energy))[-history_frames:]
+
+        if len(energy) >= window_frames + lookahead:
+            for region in flush(final=False):
+                yield region
+
+    for region in flush(final=True):
+        yield region
+
+
+def iter_fixed_segments(blocks, sample_rate, max_duration=60.0, overlap=0.0):
+    """
+    Cut a stream of mono int16 blocks into ``max_duration`` second segments
+    regardless of speech, each starting ``overlap`` seconds before the
+    previous one ends - the fallback for recordings in which no speech is
+    detected. Segments are dicts like those of iter_speech_segments;
+    digitally silent ones are skipped.
+    """
+    size = max(1, int(max_duration * sample_rate))
+    step = size - min(int(overlap * sample_rate), size // 2)
+    pending = np.zeros(0, dtype=np.int16)
+    offset = 0   # Sample position of pending[0]
+
+    def segment(samples):
+        start = offset / float(sample_rate)
+        end = (offset + len(samples)) / float(sample_rate)
+        return {'start': start, 'end': end, 'regions': [(start, end)], 'samples': samples}
+
+    for block in blocks:
+        pending = np.concatenate((pending, block))
+        while len(pending) >= size:
+            if pending[:size].any():
+                yield segment(pending[:size].copy())
+            pending = pending[step:]
+            offset += step
+
+    # The rest, unless it is only the overlap already sent with the last segment
+    if len(pending) > (size - step if offset else 0) and pending.any():
+        yield segment(pending)
+
+
+def iter_speech_segments(blocks, sample_rate, max_duration=60.0, overlap=0.0):
+    """
+    Pack detected speech into request-sized segments.
+
+    Each segment is a dict with the real 'start' and 'end' time of its speech,
+    the list of 'regions' it contains and the speech 'samples' (silence
+    between regions removed). No segment holds more than ``max_duration``
+    seconds of speech. Where speech has to be cut mid-region, the next
+    segment repeats the last ``overlap`` seconds (its 'start' is before the
+    previous 'end'; see stitch).
+    """
+    current = None
+    parts = []
+    speech_len = 0.0
+
+    regions = iter_speech_regions(blocks, sample_rate, max_region_seconds=max_duration, overlap_seconds=overlap)
+    for start, end, samples in regions:
+        region_len = end - start
+        # An overlapping piece is never packed with the audio it repeats
+        if current is not None and (speech_len + region_len > max_duration or start < current['end']):
+            current['samples'] = np.concatenate(parts)
+            yield current
+            current = None
+
+        if current is None:
+            current = {'start': start, 'end': end, 'regions': []}
+            parts = []
+            speech_len = 0.0
+
+        current['regions'].append((start, end))
+        current['end'] = end
+        parts.append(samples)
+        speech_len += region_len
+
+    if current is not None:
+        current['samples'] = np.concatenate(parts)
+        yield current
@@ -0,0 +1,189 @@
+"""
+Worker processes for the shared job queue.
+
+    python -m hausa_transcriber worker [--once]
+
+A worker claims one file task at a time from the broker (see workqueue),
+processes it with its own backends, caches and checkpoints, and writes the
+result to the shared ResultStore. While the file is processed, a heartbeat
+thread renews the lease and reports progress. A worker that loses its lease
+(it stalled long enough for the task to be requeued) stops the file early;
+the result is left to the new owner. Stopping a worker with Ctrl+C or
+SIGTERM puts its current task back in the queue.
+"""
+
+import os
+import signal
+import socket
+import sys
+import threading
+from . import metrics
+from .batch import (
+    failed_result, process_file, shared_backends, shared_caches, shared_checkpoints, shared_ffmpeg, shared_results
+)
+from .live import LiveTranscript
+from .transcribe import CHUNK_DURATION, CHUNK_OVERLAP
+from .workqueue import HEARTBEAT_SECONDS, create_broker
+
+
+POLL_SECONDS = 2.0  # Wait between claims while the queue is empty
+
+
+class LeaseLost(Exception):
+    """Another worker now owns the task being processed"""
+
+
+class _Lease:
+    """Heartbeats for one claimed task on a background thread"""
+
+    def __init__(self, broker, task, worker_id):
+        self.broker = broker
+        self.task = task
+        self.worker_id = worker_id
+        self.progress = None
+        self.live = LiveTranscript()
+        self.lost = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+        self._thread.start()
+
+    def _beat(self):
+        while not self._stopped.wait(HEARTBEAT_SECONDS):
+            # The segments so far ride along, so the app can show them before the file is done
+            progress = dict(self.progress, segments=self.live.rows()) if self.progress else None
+            if not self.broker.heartbeat(self.task, self.worker_id, progress):
+                self.lost.set()
+                return
+
+    def on_progress(self, stage, fraction, detail):
+        if self.lost.is_set():
+            raise LeaseLost(self.task.id)
+        self.progress = {'stage': stage, 'fraction': fraction, 'detail': detail}
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+def _process(task, payload, lease):
+    recognition_cache, translation_cache = shared_caches(payload['use_cache'])
+    recognizer, translator = shared_backends(payload['recognizer'], payload['translator'])
+    with open(payload['path'], 'rb') as audio_file:
+        return process_file(
+            audio_file,
+            payload['filename'],
+            task.record_number,
+            target_language=payload['target_language'],
+            recognition_workers=payload['recognition_workers'],
+            recognition_cache=recognition_cache,
+            translation_cache=translation_cache,
+            use_ffmpeg=shared_ffmpeg(),
+            progress_callback=lease.on_progress,
+            checkpoints=shared_checkpoints(True),
+            recognizer=recognizer,
+            translator=translator,
+            results=shared_results(True),
+            reuse_results=payload['reuse_results'],
+            # Tasks queued before chunk settings existed use the defaults
+            chunk_duration=payload.get('chunk_duration', CHUNK_DURATION),
+            chunk_overlap=payload.get('chunk_overlap', CHUNK_OVERLAP),
+            live=lease.live
+        )
+
+
+def run_task(broker, task, worker_id):
+    """Process one claimed task and finish it; returns the outcome ('ok', 'error', 'gave_up' or 'lost')"""
+    payload = task.payload
+    if task.attempts > broker.max_attempts:
+        outcome = 'gave_up'
+        result = failed_result(
+            task.record_number, payload['filename'],
+            f"Gave up after {broker.max_attempts} attempts - the workers processing this file stopped responding"
+        )
+    else:
+        lease = _Lease(broker, task, worker_id)
+        try:
+            result = _process(task, payload, lease)
+        except LeaseLost:
+            metrics.inc('queue_tasks_total', outcome='lost')
+            return 'lost'
+        except Exception as e:
+            result = failed_result(task.record_number, payload['filename'], str(e))
+        except BaseException:
+            # Ctrl+C / SIGTERM: another worker takes the file over from its checkpoints
+            broker.release(task, worker_id)
+            raise
+        finally:
+            lease.stop()
+        outcome = 'error' if result.get('error') else 'ok'
+
+    summary = shared_results(True).add_to_batch(task.batch_id, result)
+    if not broker.complete(task, worker_id, summary):
+        metrics.inc('queue_tasks_total', outcome='lost')
+        return 'lost'
+
+    metrics.inc('queue_tasks_total', outcome=outcome)
+    try:
+        os.remove(payload['path'])
+        os.rmdir(os.path.dirname(payload['path']))  # Only succeeds after the batch's last file
+    except OSError:
+        pass
+    return outcome
+
+
+def run(broker, worker_id=None, once=False, poll_seconds=POLL_SECONDS, stop=None):
+    """
+    Claim and process tasks until ``stop`` (a threading.Event) is set, or
+    until the queue is empty when ``once``. Returns how many tasks were run.
+    """
+    worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+    stop = stop or threading.Event()
+    processed = 0
+    while not stop.is_set():
+        task = broker.claim(worker_id)
+        if task is None:
+            if once:
+                break
+            stop.wait(poll_seconds)
+            continue
+
+        print(f"[{worker_id}] {task.id}: {task.payload['filename']} (attempt {task.attempts})", file=sys.stderr)
+        outcome = run_task(broker, task, worker_id)
+        status = {'ok': '✅', 'error': '❌', 'gave_up': '❌ gave up', 'lost': '⚠️ lease lost'}[outcome]
+        print(f"[{worker_id}] {task.id}: {status}", file=sys.stderr)
+        processed += 1
+    return processed
+
+
+def run_worker(args):
+    """Entry point of ``python -m hausa_transcriber worker``"""
+    try:
+        broker = create_broker(args.broker)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    if args.metrics_port:
+        metrics.start_metrics_server(args.metrics_port)
+        print(f"📈 Metrics at http://127.0.0.1:{args.metrics_port}/metrics", file=sys.stderr)
+
+    # SIGTERM (e.g. from a process manager) stops the worker like Ctrl+C: the current task is requeued
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        processed = run(broker, worker_id=args.id, once=args.once, poll_seconds=args.poll)
+    except KeyboardInterrupt:
+        print("🛑 Stopped", file=sys.stderr)
+        return 0
+    finally:
+        broker.close()
+    print(f"🎉 {processed} task(s) processed", file=sys.stderr)
+    return 0
+
+
+def add_arguments(parser):
+    parser.add_argument('--broker', default=None,
+                        help="Queue broker (default: HAUSA_TRANSCRIBER_BROKER or sqlite)")
+    parser.add_argument('--id', help="Worker name shown in logs and the queue (default: host:pid)")
+    parser.add_argument('--once', action='store_true', help="Exit when the queue is empty instead of waiting")
+    parser.add_argument('--poll', type=float, default=POLL_SECONDS, help="Seconds between claims while idle")
+    parser.add_argument('--metrics-port', type=int, help="Serve Prometheus metrics on this local port")
+    parser.set_defaults(func=run_worker)
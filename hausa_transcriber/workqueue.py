@@ -0,0 +1,354 @@
+"""
+Durable job queue shared by the web app and worker processes.
+
+With HAUSA_TRANSCRIBER_BROKER set, the web app does not transcribe anything
+itself: every uploaded file becomes a task in a shared queue, and any number
+of ``python -m hausa_transcriber worker`` processes claim tasks one at a time
+(see worker). Uploads are copied to the cache directory, and workers write
+results to the shared ResultStore, so the app shows a finished batch exactly
+as if it had processed it.
+
+A claimed task is leased to its worker for LEASE_SECONDS. The worker renews
+the lease with heartbeats, which also carry its progress and the segments
+recognized so far for the app to show.
+When a worker dies or hangs, its lease runs out and the next claim puts the
+task back in the queue. The file is then resumed from its chunk checkpoints
+by another worker, up to MAX_ATTEMPTS tries in all.
+
+Brokers are pluggable: subclass Broker, register it with ``register_broker``
+and select it by name. The built-in ``sqlite`` broker keeps the queue in
+``queue.sqlite3`` in the cache directory. Every worker that can open that
+file can share it: processes on one machine, or machines sharing a disk that
+supports SQLite locking.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+from .cache import DEFAULT_CACHE_DIR
+from .jobs import DONE, FAILED, QUEUED, RUNNING
+from .transcribe import CHUNK_DURATION, CHUNK_OVERLAP
+
+
+DEFAULT_BROKER = os.environ.get('HAUSA_TRANSCRIBER_BROKER')  # Unset: the app runs its own JobManager
+
+LEASE_SECONDS = 30          # A worker that misses heartbeats for this long is presumed dead
+HEARTBEAT_SECONDS = 2       # How often workers renew leases and report progress
+MAX_ATTEMPTS = 3            # Claims per task before it is given up
+KEEP_DAYS = 7               # Finished tasks older than this are removed
+
+BROKERS = {}
+
+
+def register_broker(name):
+    def register(cls):
+        cls.name = name
+        BROKERS[name] = cls
+        return cls
+    return register
+
+
+class Task:
+    """A claimed task; ``attempts`` counts this claim"""
+
+    def __init__(self, task_id, batch_id, record_number, payload, attempts):
+        self.id = task_id
+        self.batch_id = batch_id
+        self.record_number = record_number
+        self.payload = payload
+        self.attempts = attempts
+
+
+class Broker:
+    """
+    Where tasks wait and who holds them. ``submit`` queues a batch's tasks
+    (one payload dict per file, with its 'record_number'), ``claim`` leases
+    the oldest queued task to a worker, and ``heartbeat``/``complete``/
+    ``release`` only succeed while that worker still holds the lease.
+    ``tasks`` and ``batches_ahead`` are what the app polls. Instances are
+    shared by threads.
+    """
+
+    name = None
+    max_attempts = MAX_ATTEMPTS
+
+    def submit(self, batch_id, payloads):
+        raise NotImplementedError
+
+    def claim(self, worker_id, lease_seconds=LEASE_SECONDS):
+        """The next task (a Task) leased to ``worker_id``, or None when the queue is empty"""
+        raise NotImplementedError
+
+    def heartbeat(self, task, worker_id, progress=None, lease_seconds=LEASE_SECONDS):
+        """Renew the lease and store ``progress``; False when the lease was lost"""
+        raise NotImplementedError
+
+    def complete(self, task, worker_id, summary):
+        """Finish a task with its result summary; False when the lease was lost"""
+        raise NotImplementedError
+
+    def release(self, task, worker_id):
+        """Put a task back in the queue without counting the attempt (worker shutting down)"""
+        raise NotImplementedError
+
+    def tasks(self, batch_id):
+        """A batch's tasks in record order: dicts with record_number, filename, status, progress, summary"""
+        raise NotImplementedError
+
+    def batches_ahead(self, batch_id):
+        """How many unfinished batches were submitted before this one"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+@register_broker('sqlite')
+class SQLiteBroker(Broker):
+    """Tasks in one SQLite table; claims are serialized by a write transaction"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_attempts=MAX_ATTEMPTS, keep_days=KEEP_DAYS):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'queue.sqlite3')
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        # Autocommit; claim() opens its own BEGIN IMMEDIATE transaction
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS tasks ('
+            ' task_id TEXT PRIMARY KEY,'
+            ' batch_id TEXT NOT NULL,'
+            ' record_number INTEGER NOT NULL,'
+            ' payload TEXT NOT NULL,'
+            ' status TEXT NOT NULL,'
+            ' attempts INTEGER NOT NULL DEFAULT 0,'
+            ' worker TEXT,'
+            ' lease_until REAL,'
+            ' progress TEXT,'
+            ' summary TEXT,'
+            ' created REAL NOT NULL,'
+            ' updated REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_until)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS tasks_batch ON tasks (batch_id, record_number)')
+        self._db.execute(
+            'DELETE FROM tasks WHERE status = ? AND updated < ?',
+            (DONE, time.time() - keep_days * 24 * 60 * 60)
+        )
+
+    def submit(self, batch_id, payloads):
+        now = time.time()
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                self._db.executemany(
+                    'INSERT INTO tasks (task_id, batch_id, record_number, payload, status, created, updated)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [
+                        (f"{batch_id}:{payload['record_number']}", batch_id, payload['record_number'],
+                         json.dumps(payload, ensure_ascii=False), QUEUED, now, now)
+                        for payload in payloads
+                    ]
+                )
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+
+    def claim(self, worker_id, lease_seconds=LEASE_SECONDS):
+        now = time.time()
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                # A lease that ran out belongs to a worker that died or hung
+                self._db.execute(
+                    'UPDATE tasks SET status = ?, worker = NULL, lease_until = NULL, progress = NULL, updated = ?'
+                    ' WHERE status = ? AND lease_until < ?',
+                    (QUEUED, now, RUNNING, now)
+                )
+                row = self._db.execute(
+                    'SELECT task_id, batch_id, record_number, payload, attempts FROM tasks'
+                    ' WHERE status = ? ORDER BY rowid LIMIT 1',
+                    (QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        'UPDATE tasks SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1,'
+                        ' updated = ? WHERE task_id = ?',
+                        (RUNNING, worker_id, now + lease_seconds, now, row[0])
+                    )
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        if row is None:
+            return None
+        task_id, batch_id, record_number, payload, attempts = row
+        return Task(task_id, batch_id, record_number, json.loads(payload), attempts + 1)
+
+    def _update_held(self, task, worker_id, assignments, params):
+        with self._lock:
+            cursor = self._db.execute(
+                f'UPDATE tasks SET {assignments}, updated = ? WHERE task_id = ? AND worker = ? AND status = ?',
+                (*params, time.time(), task.id, worker_id, RUNNING)
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, task, worker_id, progress=None, lease_seconds=LEASE_SECONDS):
+        return self._update_held(
+            task, worker_id, 'lease_until = ?, progress = ?',
+            (time.time() + lease_seconds, json.dumps(progress, ensure_ascii=False) if progress else None)
+        )
+
+    def complete(self, task, worker_id, summary):
+        return self._update_held(
+            task, worker_id, 'status = ?, lease_until = NULL, progress = NULL, summary = ?',
+            (DONE, json.dumps(summary, ensure_ascii=False))
+        )
+
+    def release(self, task, worker_id):
+        return self._update_held(
+            task, worker_id, 'status = ?, worker = NULL, lease_until = NULL, progress = NULL, attempts = attempts - 1',
+            (QUEUED,)
+        )
+
+    def tasks(self, batch_id):
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT record_number, payload, status, attempts, worker, progress, summary, updated FROM tasks'
+                ' WHERE batch_id = ? ORDER BY record_number',
+                (batch_id,)
+            ).fetchall()
+        return [
+            {
+                'record_number': record_number,
+                'filename': json.loads(payload)['filename'],
+                'status': status,
+                'attempts': attempts,
+                'worker': worker,
+                'progress': json.loads(progress) if progress else None,
+                'summary': json.loads(summary) if summary else None,
+                'updated': updated
+            }
+            for record_number, payload, status, attempts, worker, progress, summary, updated in rows
+        ]
+
+    def batches_ahead(self, batch_id):
+        with self._lock:
+            return self._db.execute(
+                'SELECT COUNT(DISTINCT batch_id) FROM tasks WHERE status IN (?, ?) AND batch_id != ?'
+                ' AND created < (SELECT MIN(created) FROM tasks WHERE batch_id = ?)',
+                (QUEUED, RUNNING, batch_id, batch_id)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def create_broker(name=None, **options):
+    """New broker by registered name (default: HAUSA_TRANSCRIBER_BROKER or 'sqlite')"""
+    name = name or DEFAULT_BROKER or 'sqlite'
+    if name not in BROKERS:
+        raise ValueError(f"Unknown broker '{name}' (available: {', '.join(sorted(BROKERS))})")
+    return BROKERS[name](**options)
+
+
+class QueuedJob:
+    """A submitted batch as seen through the queue, with the attributes of a jobs.Job"""
+
+    def __init__(self, job_id, tasks):
+        self.id = job_id
+        self.files = [(task['filename'], None) for task in tasks]
+        self.options = {}
+        self.error = None
+        self.results = [task['summary'] for task in tasks if task['status'] == DONE]
+
+        running = [task for task in tasks if task['status'] == RUNNING]
+        if len(self.results) == len(tasks):
+            self.status = DONE
+        elif running or self.results:
+            self.status = RUNNING
+        else:
+            self.status = QUEUED
+        self.finished = max(task['updated'] for task in tasks) if self.status == DONE else None
+
+        # The app shows one file's progress; with several workers, the earliest one still running
+        progress = (running[0]['progress'] if running else None) or {}
+        self.current_file = running[0]['record_number'] if running else None
+        self.stage = progress.get('stage')
+        self.stage_progress = progress.get('fraction')
+        self.detail = progress.get('detail', '')
+        self.live_segments = progress.get('segments') or []
+        self.workers = len(running)
+        self._running_fractions = [(task['progress'] or {}).get('fraction') or 0.0 for task in running]
+
+    @property
+    def total(self):
+        return len(self.files)
+
+    @property
+    def progress(self):
+        if self.status in (DONE, FAILED) or not self.total:
+            return 1.0
+        return min((len(self.results) + sum(self._running_fractions) * 0.9) / self.total, 1.0)
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+
+class QueuedJobManager:
+    """
+    Drop-in for jobs.JobManager that hands batches to worker processes
+    through a Broker instead of processing them in this process.
+    """
+
+    def __init__(self, broker, upload_dir=None):
+        self.broker = broker
+        self.upload_dir = upload_dir or os.path.join(DEFAULT_CACHE_DIR, 'uploads')
+
+    def submit(self, files, options):
+        """Copy a batch of (filename, file-like) pairs where workers can read them and queue them"""
+        job_id = uuid.uuid4().hex[:12]
+        batch_dir = os.path.join(self.upload_dir, job_id)
+        os.makedirs(batch_dir, exist_ok=True)
+
+        # Workers build their own backends, caches and stores; only names and settings are queued
+        settings = {
+            'target_language': options.get('target_language', 'en'),
+            'recognition_workers': options.get('recognition_workers', 4),
+            'use_cache': options.get('recognition_cache') is not None,
+            'recognizer': options['recognizer'].name if options.get('recognizer') is not None else None,
+            'translator': options['translator'].name if options.get('translator') is not None else None,
+            'reuse_results': options.get('reuse_results', True),
+            'chunk_duration': options.get('chunk_duration', CHUNK_DURATION),
+            'chunk_overlap': options.get('chunk_overlap', CHUNK_OVERLAP)
+        }
+        payloads = []
+        for record_number, (filename, audio_file) in enumerate(files, 1):
+            path = os.path.join(batch_dir, f'{record_number:04d}{os.path.splitext(filename)[1].lower()}')
+            try:
+                audio_file.seek(0)
+                with open(path, 'wb') as out:
+                    shutil.copyfileobj(audio_file, out)
+            finally:
+                audio_file.close()
+            payloads.append({'record_number': record_number, 'filename': filename, 'path': path, **settings})
+
+        self.broker.submit(job_id, payloads)
+        return job_id
+
+    def get(self, job_id):
+        tasks = self.broker.tasks(job_id)
+        return QueuedJob(job_id, tasks) if tasks else None
+
+    def queue_position(self, job_id):
+        return self.broker.batches_ahead(job_id)
@@ -0,0 +1,69 @@
+import itertools
+
+import pytest
+
+from hausa_transcriber import cache as cache_module
+from hausa_transcriber.cache import ResultCache, recognition_key, translation_key
+
+
+class FakeTime:
+    """Stands in for the time module so each use is one second after the last"""
+    _clock = itertools.count(1)
+
+    @classmethod
+    def time(cls):
+        return float(next(cls._clock))
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, 'time', FakeTime)
+    cache = ResultCache('test', cache_dir=str(tmp_path), max_bytes=40)
+    yield cache
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    # Each entry is 2 bytes of key and 10 of JSON value, so three fit
+    for key in ('k0', 'k1', 'k2'):
+        cache.set(key, 'x' * 8)
+    assert cache.get('k0') == 'x' * 8  # k1 is now the least recently used
+
+    cache.set('k3', 'y' * 8)
+    assert 'k1' not in cache
+    assert all(key in cache for key in ('k0', 'k2', 'k3'))
+    assert cache.stats() == {'hits': 1, 'misses': 0, 'entries': 3, 'bytes': 36}
+
+    cache.set('k4', 'z' * 30)
+    assert [key for key in ('k0', 'k2', 'k3', 'k4') if key in cache] == ['k4']
+
+
+def test_hits_and_misses_are_counted(cache):
+    cache.set('k0', None)
+    assert cache.get('k0') is None  # None is a cached value, not a miss
+    assert cache.get('k1', 'default') == 'default'
+    with pytest.raises(KeyError):
+        cache.get('k2')
+
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'entries': 1, 'bytes': 6}
+    cache.clear()
+    assert cache.stats()['entries'] == 0
+
+
+def test_entries_survive_a_restart(tmp_path):
+    cache = ResultCache('test', cache_dir=str(tmp_path))
+    cache.set('key', {'text': 'sannu', 'confidence': 0.9})
+    cache.close()
+
+    cache = ResultCache('test', cache_dir=str(tmp_path))
+    assert cache.get('key') == {'text': 'sannu', 'confidence': 0.9}
+    cache.close()
+
+
+def test_keys_depend_on_every_input():
+    key = recognition_key(b'\x00\x01', 16000, 'ha', {'backend': 'google'})
+    assert recognition_key(b'\x00\x01', 16000, 'ha', {'backend': 'google'}) == key
+    assert recognition_key(b'\x00\x02', 16000, 'ha', {'backend': 'google'}) != key
+    assert recognition_key(b'\x00\x01', 16000, 'en', {'backend': 'google'}) != key
+    assert recognition_key(b'\x00\x01', 16000, 'ha', {'backend': 'vosk'}) != key
+    assert translation_key('sannu', 'en') != translation_key('sannu', 'fr')
@@ -0,0 +1,53 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+from hausa_transcriber.backends import FakeRecognizer, FakeTranslator
+from hausa_transcriber.batch import process_file
+from hausa_transcriber.checkpoint import CheckpointStore, file_digest
+
+
+def test_digest_depends_on_contents_and_settings():
+    audio = io.BytesIO(b'RIFF' + bytes(range(256)) * 100)
+    key = file_digest(audio, {'chunk_duration': 60})
+
+    assert file_digest(io.BytesIO(audio.getvalue()), {'chunk_duration': 60}) == key
+    assert file_digest(audio, {'chunk_duration': 30}) != key
+    assert file_digest(io.BytesIO(audio.getvalue() + b'x'), {'chunk_duration': 60}) != key
+
+
+def test_chunks_survive_a_restart(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.begin('key', 'a.wav')
+    store.save_chunk('key', 0, 0.0, 10.0, 'sannu')
+    store.save_chunk('key', 2, 20.0, 30.0, None)
+    store.close()
+
+    store = CheckpointStore(str(tmp_path))
+    store.begin('key', 'a.wav')
+    assert store.load('key') == {0: (0.0, 10.0, 'sannu'), 2: (20.0, 30.0, None)}
+    assert store.chunk_count('key') is None
+
+    store.save_chunk('key', 1, 10.0, 20.0, 'yaya')
+    store.complete('key', 3)
+    assert store.chunk_count('key') == 3
+    assert store.load('other') == {}
+
+
+def test_checkpoints_are_only_reused_with_reuse_on(tmp_path):
+    t = np.arange(16000 * 4) / 16000
+    samples = np.concatenate([np.zeros(16000), 0.3 * np.sin(2 * np.pi * 200 * t), np.zeros(16000)])
+    buffer = io.BytesIO()
+    sf.write(buffer, (samples * 32767).astype(np.int16), 16000, format='WAV')
+
+    options = {'recognizer': FakeRecognizer(), 'translator': FakeTranslator(), 'use_ffmpeg': False,
+               'checkpoints': CheckpointStore(str(tmp_path))}
+    first = process_file(buffer, 'a.wav', 1, **options)
+    resumed = process_file(buffer, 'a.wav', 1, **options)
+    fresh = process_file(buffer, 'a.wav', 1, reuse_results=False, **options)
+
+    assert first['requests'] > 0
+    assert resumed['requests'] == 0
+    assert fresh['requests'] == first['requests']
+    assert fresh['transcription_segments'] == first['transcription_segments']
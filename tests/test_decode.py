@@ -0,0 +1,79 @@
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from hausa_transcriber import decode
+from hausa_transcriber.decode import (
+    DECODE_SAMPLE_RATE, DecodeError, ffmpeg_available, open_pcm_stream, resample_blocks, spool_upload, to_mono
+)
+
+
+def stereo_wav(seconds=3.0, sample_rate=44100, frequency=440.0):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    tone = 0.5 * np.sin(2 * np.pi * frequency * t)
+    buffer = io.BytesIO()
+    sf.write(buffer, (np.stack([tone, tone], axis=1) * 32767).astype(np.int16), sample_rate, format='WAV')
+    buffer.seek(0)
+    return buffer
+
+
+def peak_frequency(samples, sample_rate):
+    spectrum = np.abs(np.fft.rfft(samples.astype(np.float32)))
+    return np.fft.rfftfreq(len(samples), 1.0 / sample_rate)[np.argmax(spectrum)]
+
+
+def test_to_mono():
+    stereo = np.array([[100, 300], [-100, -300]], dtype=np.int16)
+    assert to_mono(stereo).tolist() == [200, -200]
+    assert to_mono(stereo[:, :1]).tolist() == [100, -100]
+    mono = stereo[:, 0]
+    assert to_mono(mono) is mono
+    assert to_mono(stereo).dtype == np.int16
+
+
+def test_stereo_44k_wav_is_decoded_to_16k_mono():
+    with open_pcm_stream(stereo_wav(), 'wav', use_ffmpeg=False, block_seconds=1) as stream:
+        blocks = list(stream)
+        assert stream.sample_rate == DECODE_SAMPLE_RATE
+        assert stream.duration == pytest.approx(3.0)
+
+    samples = np.concatenate(blocks)
+    assert all(block.ndim == 1 and block.dtype == np.int16 for block in blocks)
+    assert abs(len(samples) - 3 * DECODE_SAMPLE_RATE) <= 16
+    assert peak_frequency(samples, DECODE_SAMPLE_RATE) == pytest.approx(440, abs=2)
+
+
+def test_resampling_in_blocks_leaves_no_seams():
+    samples = (np.sin(np.linspace(0, 400 * np.pi, 44100)) * 10000).astype(np.int16)
+    whole = np.concatenate(list(resample_blocks([samples], 44100)))
+    blocked = np.concatenate(list(resample_blocks(np.array_split(samples, 7), 44100)))
+
+    assert len(blocked) == len(whole)
+    assert np.abs(blocked.astype(np.int32) - whole).max() <= 4  # Rounding only; a seam would jump by thousands
+
+
+def test_without_ffmpeg_every_format_goes_through_soundfile(monkeypatch):
+    monkeypatch.setattr(decode, 'FFMPEG_BINARY', '/nonexistent/ffmpeg')
+    assert not ffmpeg_available()
+
+    # A WAV with another extension still decodes
+    with open_pcm_stream(stereo_wav(seconds=1.0), 'amr', use_ffmpeg=False) as stream:
+        assert sum(len(block) for block in stream) == pytest.approx(DECODE_SAMPLE_RATE, abs=16)
+
+    with pytest.raises(DecodeError, match='without FFmpeg'):
+        open_pcm_stream(io.BytesIO(b'not audio at all'), 'mp3', use_ffmpeg=False)
+    with pytest.raises(DecodeError, match='could not be started'):
+        open_pcm_stream(io.BytesIO(b'not audio at all'), 'mp3', use_ffmpeg=True)
+
+
+def test_spooled_uploads_are_rewound_and_complete():
+    upload = io.BytesIO(bytes(range(256)) * 64)
+    upload.read(10)
+    for max_memory in (1 << 20, 1024):  # Kept in memory, then written to disk
+        spool = spool_upload(upload, max_memory=max_memory)
+        try:
+            assert spool.read() == upload.getvalue()
+        finally:
+            spool.close()
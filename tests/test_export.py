@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+
+import pytest
+
+from hausa_transcriber.export import PARQUET_AVAILABLE, export_file, format_for_path, write_records
+
+
+COLUMNS = ["Record", "Hausa Transcription", "English Translation"]
+RECORDS = [
+    {"Record": "Record 1", "Hausa Transcription": "Ina kwana", "English Translation": "Good morning"},
+    {"Record": "Record 2", "Hausa Transcription": "Ƙasa", "English Translation": None},
+]
+
+
+def test_csv_and_jsonl():
+    out = io.BytesIO()
+    assert write_records(iter(RECORDS), out, 'csv', COLUMNS, chunk_rows=1) == 2
+    rows = list(csv.reader(io.StringIO(out.getvalue().decode('utf-8'))))
+    assert rows == [COLUMNS, ["Record 1", "Ina kwana", "Good morning"], ["Record 2", "Ƙasa", ""]]
+
+    with export_file(iter(RECORDS), 'jsonl', COLUMNS) as f:
+        lines = [json.loads(line) for line in f.read().decode('utf-8').splitlines()]
+    assert lines[1] == {"Record": "Record 2", "Hausa Transcription": "Ƙasa", "English Translation": None}
+
+
+@pytest.mark.skipif(not PARQUET_AVAILABLE, reason="needs pyarrow")
+def test_parquet_keeps_missing_values_null():
+    import pyarrow.parquet as pq
+
+    with export_file(iter(RECORDS), 'parquet', COLUMNS, chunk_rows=1) as f:
+        table = pq.read_table(f)
+    assert table.num_rows == 2
+    assert table.column("English Translation").to_pylist() == ["Good morning", None]
+
+
+def test_format_for_path():
+    assert format_for_path('out/all.PARQUET') == 'parquet'
+    assert format_for_path('all.txt') == 'csv'
@@ -0,0 +1,58 @@
+import io
+import time
+
+import numpy as np
+import soundfile as sf
+
+from hausa_transcriber.backends import FakeRecognizer, FakeTranslator
+from hausa_transcriber.jobs import DONE, JobManager
+
+
+class BrokenRecognizer(FakeRecognizer):
+    def recognize(self, audio_data, language):
+        raise RuntimeError("model crashed")
+
+
+def speech_wav():
+    t = np.arange(16000 * 4) / 16000
+    samples = np.concatenate([np.zeros(16000), 0.3 * np.sin(2 * np.pi * 200 * t), np.zeros(16000)])
+    buffer = io.BytesIO()
+    sf.write(buffer, (samples * 32767).astype(np.int16), 16000, format='WAV')
+    buffer.seek(0)
+    return buffer
+
+
+def run(manager, files, **options):
+    options = dict({'recognizer': FakeRecognizer(), 'translator': FakeTranslator(), 'use_ffmpeg': False}, **options)
+    job = manager.get(manager.submit(files, options))
+    deadline = time.monotonic() + 10
+    while job.active and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_job_runs_every_file_and_keeps_failures_per_file():
+    files = [('a.wav', speech_wav()), ('b.wav', io.BytesIO(b'not audio at all')), ('c.wav', speech_wav())]
+    job = run(JobManager(workers=1), files)
+
+    assert job.status == DONE and job.progress == 1.0
+    assert [result['record_number'] for result in job.results] == [1, 2, 3]
+    assert job.results[0]['transcription_segments'] and not job.results[0].get('error')
+    assert job.results[1]['error'] and job.results[1]['error_kind'] == 'decode'
+    assert job.results[2]['transcription'] == job.results[0]['transcription']
+
+    # Uploads are closed and the live view is dropped once the job is done
+    assert all(audio_file.closed for _, audio_file in files)
+    assert job.files == [] and job.live is None and job.live_segments == []
+
+
+def test_backend_exceptions_fail_the_file_not_the_job():
+    manager = JobManager(workers=1)
+    job = run(manager, [('a.wav', speech_wav())], recognizer=BrokenRecognizer())
+
+    assert job.status == DONE
+    assert job.results[0]['error'] and job.results[0]['error_kind'] == 'error'
+    assert 'model crashed' in job.results[0]['error_message']
+
+    # The worker thread keeps serving later jobs
+    assert run(manager, [('b.wav', speech_wav())]).results[0]['transcription_segments']
@@ -0,0 +1,46 @@
+from hausa_transcriber.language import LanguagePlan, parse_response
+
+
+def response(text, confidence=None):
+    alternative = {'transcript': text}
+    if confidence is not None:
+        alternative['confidence'] = confidence
+    return {'alternative': [alternative], 'final': True}
+
+
+def test_parse_response():
+    assert parse_response(response('sannu', 0.9)) == ('sannu', 0.9)
+    assert parse_response(response('sannu')) == ('sannu', None)
+    assert parse_response([]) == (None, 0.0)
+
+
+def test_missing_confidence_does_not_trigger_the_fallback():
+    calls = []
+
+    def request(audio_data, language):
+        calls.append(language)
+        return response('ina kwana')
+
+    plan = LanguagePlan(probe_chunks=0)
+    assert plan.recognize(request, b'') == ('ina kwana', 'ha')
+    assert calls == ['ha']
+
+
+def test_low_confidence_tries_the_next_language():
+    def request(audio_data, language):
+        return response('good morning', 0.9) if language == 'en' else response('gud monin', 0.3)
+
+    plan = LanguagePlan(probe_chunks=0)
+    assert plan.recognize(request, b'') == ('good morning', 'en')
+    assert plan.requests == 2
+
+
+def test_probes_pick_the_dominant_language():
+    def request(audio_data, language):
+        return response('yaya aiki', 0.8) if language == 'ha' else response('yeah', 0.2)
+
+    plan = LanguagePlan(languages=('en', 'ha'), probe_chunks=2)
+    for _ in range(2):
+        assert plan.recognize(request, b'') == ('yaya aiki', 'ha')
+    assert plan.language == 'ha'
+    assert plan.order() == ['ha', 'en']
@@ -0,0 +1,15 @@
+from hausa_transcriber.live import LiveTranscript
+
+
+def test_live_transcript_rows():
+    live = LiveTranscript()
+    live.add_chunk(1, 13.0, 28.0, "game da kasuwar kano a yau")
+    assert [row['text'] for row in live.rows()] == ["game da kasuwar kano a yau"]
+
+    live.add_chunk(0, 0.0, 15.0, "ina son in tambaye ka game da kasuwar")
+    assert [row['text'] for row in live.rows()] == ["ina son in tambaye ka game da kasuwar", "kano a yau"]
+
+    live.set_segments([{'start': 0.0, 'end': 28.0, 'text': "ina son"}])
+    live.add_translation("ina son", "I want")
+    live.add_translation("ba a nan", None)
+    assert live.rows() == [{'start': 0.0, 'end': 28.0, 'text': "ina son", 'translation': "I want"}]
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from hausa_transcriber.questionnaire import Questionnaire
+
+
+QUESTIONS = [
+    {'code': 'Q1', 'hausa': 'Shekarunka nawa ne yanzu?', 'english': 'How old are you now?'},
+    {'code': 'Q2', 'hausa': 'Wane irin aiki kake yi a kasuwa?', 'english': 'What kind of work do you do at the market?'},
+    {'code': 'Q3', 'hausa': 'Mutane nawa ne ke zaune a gidanka?', 'english': 'How many people live in your house?'},
+]
+
+
+@pytest.fixture
+def questionnaire():
+    return Questionnaire(QUESTIONS)
+
+
+def test_segments_match_their_question(questionnaire):
+    assert questionnaire.match('To, wane irin aiki kake yi a kasuwa? Ina sayar da tumatur')[0] == 'Q2'
+    assert questionnaire.match('how many people live in your house')[0] == 'Q3'
+    assert questionnaire.match('Ƙasar mu tana da kyau sosai') is None
+
+
+def test_spoken_codes_match_outright(questionnaire):
+    assert questionnaire.match('Yanzu tambaya ta q 3') == ('Q3', 1.0)
+
+
+def test_answers_take_the_last_question(questionnaire):
+    texts = ['Ina kwana', 'Shekarunka nawa ne yanzu?', 'Shekara talatin', 'Wani abu daban']
+    assert questionnaire.question_codes(texts) == ['', 'Q1', 'Q1', 'Q1']
+    assert questionnaire.question_codes(['Ba a ji ba'], ['What kind of work do you do at the market']) == ['Q2']
+
+
+def test_load_json_and_csv(tmp_path):
+    json_path = tmp_path / 'questions.json'
+    json_path.write_text(json.dumps(QUESTIONS), encoding='utf-8')
+    assert [q['code'] for q in Questionnaire.load(str(json_path)).questions] == ['Q1', 'Q2', 'Q3']
+
+    csv_path = tmp_path / 'questions.csv'
+    csv_path.write_text('Code,Hausa,English\nA1,Ina sunanka?,\n', encoding='utf-8')
+    assert Questionnaire.load(str(csv_path)).questions == [{'code': 'A1', 'hausa': 'Ina sunanka?', 'english': ''}]
+
+    csv_path.write_text('code,hausa,english\n,Ina sunanka?,\n', encoding='utf-8')
+    with pytest.raises(ValueError):
+        Questionnaire.load(str(csv_path))
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from hausa_transcriber import ratelimit
+from hausa_transcriber.ratelimit import RETRY_BUDGET, RateLimiter, is_throttled
+
+
+class TooManyRequests(Exception):
+    pass
+
+
+def failing(times, error):
+    """A call that raises ``error`` the first ``times`` times; ``fn.calls`` counts the attempts"""
+    def fn():
+        fn.calls += 1
+        if fn.calls <= times:
+            raise error
+        return fn.calls
+    fn.calls = 0
+    return fn
+
+
+def test_is_throttled():
+    assert is_throttled(TooManyRequests())
+    assert is_throttled(RuntimeError("recognition request failed: Too Many Requests"))
+    assert is_throttled(RuntimeError("HTTP Error 429"))
+    assert is_throttled(RuntimeError("Daily quota exceeded"))
+    assert not is_throttled(RuntimeError("Bad audio data"))
+
+
+def test_token_bucket_spaces_calls_after_the_burst():
+    limiter = RateLimiter('test', rate=20.0, burst=2, base_delay=0)
+    started = time.monotonic()
+    for _ in range(2):
+        limiter.call(lambda: None)
+    assert time.monotonic() - started < 0.05
+
+    for _ in range(2):
+        limiter.call(lambda: None)
+    # Two more tokens at 20 per second
+    assert 0.08 <= time.monotonic() - started < 1.0
+
+
+def test_throttling_halves_concurrency_and_rate_once_per_cooldown(monkeypatch):
+    limiter = RateLimiter('test', rate=10.0, burst=100, max_concurrency=8, base_delay=0)
+
+    assert limiter.call(failing(2, RuntimeError("429 Too Many Requests"))) == 3
+    state = limiter.state()
+    # The second failure came within the cooldown, so only the first one halved the limits
+    assert state['concurrency'] == pytest.approx(4.25)
+    assert state['rate'] == pytest.approx(5.0 + ratelimit.RATE_STEP)
+
+    monkeypatch.setattr(ratelimit, 'DECREASE_COOLDOWN', 0.01)
+    time.sleep(0.02)
+    limiter.call(failing(1, RuntimeError("429 Too Many Requests")))
+    assert limiter.state()['concurrency'] == pytest.approx(2.125 + 1 / 2.125)
+
+    # Successes win the limits back additively
+    for _ in range(20):
+        limiter.call(lambda: None)
+    assert limiter.state()['concurrency'] > 6
+    assert limiter.state()['in_flight'] == 0
+
+
+def test_other_errors_leave_the_limits_alone():
+    limiter = RateLimiter('test', rate=10.0, max_concurrency=8, base_delay=0)
+    limiter.call(failing(1, RuntimeError("Bad audio data")))
+    assert limiter.state()['concurrency'] == 8
+    assert limiter.state()['rate'] == pytest.approx(10.0 + ratelimit.RATE_STEP)
+
+
+def test_retries_per_call_and_retry_budget():
+    limiter = RateLimiter('test', max_retries=2, base_delay=0)
+    fn = failing(10, RuntimeError("Bad audio data"))
+    with pytest.raises(RuntimeError):
+        limiter.call(fn)
+    assert fn.calls == 3  # 1 + max_retries attempts
+
+    limiter = RateLimiter('test', max_retries=100, base_delay=0)
+    fn = failing(100, RuntimeError("Bad audio data"))
+    with pytest.raises(RuntimeError):
+        limiter.call(fn)
+    assert fn.calls == RETRY_BUDGET + 1  # The budget ran out first
+    assert limiter.state()['retry_balance'] < 1
+
+    fn = failing(1, RuntimeError("Bad audio data"))
+    with pytest.raises(RuntimeError):
+        limiter.call(fn)
+    assert fn.calls == 1  # No budget left for even one retry
+
+    fn = failing(1, KeyError('not retried'))
+    with pytest.raises(KeyError):
+        RateLimiter('test', base_delay=0).call(fn, retry_on=(RuntimeError,))
+    assert fn.calls == 1
@@ -0,0 +1,66 @@
+import re
+
+import pytest
+
+from hausa_transcriber.roles import DEFAULT_RULES, INTERVIEWER, RESPONDENT, RoleMatcher
+
+
+def keyword_role(text):
+    """The per-keyword scan the matcher replaced"""
+    text_lower = text.lower()
+    if any(word in text_lower for word in DEFAULT_RULES['question_codes']):
+        return INTERVIEWER
+    elif any(word in text_lower for word in DEFAULT_RULES['interviewer_phrases']):
+        return INTERVIEWER
+    elif '?' in text:
+        return INTERVIEWER
+    return RESPONDENT
+
+
+def keyword_is_question(sentence):
+    """The per-keyword question check the matcher replaced"""
+    sentence_lower = sentence.lower()
+    return bool(
+        re.search(r'\bQ\d+', sentence, re.IGNORECASE)
+        or any(word in sentence_lower for word in DEFAULT_RULES['hausa_question_words'])
+        or any(phrase in sentence_lower for phrase in DEFAULT_RULES['english_question_words'])
+        or '?' in sentence
+        or sentence_lower.startswith(tuple(DEFAULT_RULES['question_prefixes']))
+    )
+
+
+TEXTS = [
+    # Question codes, also inside longer codes and words
+    "Q1 shekarunka nawa", "Tambaya ta q12", "Q135", "aq3x", "Q 5", "q0 ba komai",
+    # Multi-word phrases, across case and spacing
+    "How many children do you have", "HOW MANY", "how  many", "Kin taba zuwa asibiti",
+    "kintaba", "Phone number dinki", "phone-number", "Name of the household head",
+    # Question marks
+    "Ya kake?", "?", "Lafiya lau",
+    # Sentence openings
+    "What happened", "Whatever", "Do you", "Does it", "Island", "Is it far", "were  here",
+    "Who", "did", "Had a child",
+    # Plain answers and Hausa letters
+    "Eh, gaskiya ne", "Ƙasar mu tana da kyau", "Ɗan uwana ya zo", "Mun gode sosai", "",
+]
+
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_matcher_agrees_with_the_keyword_scans(text):
+    matcher = RoleMatcher()
+    assert matcher.roles([text]).tolist() == [keyword_role(text)]
+    assert matcher.is_question(text) == keyword_is_question(text)
+
+
+def test_roles_of_a_series_with_missing_texts():
+    pd = pytest.importorskip('pandas')
+    roles = RoleMatcher().roles(pd.Series(["Menene sunanka", None, "Sunana Musa"]))
+    assert roles.tolist() == [INTERVIEWER, RESPONDENT, RESPONDENT]
+
+
+def test_custom_rules_replace_the_defaults():
+    rules = dict(DEFAULT_RULES, interviewer_phrases=['tambaya'], question_codes=[])
+    matcher = RoleMatcher(rules)
+    assert matcher.roles(["Tambaya ta farko", "How many", "Q1 ne"]).tolist() == [
+        INTERVIEWER, RESPONDENT, RESPONDENT
+    ]
@@ -0,0 +1,51 @@
+from hausa_transcriber.stitch import overlap_length, stitch_segments, stitch_texts
+
+
+def test_overlap_length():
+    assert overlap_length(list('abcab'), list('abxyz')) == 2
+    assert overlap_length(list('aaaa'), list('aaab')) == 3
+    assert overlap_length(list('abc'), list('xyz')) == 0
+    assert overlap_length([], list('abc')) == 0
+
+
+def test_shared_words_are_kept_once():
+    left = "ina son in tambaye ka game da kasuwar"
+    right = "game da kasuwar kano a yau"
+    assert stitch_texts(left, right, 2.0) == (left, "kano a yau")
+
+
+def test_mangled_words_at_the_cut_are_dropped():
+    # "kano" was cut in half at the end of the first chunk, "game" at the start of the second
+    left = "ina son in tambaye ka game da kasuwar ka"
+    right = "ame da kasuwar kano a yau"
+    assert stitch_texts(left, right, 2.0) == ("ina son in tambaye ka game da kasuwar", "kano a yau")
+
+
+def test_folding_and_punctuation_are_ignored():
+    left = "Mun je Ƙasar Kano,"
+    right = "kasar kano. Sai muka dawo"
+    assert stitch_texts(left, right, 2.0) == (left, "Sai muka dawo")
+
+
+def test_unrelated_or_single_word_overlaps_are_left_alone():
+    assert stitch_texts("na gode", "sai anjima", 2.0) == ("na gode", "sai anjima")
+    assert stitch_texts("ya ce da", "da shi ne", 2.0) == ("ya ce da", "da shi ne")
+
+
+def test_stitch_segments():
+    segments = [
+        {'start': 0.0, 'end': 15.0, 'text': "ina son in tambaye ka game da kasuwar"},
+        {'start': 13.0, 'end': 28.0, 'text': "game da kasuwar kano a yau"},
+        {'start': 26.0, 'end': 30.0, 'text': "kano a yau"},
+        {'start': 40.0, 'end': 45.0, 'text': None},
+        {'start': 50.0, 'end': 55.0, 'text': "na gode"},
+    ]
+    stitched = stitch_segments(segments)
+
+    assert [(seg['start'], seg['end'], seg['text']) for seg in stitched] == [
+        (0.0, 15.0, "ina son in tambaye ka game da kasuwar"),
+        (15.0, 30.0, "kano a yau"),
+        (50.0, 55.0, "na gode"),
+    ]
+    assert segments[1]['start'] == 13.0  # Inputs are not modified
+
@@ -0,0 +1,102 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+from hausa_transcriber.backends import FakeRecognizer, FakeTranslator
+from hausa_transcriber.batch import process_file
+from hausa_transcriber.search import MARK_END, MARK_START
+from hausa_transcriber.store import ResultStore
+
+
+def result(texts, translations=None, filename='a.wav'):
+    segments = [{'start': 10.0 * idx, 'end': 10.0 * idx + 8, 'text': text} for idx, text in enumerate(texts)]
+    translated = [dict(seg, text=text) for seg, text in zip(segments, translations or texts)]
+    return {
+        'record_number': 1,
+        'filename': filename,
+        'transcription': ' '.join(texts),
+        'translation': ' '.join(translations or texts),
+        'transcription_segments': segments,
+        'translation_segments': translated,
+        'language': 'ha'
+    }
+
+
+def test_only_complete_results_are_reused(tmp_path):
+    store = ResultStore(str(tmp_path))
+    recording_id = store.save_recording('key', result(['sannu']), 'en', complete=False)
+
+    assert store.lookup('key') is None
+    assert store.save_recording('key', result(['sannu']), 'en') == recording_id
+    assert store.lookup('key') == recording_id
+
+
+def test_saving_again_rewrites_the_recording(tmp_path):
+    store = ResultStore(str(tmp_path))
+    recording_id = store.save_recording('key', result(['tsohon rubutu']), 'en', complete=False)
+    first_saved = store.saved_at(recording_id)
+
+    assert store.save_recording('key', result(['sabon rubutu', 'na biyu']), 'en') == recording_id
+    assert [seg['text'] for seg in store.segments(recording_id)] == ['sabon rubutu', 'na biyu']
+    assert store.saved_at(recording_id) > first_saved
+    assert store.search('tsohon') == []
+    assert store.saved_at(recording_id + 1) is None
+
+
+def test_segments_are_paged_in_order(tmp_path):
+    store = ResultStore(str(tmp_path))
+    recording_id = store.save_recording('key', result([f'kalma {idx}' for idx in range(7)]), 'en')
+
+    page = store.segments(recording_id, offset=5, limit=5)
+    assert [seg['text'] for seg in page] == ['kalma 5', 'kalma 6']
+    assert len(store.translations(recording_id)) == 7
+
+
+def test_batch_keeps_summaries_and_loads_results(tmp_path):
+    store = ResultStore(str(tmp_path))
+    stored = result(['ina kwana'])
+    stored['recording_id'] = store.save_recording('key', stored, 'en')
+
+    summary = store.add_to_batch('batch', stored)
+    assert 'transcription_segments' not in summary
+    assert summary['words'] == 2 and summary['segments'] == 1
+    assert store.batch('batch') == [summary]
+
+    loaded = list(store.batch_results('batch'))
+    assert loaded[0]['transcription_segments'][0]['text'] == 'ina kwana'
+
+
+def test_search_folds_hausa_letters_and_filters_by_source(tmp_path):
+    store = ResultStore(str(tmp_path))
+    stored = result(['Ƙasar Najeriya tana da ɗimbin jama’a'], ['Nigeria has many people'])
+    stored['recording_id'] = store.save_recording('key', stored, 'en')
+    store.add_to_batch('batch', stored)
+
+    hits = store.search('kasar dimbin')
+    assert len(hits) == 1
+    assert hits[0]['batch_id'] == 'batch' and hits[0]['source'] == 'transcript'
+    assert f'{MARK_START}Ƙasar{MARK_END}' in hits[0]['text']
+
+    assert store.search('jama\'a')
+    assert store.search('nige*', source='translation')[0]['source'] == 'translation'
+    assert store.search('nigeria', source='transcript') == []
+    assert store.search('   ') == []
+
+
+def test_processed_file_is_returned_from_the_store(tmp_path):
+    t = np.arange(16000 * 4) / 16000
+    samples = np.concatenate([np.zeros(16000), 0.3 * np.sin(2 * np.pi * 200 * t), np.zeros(16000)])
+    buffer = io.BytesIO()
+    sf.write(buffer, (samples * 32767).astype(np.int16), 16000, format='WAV')
+
+    store = ResultStore(str(tmp_path))
+    options = {'recognizer': FakeRecognizer(), 'translator': FakeTranslator(), 'results': store, 'use_ffmpeg': False}
+    first = process_file(buffer, 'a.wav', 1, target_language='fr', **options)
+    second = process_file(buffer, 'a.wav', 2, target_language='fr', **options)
+
+    assert not first.get('from_store') and second['from_store']
+    assert second['recording_id'] == first['recording_id']
+    assert second['transcription_segments'] == first['transcription_segments']
+    # The batch view labels translations with the language they were made in
+    assert store.add_to_batch('batch', second)['target_language'] == 'fr'
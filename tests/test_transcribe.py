@@ -0,0 +1,48 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+from hausa_transcriber.backends import FakeRecognizer
+from hausa_transcriber.transcribe import transcribe_file
+
+
+RATE = 16000
+
+
+def utterances(count):
+    """``count`` two-second utterances, each at its own pitch, between stretches of quiet noise"""
+    rng = np.random.default_rng(0)
+    t = np.arange(RATE * 2) / RATE
+    parts = [0.003 * rng.standard_normal(RATE * 2)]
+    for idx in range(count):
+        pitch = 150 + 20 * idx
+        parts.append(0.3 * np.sin(2 * np.pi * pitch * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)))
+        parts.append(0.003 * rng.standard_normal(RATE * 2))
+    buffer = io.BytesIO()
+    sf.write(buffer, (np.concatenate(parts) * 32767).astype(np.int16), RATE, format='WAV')
+    buffer.seek(0)
+    return buffer
+
+
+def transcribe(audio, recognizer, max_workers):
+    finished = []
+    audio.seek(0)
+    result = transcribe_file(
+        audio, 'a.wav', max_workers=max_workers, use_ffmpeg=False, recognizer=recognizer,
+        chunk_duration=3, chunk_overlap=0, chunk_callback=lambda idx, start, end, text: finished.append(idx)
+    )
+    return result, finished
+
+
+def test_segments_keep_time_order_when_chunks_finish_out_of_order():
+    audio = utterances(8)
+    expected, _ = transcribe(audio, FakeRecognizer(), max_workers=1)
+    result, finished = transcribe(audio, FakeRecognizer(latency=0.05, jitter=0.9), max_workers=8)
+
+    assert len(finished) == 8
+    assert finished != sorted(finished)  # The random delays did reorder the chunks
+    assert result['segments'] == expected['segments']
+    starts = [seg['start'] for seg in result['segments']]
+    assert starts == sorted(starts) and len(starts) == 8
+    assert result['transcription'] == expected['transcription']
@@ -0,0 +1,121 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+from hausa_transcriber import vad
+from hausa_transcriber.backends import FakeRecognizer
+from hausa_transcriber.transcribe import transcribe_file
+
+
+RATE = 16000
+
+
+def tone(seconds, rng=None):
+    """Loud 200 Hz tone with a syllable-rate (4 Hz) loudness swing"""
+    t = np.arange(int(RATE * seconds)) / RATE
+    return 0.3 * np.sin(2 * np.pi * 200 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+
+
+def noise(seconds, rng, level=0.003):
+    return level * rng.standard_normal(int(RATE * seconds))
+
+
+def pcm(signal):
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+
+def regions(signal, block_seconds=None):
+    samples = pcm(signal)
+    if block_seconds:
+        size = int(RATE * block_seconds)
+        blocks = [samples[i:i + size] for i in range(0, len(samples), size)]
+    else:
+        blocks = [samples]
+    return [(start, end) for start, end, _ in vad.iter_speech_regions(blocks, RATE)]
+
+
+def speech_seconds(found):
+    return sum(end - start for start, end in found)
+
+
+def test_separates_speech_from_silence():
+    rng = np.random.default_rng(0)
+    found = regions(np.concatenate([noise(5, rng), tone(3), noise(6, rng), tone(2), noise(4, rng)]))
+
+    assert len(found) == 2
+    assert abs(found[0][0] - 5) < 0.3 and abs(found[0][1] - 8) < 0.3
+    assert abs(found[1][0] - 14) < 0.3 and abs(found[1][1] - 16) < 0.3
+
+
+def test_recording_starting_mid_speech():
+    rng = np.random.default_rng(1)
+    found = regions(np.concatenate([tone(4), noise(0.4, rng)]))
+
+    assert len(found) == 1
+    assert found[0][0] == 0.0 and found[0][1] >= 3.9
+
+
+def test_dense_speech_is_kept():
+    rng = np.random.default_rng(2)
+    parts = []
+    for _ in range(60):
+        parts += [tone(4), noise(rng.uniform(0.2, 0.4), rng)]
+    signal = np.concatenate(parts)
+
+    found = regions(signal, block_seconds=1)
+    assert speech_seconds(found) > 0.95 * len(signal) / RATE
+
+
+def test_syllable_length_bursts_are_kept_together():
+    rng = np.random.default_rng(3)
+    parts = [noise(2, rng)]
+    for _ in range(100):
+        parts += [tone(rng.uniform(0.08, 0.14)), noise(rng.uniform(0.03, 0.1), rng)]
+    parts.append(noise(2, rng))
+
+    found = regions(np.concatenate(parts))
+    assert len(found) == 1
+    assert speech_seconds(found) > 15
+
+
+def test_clicks_and_steady_noise_are_not_speech():
+    rng = np.random.default_rng(4)
+    signal = noise(20, rng)
+    click = int(RATE * 0.06)
+    signal[RATE * 10:RATE * 10 + click] += 0.5 * rng.standard_normal(click)
+
+    assert regions(signal) == []
+    assert regions(np.zeros(RATE * 5)) == []
+
+
+def test_long_speech_is_split_with_overlap():
+    rng = np.random.default_rng(5)
+    samples = pcm(np.concatenate([noise(2, rng), tone(50), noise(2, rng)]))
+    blocks = [samples[i:i + RATE * 5] for i in range(0, len(samples), RATE * 5)]
+
+    segments = list(vad.iter_speech_segments(blocks, RATE, max_duration=15, overlap=2.0))
+    assert len(segments) == 4
+    for previous, current in zip(segments, segments[1:]):
+        assert abs((previous['end'] - current['start']) - 2.0) < 0.1
+    assert all(len(seg['samples']) / RATE <= 15.0 for seg in segments)
+
+
+def test_fixed_segments_cover_the_stream():
+    samples = np.arange(1, 25001, dtype=np.int16)
+    blocks = [samples[i:i + 700] for i in range(0, len(samples), 700)]
+
+    segments = list(vad.iter_fixed_segments(iter(blocks), 1000, max_duration=10, overlap=2))
+    assert [(seg['start'], seg['end']) for seg in segments] == [(0.0, 10.0), (8.0, 18.0), (16.0, 25.0)]
+    assert segments[1]['samples'][0] == 8001
+
+    assert list(vad.iter_fixed_segments(iter([np.zeros(30000, np.int16)]), 1000, max_duration=10)) == []
+
+
+def test_recording_without_detected_speech_is_sent_whole():
+    rng = np.random.default_rng(6)
+    buffer = io.BytesIO()
+    sf.write(buffer, pcm(noise(30, rng)), RATE, format='WAV')
+
+    result = transcribe_file(buffer, 'quiet.wav', recognizer=FakeRecognizer(), chunk_duration=20, use_ffmpeg=False)
+    assert [(seg['start'], seg['end']) for seg in result['segments']] == [(0.0, 20.0), (20.0, 30.0)]
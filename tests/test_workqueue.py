@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from hausa_transcriber.workqueue import DONE, QUEUED, RUNNING, QueuedJob, create_broker
+
+
+@pytest.fixture
+def broker(tmp_path):
+    broker = create_broker('sqlite', cache_dir=str(tmp_path))
+    yield broker
+    broker.close()
+
+
+def payloads(count):
+    return [{'record_number': number, 'filename': f'f{number}.wav'} for number in range(1, count + 1)]
+
+
+def statuses(broker, batch_id):
+    return [(task['record_number'], task['status'], task['attempts']) for task in broker.tasks(batch_id)]
+
+
+def test_claims_hand_out_tasks_in_order(broker):
+    broker.submit('a', payloads(2))
+    broker.submit('b', payloads(1))
+    assert broker.batches_ahead('b') == 1
+
+    claimed = [broker.claim(f'w{n}') for n in range(4)]
+    assert [(task.batch_id, task.record_number, task.attempts) for task in claimed[:3]] == [
+        ('a', 1, 1), ('a', 2, 1), ('b', 1, 1)
+    ]
+    assert claimed[3] is None
+    assert claimed[0].payload['filename'] == 'f1.wav'
+
+
+def test_heartbeat_and_complete_need_the_lease(broker):
+    broker.submit('a', payloads(1))
+    task = broker.claim('w1')
+
+    assert broker.heartbeat(task, 'w1', {'stage': 'transcribing', 'fraction': 0.5})
+    assert not broker.heartbeat(task, 'w2')
+    assert broker.tasks('a')[0]['progress'] == {'stage': 'transcribing', 'fraction': 0.5}
+
+    assert broker.complete(task, 'w1', {'record_number': 1, 'segments': 3})
+    assert statuses(broker, 'a') == [(1, DONE, 1)]
+    assert broker.tasks('a')[0]['summary'] == {'record_number': 1, 'segments': 3}
+    assert not broker.complete(task, 'w1', {})
+
+
+def test_expired_lease_is_claimed_again(broker):
+    broker.submit('a', payloads(1))
+    stale = broker.claim('dead', lease_seconds=0.01)
+    time.sleep(0.05)
+
+    task = broker.claim('w2')
+    assert task.id == stale.id and task.attempts == 2
+    assert not broker.heartbeat(stale, 'dead')
+    assert not broker.complete(stale, 'dead', {})
+    assert broker.tasks('a')[0]['worker'] == 'w2'
+
+
+def test_renewed_lease_is_kept(broker):
+    broker.submit('a', payloads(1))
+    task = broker.claim('w1', lease_seconds=0.05)
+    for _ in range(3):
+        time.sleep(0.03)
+        assert broker.heartbeat(task, 'w1', lease_seconds=0.05)
+    assert broker.claim('w2') is None
+
+
+def test_release_does_not_count_the_attempt(broker):
+    broker.submit('a', payloads(1))
+    task = broker.claim('w1')
+    assert broker.release(task, 'w1')
+    assert statuses(broker, 'a') == [(1, QUEUED, 0)]
+    assert broker.claim('w2').attempts == 1
+
+
+def test_queued_job_view(broker):
+    broker.submit('a', payloads(2))
+    job = QueuedJob('a', broker.tasks('a'))
+    assert job.status == QUEUED and job.total == 2 and job.progress == 0.0
+
+    task = broker.claim('w1')
+    segments = [{'start': 0.0, 'end': 4.0, 'text': 'sannu', 'translation': 'hello'}]
+    broker.heartbeat(task, 'w1', {'stage': 'transcribing', 'fraction': 0.5, 'detail': '', 'segments': segments})
+    job = QueuedJob('a', broker.tasks('a'))
+    assert job.status == RUNNING and job.current_file == 1
+    assert job.live_segments == segments
+    assert 0.0 < job.progress < 0.5
+
+    broker.complete(task, 'w1', {'record_number': 1})
+    broker.complete(broker.claim('w1'), 'w1', {'record_number': 2})
+    job = QueuedJob('a', broker.tasks('a'))
+    assert job.status == DONE and not job.active and len(job.results) == 2